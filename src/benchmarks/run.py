@@ -0,0 +1,295 @@
+"""
+Performance benchmarks for tuples, matrices, canvas encoding, simulation and the BVH.
+
+Run from the repository root or the src directory:
+    python src/benchmarks/run.py                     # run everything
+    python src/benchmarks/run.py --filter matrix     # only matching cases
+    python src/benchmarks/run.py --save-baseline     # store results as the baseline
+
+Results are written as JSON to bench_output.txt and compared against the
+stored baseline; the exit status is 1 if any case is slower than the
+baseline by more than the threshold.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from core.bvh import BVH
+from core.camera import Camera
+from core.canvas import Canvas
+from core.matrices import Matrix, Matrix4, Transform
+from core.rays import RayPacket
+from core.simulation import simulate
+from core.spheres import Sphere
+from core.tuples import Point, Vector, Projectile, Environment, PointArray, VectorArray
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_OUTPUT = "bench_output.txt"
+
+# name -> function returning (callable to time, calls per run, runs)
+CASES = {}
+
+
+def case(name):
+    """Registers a benchmark setup function under the given name."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+@case("tuples.point_add_vector")
+def _():
+    p, v = Point(1, 2, 3), Vector(0.5, 0.25, 0.125)
+    return (lambda: p + v), 100000, 5
+
+
+@case("tuples.normalize_cross_dot")
+def _():
+    a, b = Vector(1, 2, 3), Vector(2, 3, 4)
+    return (lambda: a.normalize().cross(b).dot(a)), 50000, 5
+
+
+@case("tuples.array_add_normalize_1m")
+def _():
+    rng = np.random.default_rng(0)
+    points = PointArray(*rng.random((3, 1000000)))
+    vectors = VectorArray(*rng.random((3, 1000000)))
+    return (lambda: points.add(vectors).subtract(points).normalize()), 1, 5
+
+
+@case("matrices.matrix4_multiply")
+def _():
+    a = Matrix4.rotation_matrix_x(0.3).multiply(Matrix4.translation_matrix(1, 2, 3))
+    b = Matrix4.scaled_matrix(2, 3, 4)
+    return (lambda: a.multiply(b)), 20000, 5
+
+
+@case("matrices.matrix4_inverse")
+def _():
+    m = Matrix4.rotation_matrix_y(0.7).multiply(Matrix4.shearing_matrix(1, 0, 0, 0, 0, 1))
+    return (lambda: m.inverse()), 20000, 5
+
+
+@case("matrices.matrix_inverse_4x4")
+def _():
+    m = Matrix(4, 4)
+    m.set_values([[8, 2, 2, 2], [3, -1, 7, 0], [7, 0, 5, 4], [6, -2, 0, 5]])
+    return (lambda: m.inverse()), 500, 5
+
+
+@case("matrices.matrix_inverse_10x10")
+def _():
+    m = Matrix(10, 10)
+    m.set_values([[(i * 7 + j * 3) % 11 + (10 if i == j else 0) for j in range(10)] for i in range(10)])
+    # Copy so every call factorizes instead of reusing the cached LU
+    return (lambda: m.copy().inverse()), 200, 5
+
+
+@case("matrices.transform_point")
+def _():
+    m = Transform().rotate_x(0.5).scale(2, 2, 2).translate(1, 2, 3).matrix()
+    p = Point(1, 2, 3)
+    return (lambda: m * p), 50000, 5
+
+
+@case("matrices.transform_many_1m")
+def _():
+    m = Transform().rotate_x(0.5).scale(2, 2, 2).translate(1, 2, 3).matrix()
+    points = PointArray(*np.random.default_rng(0).random((3, 1000000)))
+    return (lambda: m.transform_many(points)), 1, 5
+
+
+@case("canvas.allocate_1080p")
+def _():
+    return (lambda: Canvas(1920, 1080)), 5, 5
+
+
+@case("canvas.allocate_4k")
+def _():
+    return (lambda: Canvas(3840, 2160)), 2, 5
+
+
+@case("canvas.write_pixel")
+def _():
+    canvas = Canvas(1920, 1080)
+    color = (1, 0.5, 0.25)
+    return (lambda: canvas.write_pixel(960, 540, color)), 100000, 5
+
+
+@case("canvas.ppm_p3_1080p")
+def _():
+    canvas = _gradient_canvas(1920, 1080)
+    return (lambda: canvas.write_ppm(io.StringIO())), 1, 1
+
+
+@case("canvas.ppm_p3_4k")
+def _():
+    canvas = _gradient_canvas(3840, 2160)
+    return (lambda: canvas.write_ppm(io.StringIO())), 1, 1
+
+
+@case("canvas.ppm_p6_1080p")
+def _():
+    canvas = _gradient_canvas(1920, 1080)
+    return (lambda: canvas.write_ppm(io.BytesIO(), binary=True)), 5, 5
+
+
+@case("canvas.ppm_p6_4k")
+def _():
+    canvas = _gradient_canvas(3840, 2160)
+    return (lambda: canvas.write_ppm(io.BytesIO(), binary=True)), 2, 5
+
+
+@case("simulation.projectile_tick_loop")
+def _():
+    env = Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0))
+
+    def loop():
+        proj = Projectile(Point(0, 1, 0), Vector(1, 1.8, 0).normalize() * 11.25)
+        while proj.position.y > 0:
+            proj = proj.tick(env, proj)
+    return loop, 20, 5
+
+
+@case("simulation.batch_10k")
+def _():
+    env = Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0))
+    angles = np.linspace(0.1, 1.5, 10000)
+    positions = np.tile([0.0, 1.0, 0.0], (10000, 1))
+    velocities = np.stack([np.cos(angles), np.sin(angles), np.zeros_like(angles)], axis=1) * 11.25
+    return (lambda: simulate(positions, velocities, env, record=False)), 1, 5
+
+
+@case("camera.frame_rays_1080p")
+def _():
+    camera = Camera(1920, 1080, math.pi / 3).look_at(Point(0, 1.5, -5), Point(0, 1, 0), Vector(0, 1, 0))
+    return (lambda: camera.frame_rays()), 1, 5
+
+
+@case("bvh.build_10k")
+def _():
+    shapes = _sphere_scene(10000)
+    return (lambda: BVH(shapes)), 1, 3
+
+
+@case("bvh.intersect_10k_spheres_10k_rays")
+def _():
+    bvh = BVH(_sphere_scene(10000))
+    xs, ys = np.meshgrid(np.linspace(-0.5, 0.5, 100), np.linspace(-0.5, 0.5, 100))
+    directions = np.stack([xs.ravel(), ys.ravel(), np.ones(10000)], axis=1)
+    packet = RayPacket(np.tile([0.0, 0.0, -100.0], (10000, 1)), directions)
+    return (lambda: bvh.intersect(packet)), 1, 3
+
+
+def _sphere_scene(count):
+    """Returns randomly placed small spheres with their transforms already composed."""
+    rng = np.random.default_rng(0)
+    shapes = []
+    for position, radius in zip(rng.uniform(-50, 50, (count, 3)), rng.uniform(0.05, 0.3, count)):
+        shapes.append(Sphere(Transform().scale(radius, radius, radius).translate(*position)))
+    BVH(shapes)  # warm the memoized transform matrices and inverses
+    return shapes
+
+
+def _gradient_canvas(width, height):
+    """Returns a canvas filled with a color gradient, so PPM tokens vary in length."""
+    canvas = Canvas(width, height)
+    x = np.linspace(0, 1, width)[None, :, None]
+    y = np.linspace(0, 1, height)[:, None, None]
+    canvas.write_rows(0, np.concatenate([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2))
+    return canvas
+
+
+def measure(setup):
+    """Runs one case and returns the best time per call in seconds."""
+    func, number, runs = setup()
+    return min(timeit.repeat(func, number=number, repeat=runs)) / number
+
+
+def run(pattern=None):
+    """Runs every case whose name matches the regular expression; returns {name: seconds}."""
+    results = {}
+    for name, setup in CASES.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = measure(setup)
+        print(f"{name:<40}{_format_seconds(results[name]):>12}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with baseline timings.
+    Returns a list of (name, baseline seconds, current seconds, ratio, regressed)
+    for every case present in both, where regressed means the current time is
+    more than threshold (a fraction) above the baseline.
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = current / previous if previous > 0 else math.inf
+        rows.append((name, previous, current, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _format_seconds(seconds):
+    """Formats a duration with a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", help="Only run cases whose name matches this regular expression")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({**report, "results": baseline}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\n{'case':<40}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, previous, current, ratio, regressed in compare(results, baseline, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<40}{_format_seconds(previous):>12}{_format_seconds(current):>12}{ratio:>7.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
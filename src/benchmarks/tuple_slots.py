@@ -0,0 +1,97 @@
+"""
+Micro-benchmark comparing the __slots__ Tuple classes with the previous
+dict-based implementation.
+
+Run from the src directory:
+    python -m benchmarks.tuple_slots
+"""
+import sys
+import os
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.tuples import Point, Vector, Projectile, Environment
+
+
+class LegacyTuple:
+    """The previous Tuple: per-instance __dict__ and an intermediate object in add."""
+    def __init__(self, x, y, z, w):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+    def add(self, other):
+        result = LegacyTuple(self.x + other.x, self.y + other.y, self.z + other.z, self.w + other.w)
+        if result.w == 1.0 or result.w == 2.0:
+            return LegacyPoint(result.x, result.y, result.z)
+        elif result.w == 0.0:
+            return LegacyVector(result.x, result.y, result.z)
+        return result
+
+    def __getitem__(self, index):
+        if index < 0 or index >= 4:
+            raise IndexError("Index out of range")
+        return [self.x, self.y, self.z, self.w][index]
+
+
+class LegacyPoint(LegacyTuple):
+    def __init__(self, x, y, z):
+        super().__init__(x, y, z, 1.0)
+
+
+class LegacyVector(LegacyTuple):
+    def __init__(self, x, y, z):
+        super().__init__(x, y, z, 0.0)
+
+
+def legacy_tick(position, velocity, gravity, wind):
+    """The previous Projectile.tick: allocates a Point and a Vector every step."""
+    return (LegacyPoint(position.x + velocity.x, position.y + velocity.y, position.z + velocity.z),
+            LegacyVector(velocity.x + wind.x, velocity.y + gravity.y, velocity.z + gravity.z))
+
+
+def run(number=200000):
+    """Runs every case and returns a list of (name, legacy seconds, current seconds)."""
+    lp, lv = LegacyPoint(1, 2, 3), LegacyVector(0.5, 0.25, 0.125)
+    p, v = Point(1, 2, 3), Vector(0.5, 0.25, 0.125)
+    env = Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0))
+    lg, lw = LegacyVector(0, -0.1, 0), LegacyVector(-0.01, 0, 0)
+    proj = Projectile(Point(0, 1, 0), Vector(1, 1.8, 0))
+
+    results = []
+    results.append(("construct Point",
+                    timeit.timeit(lambda: LegacyPoint(1, 2, 3), number=number),
+                    timeit.timeit(lambda: Point(1, 2, 3), number=number)))
+    results.append(("Point.add(Vector)",
+                    timeit.timeit(lambda: lp.add(lv), number=number),
+                    timeit.timeit(lambda: p.add(v), number=number)))
+    results.append(("tuple[i]",
+                    timeit.timeit(lambda: lp[2], number=number),
+                    timeit.timeit(lambda: p[2], number=number)))
+    results.append(("projectile tick",
+                    timeit.timeit(lambda: legacy_tick(lp, lv, lg, lw), number=number),
+                    timeit.timeit(lambda: proj.step(env), number=number)))
+    return results
+
+
+def instance_sizes(count=10000):
+    """Returns the bytes allocated per Point for the legacy and current classes."""
+    sizes = []
+    for cls in (LegacyPoint, Point):
+        tracemalloc.start()
+        points = [cls(i, i, i) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del points
+        sizes.append(size / count)
+    return sizes
+
+
+if __name__ == "__main__":
+    print(f"{'case':<20}{'legacy (s)':>12}{'current (s)':>13}{'speedup':>9}")
+    for name, legacy, current in run():
+        print(f"{name:<20}{legacy:>12.4f}{current:>13.4f}{legacy / current:>8.2f}x")
+    legacy_size, current_size = instance_sizes()
+    print(f"bytes per Point: legacy {legacy_size:.0f}, current {current_size:.0f}")
@@ -0,0 +1,392 @@
+import time
+import numpy as np
+from core.rays import RayPacket
+from core.spheres import Sphere, Intersection, hit_distances, intersect_spheres
+
+# Layout of one flattened node. Nodes are stored level by level and the two
+# children of an interior node are adjacent, so offset holds the left child
+# (the right one is offset + 1) for interior nodes and the first entry of
+# BVH.order for leaves.
+NODE_DTYPE = np.dtype([
+    ("lo", np.float64, 3),
+    ("hi", np.float64, 3),
+    ("offset", np.int32),
+    ("count", np.int32),  # number of primitives, 0 for interior nodes
+    ("axis", np.int8),    # split axis of interior nodes
+])
+
+
+class BuildStats:
+    """Statistics describing a BVH build or refit."""
+
+    def __init__(self, primitives, nodes, leaves, max_depth, sah_cost, seconds):
+        self.primitives = primitives
+        self.nodes = nodes
+        self.leaves = leaves
+        self.max_depth = max_depth
+        self.sah_cost = sah_cost
+        self.seconds = seconds
+
+    @property
+    def mean_leaf_size(self):
+        """Returns the mean number of primitives per leaf."""
+        return self.primitives / self.leaves if self.leaves else 0.0
+
+    def __repr__(self):
+        return (f"BuildStats(primitives={self.primitives}, nodes={self.nodes}, leaves={self.leaves}, "
+                f"max_depth={self.max_depth}, sah_cost={self.sah_cost:.2f}, seconds={self.seconds:.3f})")
+
+
+class TraversalStats:
+    """Counters accumulated over every traversal of a BVH since the last reset."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Zeroes all counters."""
+        self.rays = 0
+        self.node_visits = 0
+        self.box_tests = 0
+        self.primitive_tests = 0
+        self.seconds = 0.0
+
+    @property
+    def box_tests_per_ray(self):
+        """Returns the mean number of ray-box tests per ray."""
+        return self.box_tests / self.rays if self.rays else 0.0
+
+    @property
+    def primitive_tests_per_ray(self):
+        """Returns the mean number of ray-primitive tests per ray."""
+        return self.primitive_tests / self.rays if self.rays else 0.0
+
+    def __repr__(self):
+        return (f"TraversalStats(rays={self.rays}, node_visits={self.node_visits}, "
+                f"box_tests={self.box_tests}, primitive_tests={self.primitive_tests}, "
+                f"seconds={self.seconds:.3f})")
+
+
+class BVH:
+    """
+    A bounding volume hierarchy over shapes with world-space bounds.
+    The tree is built top-down with a binned surface area heuristic over the
+    bounds each shape reports (see Sphere.bounds), flattened into a single
+    NODE_DTYPE array and traversed with whole ray packets: at every node the
+    rays still interested in it are tested against its box in one vectorized
+    call, and at every leaf they are intersected with all of its primitives
+    at once.
+    Attributes:
+        shapes: The primitives, each with bounds() and intersect_packet() methods.
+        nodes: The flattened node array.
+        order: Primitive indices in leaf order; leaf i covers
+            order[offset:offset + count].
+        build_stats: BuildStats of the last build or refit.
+        traversal_stats: TraversalStats accumulated over intersect calls.
+    """
+    # Relative costs of visiting a node and testing one primitive in the SAH.
+    # Leaves are intersected in one vectorized call, so an extra primitive in
+    # a leaf is much cheaper than an extra node visit.
+    TRAVERSAL_COST = 1.0
+    INTERSECTION_COST = 0.25
+
+    def __init__(self, shapes, max_leaf_size=8, bins=16):
+        """
+        Builds a BVH.
+        Args:
+            shapes: A sequence of shapes.
+            max_leaf_size: Nodes with more primitives than this are always split
+                (unless their centroids coincide).
+            bins: Number of candidate split planes per axis.
+        Raises:
+            ValueError: If there are no shapes.
+        """
+        if len(shapes) == 0:
+            raise ValueError("A BVH needs at least one shape")
+        self.shapes = list(shapes)
+        self.max_leaf_size = max_leaf_size
+        self.bins = bins
+        self.traversal_stats = TraversalStats()
+        self.build()
+
+    def _primitive_bounds(self):
+        """Collects the (N, 3) lower and upper bounds of every shape."""
+        self._spheres = all(isinstance(shape, Sphere) for shape in self.shapes)
+        if self._spheres:
+            # World-to-object matrices for the batched leaf test
+            self._inverses = np.stack([shape._inverse_arrays()[0] for shape in self.shapes])
+        bounds = [shape.bounds() for shape in self.shapes]
+        lo = np.array([b[0] for b in bounds], dtype=np.float64)
+        hi = np.array([b[1] for b in bounds], dtype=np.float64)
+        return lo, hi
+
+    def build(self):
+        """
+        (Re)builds the tree from the current shape bounds.
+        The tree is built one level at a time: the binning and split choice
+        for every node of a level run together as whole-array operations, so
+        the cost in Python calls grows with the depth of the tree rather than
+        with the number of nodes.
+        """
+        start_time = time.perf_counter()
+        lo, hi = self._primitive_bounds()
+        centroids = (lo + hi) / 2
+        order = np.arange(len(self.shapes))
+        levels = []
+        starts = np.array([0])
+        ends = np.array([len(order)])
+        first_id = 0
+        depth = 0
+        while len(starts):
+            sizes = ends - starts
+            count = len(starts)
+            # Gather the primitives of every node of this level, node by node
+            seg = np.repeat(np.arange(count), sizes)
+            seg_starts = np.cumsum(sizes) - sizes
+            positions = np.arange(sizes.sum()) - seg_starts[seg] + starts[seg]
+            idx = order[positions]
+            node_lo = np.minimum.reduceat(lo[idx], seg_starts)
+            node_hi = np.maximum.reduceat(hi[idx], seg_starts)
+            split, right, axes = self._find_splits(idx, seg, seg_starts, sizes, lo, hi, centroids,
+                                             node_lo, node_hi)
+            # Stable partition puts each node's left primitives first
+            order[positions] = idx[np.argsort(seg * 2 + right, kind="stable")]
+            left_sizes = sizes - np.bincount(seg, weights=right, minlength=count).astype(np.intp)
+
+            offsets = starts.copy()
+            children = first_id + count + 2 * np.arange(split.sum())
+            offsets[split] = children
+            counts = np.where(split, 0, sizes)
+            levels.append((node_lo, node_hi, offsets, counts, axes, depth))
+            middles = starts[split] + left_sizes[split]
+            starts = np.stack([starts[split], middles], axis=1).ravel()
+            ends = np.stack([middles, ends[split]], axis=1).ravel()
+            first_id += count
+            depth += 1
+
+        self.order = order
+        self.nodes = np.zeros(first_id, dtype=NODE_DTYPE)
+        self.nodes["lo"] = np.concatenate([level[0] for level in levels])
+        self.nodes["hi"] = np.concatenate([level[1] for level in levels])
+        self.nodes["offset"] = np.concatenate([level[2] for level in levels])
+        self.nodes["count"] = np.concatenate([level[3] for level in levels])
+        self.nodes["axis"] = np.concatenate([level[4] for level in levels])
+        self._depths = np.concatenate([np.full(len(level[0]), level[5]) for level in levels])
+        self._finish_stats(start_time)
+
+    def _find_splits(self, idx, seg, seg_starts, sizes, lo, hi, centroids, node_lo, node_hi):
+        """
+        Chooses a split for every node of one level with a binned SAH.
+        Args:
+            idx: The primitives of all nodes, grouped by node.
+            seg: The node of each entry of idx.
+            seg_starts: Where each node's primitives start in idx.
+            sizes: The number of primitives of each node.
+        Returns:
+            (split, right, axes): a per-node mask of nodes to split, a
+            per-entry mask of primitives going to the right child and the
+            per-node split axis.
+        """
+        count = len(sizes)
+        bins = self.bins
+        c = centroids[idx]
+        cmin = np.minimum.reduceat(c, seg_starts)
+        extent = np.maximum.reduceat(c, seg_starts) - cmin
+        idx_lo = lo[idx]
+        idx_hi = hi[idx]
+        rows = np.arange(count)
+        costs = np.full((count, 3), np.inf)
+        best_bins = np.zeros((count, 3), dtype=np.intp)
+        prim_bins = []
+        for axis in range(3):
+            spread = extent[:, axis] > 0
+            scale = np.where(spread, bins / np.where(spread, extent[:, axis], 1.0), 0.0)
+            b = ((c[:, axis] - cmin[seg, axis]) * scale[seg]).astype(np.intp)
+            np.minimum(b, bins - 1, out=b)
+            prim_bins.append(b)
+            key = seg * bins + b
+            counts = np.bincount(key, minlength=count * bins)
+            filled = counts > 0
+            sort = np.argsort(key, kind="stable")
+            key_starts = (np.cumsum(counts) - counts)[filled]
+            bin_lo = np.full((count * bins, 3), np.inf)
+            bin_hi = np.full((count * bins, 3), -np.inf)
+            bin_lo[filled] = np.minimum.reduceat(idx_lo[sort], key_starts)
+            bin_hi[filled] = np.maximum.reduceat(idx_hi[sort], key_starts)
+            bin_lo = bin_lo.reshape(count, bins, 3)
+            bin_hi = bin_hi.reshape(count, bins, 3)
+            counts = counts.reshape(count, bins)
+            # Candidate split i puts bins 0..i on the left and i+1.. on the right
+            left_count = np.cumsum(counts, axis=1)[:, :-1]
+            right_count = sizes[:, None] - left_count
+            left_area = _surface_area(np.minimum.accumulate(bin_lo, axis=1)[:, :-1],
+                                      np.maximum.accumulate(bin_hi, axis=1)[:, :-1])
+            right_area = _surface_area(np.minimum.accumulate(bin_lo[:, ::-1], axis=1)[:, ::-1][:, 1:],
+                                       np.maximum.accumulate(bin_hi[:, ::-1], axis=1)[:, ::-1][:, 1:])
+            valid = (left_count > 0) & (right_count > 0) & spread[:, None]
+            cost = np.where(valid, left_area * left_count + right_area * right_count, np.inf)
+            best_bins[:, axis] = np.argmin(cost, axis=1)
+            costs[:, axis] = cost[rows, best_bins[:, axis]]
+
+        axes = np.argmin(costs, axis=1)
+        best_cost = costs[rows, axes]
+        area = _surface_area(node_lo, node_hi)
+        split_cost = self.TRAVERSAL_COST * area + self.INTERSECTION_COST * best_cost
+        leaf_cost = self.INTERSECTION_COST * sizes * area
+        separable = np.isfinite(best_cost)
+        small = sizes <= self.max_leaf_size
+        split = separable & (sizes > 1) & ~(small & (split_cost >= leaf_cost))
+        right = np.stack(prim_bins)[axes[seg], np.arange(len(idx))] > best_bins[rows, axes][seg]
+        # Coincident centroids cannot be separated spatially; halve the list
+        halve = ~separable & ~small
+        if halve.any():
+            rank = np.arange(len(idx)) - seg_starts[seg]
+            right = np.where(halve[seg], rank >= sizes[seg] // 2, right)
+            split |= halve
+            axes[halve] = 0
+        right &= split[seg]
+        return split, right, axes.astype(np.int8)
+
+    def refit(self):
+        """
+        Updates every node's bounds after shape transforms have changed,
+        keeping the tree topology. This is much cheaper than build() but the
+        tree quality degrades if shapes move far; rebuild in that case.
+        """
+        start_time = time.perf_counter()
+        lo, hi = self._primitive_bounds()
+        nodes = self.nodes
+        # Leaves sorted by offset tile order, so each one is a reduceat segment
+        leaves = np.flatnonzero(nodes["count"] > 0)
+        leaves = leaves[np.argsort(nodes["offset"][leaves])]
+        offsets = nodes["offset"][leaves]
+        nodes["lo"][leaves] = np.minimum.reduceat(lo[self.order], offsets)
+        nodes["hi"][leaves] = np.maximum.reduceat(hi[self.order], offsets)
+        # Children are always one level deeper, so fix up one level at a time
+        interior = nodes["count"] == 0
+        for depth in range(self._depths.max() - 1, -1, -1):
+            parents = np.flatnonzero(interior & (self._depths == depth))
+            if len(parents) == 0:
+                continue
+            left = nodes["offset"][parents]
+            right = left + 1
+            nodes["lo"][parents] = np.minimum(nodes["lo"][left], nodes["lo"][right])
+            nodes["hi"][parents] = np.maximum(nodes["hi"][left], nodes["hi"][right])
+        self._finish_stats(start_time)
+
+    def _finish_stats(self, start_time):
+        """Records build statistics, including the SAH cost of the tree relative to its root."""
+        nodes = self.nodes
+        areas = _surface_area(nodes["lo"], nodes["hi"])
+        leaf = nodes["count"] > 0
+        root_area = areas[0] if areas[0] > 0 else 1.0
+        cost = (self.TRAVERSAL_COST * areas[~leaf].sum()
+                + self.INTERSECTION_COST * (areas[leaf] * nodes["count"][leaf]).sum()) / root_area
+        self.build_stats = BuildStats(len(self.shapes), len(nodes), int(leaf.sum()),
+                                      int(self._depths.max()), float(cost),
+                                      time.perf_counter() - start_time)
+
+    @property
+    def bounds(self):
+        """The world-space (min, max) bounds of the whole scene."""
+        return self.nodes["lo"][0].copy(), self.nodes["hi"][0].copy()
+
+    def _leaf_distances(self, primitives, origins, directions):
+        """Returns the (R, K) nearest non-negative distances of R rays to K primitives."""
+        if self._spheres:
+            return intersect_spheres(self._inverses[primitives], origins, directions)
+        packet = RayPacket(origins, directions)
+        return np.stack([hit_distances(self.shapes[p].intersect_packet(packet))
+                         for p in primitives], axis=1)
+
+    def intersect(self, packet):
+        """
+        Finds the nearest shape hit by each ray of a packet.
+        Args:
+            packet: A RayPacket in world space.
+        Returns:
+            A (distances, indices) pair like spheres.closest_hits: the lowest
+            non-negative hit distance of each ray (inf on a miss) and the
+            index into shapes of the shape hit (-1 on a miss).
+        """
+        start_time = time.perf_counter()
+        stats = self.traversal_stats
+        origins = packet.origins
+        directions = packet.directions
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse_directions = 1.0 / directions
+        distances = np.full(len(packet), np.inf)
+        indices = np.full(len(packet), -1, dtype=np.intp)
+        node_lo = self.nodes["lo"]
+        node_hi = self.nodes["hi"]
+        offsets = self.nodes["offset"].tolist()
+        counts = self.nodes["count"].tolist()
+        axes = self.nodes["axis"].tolist()
+
+        def enter(boxes, rays):
+            """Returns, per box, the rays that reach it before their current hit."""
+            stats.box_tests += len(rays) * len(boxes)
+            o = origins[rays][:, None, :]
+            inv = inverse_directions[rays][:, None, :]
+            with np.errstate(invalid="ignore"):
+                t1 = (node_lo[boxes] - o) * inv
+                t2 = (node_hi[boxes] - o) * inv
+            # fmin/fmax skip the NaNs of rays lying in a slab plane
+            near = np.fmax.reduce(np.fmin(t1, t2), axis=2)
+            far = np.fmin.reduce(np.fmax(t1, t2), axis=2)
+            hits = (near <= far) & (far >= 0) & (near < distances[rays][:, None])
+            return [rays[hits[:, i]] for i in range(len(boxes))]
+
+        # Both children of a node are tested in one call when it is visited
+        stack = [(0, enter([0], np.arange(len(packet)))[0])]
+        while stack:
+            index, rays = stack.pop()
+            if len(rays) == 0:
+                continue
+            stats.node_visits += 1
+            count = counts[index]
+            if count:
+                offset = offsets[index]
+                primitives = self.order[offset:offset + count]
+                stats.primitive_tests += len(rays) * count
+                ts = self._leaf_distances(primitives, origins[rays], directions[rays])
+                nearest = np.argmin(ts, axis=1)
+                t = ts[np.arange(len(rays)), nearest]
+                closer = t < distances[rays]
+                distances[rays[closer]] = t[closer]
+                indices[rays[closer]] = primitives[nearest[closer]]
+                continue
+            left = offsets[index]
+            left_rays, right_rays = enter([left, left + 1], rays)
+            # Visit the child most rays reach first, so later boxes can be culled
+            if directions[rays, axes[index]].sum() >= 0:
+                stack.append((left + 1, right_rays))
+                stack.append((left, left_rays))
+            else:
+                stack.append((left, left_rays))
+                stack.append((left + 1, right_rays))
+        stats.rays += len(packet)
+        stats.seconds += time.perf_counter() - start_time
+        return distances, indices
+
+    def hit(self, ray):
+        """Returns the visible Intersection of a single Ray, or None if it misses."""
+        distances, indices = self.intersect(RayPacket.from_rays([ray]))
+        if indices[0] < 0:
+            return None
+        return Intersection(float(distances[0]), self.shapes[indices[0]])
+
+    def __len__(self):
+        """Returns the number of shapes."""
+        return len(self.shapes)
+
+    def __repr__(self):
+        """Returns a string representation of the BVH."""
+        return f"BVH(shapes={len(self.shapes)}, nodes={len(self.nodes)})"
+
+
+def _surface_area(lo, hi):
+    """Returns the surface area of boxes given by (..., 3) corner arrays; empty boxes have area 0."""
+    d = np.maximum(hi - lo, 0.0)
+    d = np.where(np.isfinite(d), d, 0.0)
+    return 2 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+from core.tuples import Point, Vector
+from core.matrices import Matrix, Matrix4, Transform
+from core.rays import Ray, RayPacket
+
+
+class Camera:
+    """
+    A pinhole camera that maps a hsize x vsize canvas onto the world.
+    The camera looks down -z in its own space, with the canvas one unit in
+    front of the eye; the transform maps world space to camera space (see
+    Matrix.view_transform). Its inverse is taken once and reused for every
+    ray, and the array methods build the rays for a whole tile or frame in
+    a few NumPy operations instead of one Point, Vector and matrix product
+    per pixel.
+    """
+
+    def __init__(self, hsize, vsize, field_of_view, transform=None):
+        """
+        Initializes a camera.
+        Args:
+            hsize: The horizontal size of the canvas in pixels.
+            vsize: The vertical size of the canvas in pixels.
+            field_of_view: The angle in radians the canvas spans horizontally
+                (or vertically, for portrait canvases).
+            transform: The view transform, as a Transform or 4x4 Matrix (default: identity).
+        """
+        if hsize <= 0 or vsize <= 0:
+            raise ValueError("Camera size must be positive")
+        self.hsize = hsize
+        self.vsize = vsize
+        self.field_of_view = field_of_view
+        half_view = math.tan(field_of_view / 2)
+        aspect = hsize / vsize
+        if aspect >= 1:
+            self.half_width = half_view
+            self.half_height = half_view / aspect
+        else:
+            self.half_width = half_view * aspect
+            self.half_height = half_view
+        self.pixel_size = self.half_width * 2 / hsize
+        self.transform = transform
+
+    @property
+    def transform(self):
+        """The world-to-camera Transform."""
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        if transform is None:
+            transform = Transform()
+        elif isinstance(transform, Matrix):
+            transform = Transform.from_matrix(transform)
+        self._transform = transform
+        self._inverse_np = None
+
+    def look_at(self, from_point, to_point, up):
+        """Points the camera from from_point towards to_point and returns it."""
+        self.transform = Matrix4.view_transform(from_point, to_point, up)
+        return self
+
+    def _inverse(self):
+        """Returns the camera-to-world matrix as a NumPy array."""
+        if self._inverse_np is None:
+            self._inverse_np = self._transform.inverse().to_numpy()
+        return self._inverse_np
+
+    def ray_for_pixel(self, px, py):
+        """Returns the Ray through the centre of pixel (px, py)."""
+        inverse = self._transform.inverse()
+        world_x = self.half_width - (px + 0.5) * self.pixel_size
+        world_y = self.half_height - (py + 0.5) * self.pixel_size
+        pixel = inverse * Point(world_x, world_y, -1)
+        origin = inverse * Point(0, 0, 0)
+        direction = pixel - origin
+        return Ray(origin, Vector(direction.x, direction.y, direction.z).normalize())
+
+    def rays(self, xs, ys):
+        """
+        Returns the rays through arbitrary canvas positions.
+        Args:
+            xs: The x coordinates in pixels; pixel px spans [px, px + 1), so
+                its centre is px + 0.5.
+            ys: The y coordinates in pixels, growing downwards.
+        Returns:
+            A RayPacket with normalized directions, in the order of xs and ys.
+        """
+        inverse = self._inverse()
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        camera = np.empty((len(xs), 3))
+        camera[:, 0] = self.half_width - xs * self.pixel_size
+        camera[:, 1] = self.half_height - ys * self.pixel_size
+        camera[:, 2] = -1
+        # Every ray starts at the eye, so only the pixel points are transformed
+        origin = inverse[:3, 3]
+        directions = camera @ inverse[:3, :3].T
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+        return RayPacket(np.broadcast_to(origin, directions.shape), directions)
+
+    def tile_rays(self, x0, y0, x1, y1):
+        """Returns the rays through the centres of the pixels in [x0, x1) x [y0, y1), row by row."""
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        return self.rays(xs + 0.5, ys + 0.5)
+
+    def frame_rays(self):
+        """Returns the rays through the centre of every pixel of the canvas, row by row."""
+        return self.tile_rays(0, 0, self.hsize, self.vsize)
+
+    def __repr__(self):
+        """Returns a string representation of the camera."""
+        return f"Camera({self.hsize}, {self.vsize}, {self.field_of_view}, {self._transform})"
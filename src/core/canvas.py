@@ -1,21 +1,227 @@
+import io
+import mmap
+import tempfile
+from collections import OrderedDict
+from multiprocessing import shared_memory
+import numpy as np
+
+def quantize(values):
+    """Scales and clamps color components to the range [0, 255] as uint8, like scale_and_clamp."""
+    return np.clip(np.rint(np.asarray(values) * 255), 0, 255).astype(np.uint8)
+
+def _read_ppm_header(data):
+    """
+    Parses the magic number, width, height and maxval of a PPM header.
+    Returns them together with the offset of the first pixel byte.
+    """
+    tokens = []
+    i = 0
+    n = len(data)
+    while len(tokens) < 4:
+        # Skip whitespace and comments
+        while i < n and (data[i:i + 1].isspace() or data[i:i + 1] == b"#"):
+            if data[i:i + 1] == b"#":
+                while i < n and data[i:i + 1] not in (b"\n", b"\r"):
+                    i += 1
+            else:
+                i += 1
+        start = i
+        while i < n and not data[i:i + 1].isspace() and data[i:i + 1] != b"#":
+            i += 1
+        if start == i:
+            raise ValueError("PPM header is truncated")
+        tokens.append(bytes(data[start:i]))
+    try:
+        width, height, maxval = (int(t) for t in tokens[1:])
+    except ValueError:
+        raise ValueError("PPM header is malformed")
+    # A single whitespace character separates the header from the pixels
+    return tokens[0], width, height, maxval, i + 1
+
+def _colors(color, count):
+    """Returns a color as a (3,) array, or per-point colors as a (count, 3) array."""
+    if hasattr(color, "x"):
+        color = (color.x, color.y, color.z)
+    colors = np.asarray(color, dtype=np.float64)
+    if colors.shape not in ((3,), (count, 3)):
+        raise ValueError("Color must be one (r, g, b) color or one color per point")
+    return colors
+
+def _clip_segments(x0, y0, x1, y1, width, height):
+    """
+    Clips segments to the canvas rectangle with the Liang-Barsky algorithm.
+    Segments entirely off the canvas, or with a NaN or infinite endpoint,
+    are dropped.
+    """
+    finite = np.isfinite(x0) & np.isfinite(y0) & np.isfinite(x1) & np.isfinite(y1)
+    x0, y0, x1, y1 = x0[finite], y0[finite], x1[finite], y1[finite]
+    dx, dy = x1 - x0, y1 - y0
+    t0 = np.zeros(len(x0))
+    t1 = np.ones(len(x0))
+    visible = np.ones(len(x0), dtype=bool)
+    # Keep coordinates strictly below width and height so they floor onto the canvas
+    for p, q in ((-dx, x0), (dx, np.nextafter(width, 0) - x0), (-dy, y0), (dy, np.nextafter(height, 0) - y0)):
+        parallel = p == 0
+        visible &= ~(parallel & (q < 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.where(parallel, 0, q / np.where(parallel, 1, p))
+        t0 = np.where(~parallel & (p < 0), np.maximum(t0, r), t0)
+        t1 = np.where(~parallel & (p > 0), np.minimum(t1, r), t1)
+    visible &= t0 <= t1
+    x0, y0, dx, dy, t0, t1 = x0[visible], y0[visible], dx[visible], dy[visible], t0[visible], t1[visible]
+    return x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy
+
+def _dda(x0, y0, x1, y1, centers=False):
+    """
+    Samples every segment at unit steps along its major axis, endpoints included.
+    Returns the sample x and y coordinates and, per sample, whether its
+    segment is steep (major axis y). With centers=True the samples are placed
+    on whole major-axis coordinates, as needed for antialiasing.
+    """
+    dx, dy = x1 - x0, y1 - y0
+    steep = np.abs(dy) > np.abs(dx)
+    if centers:
+        start = np.where(steep, y0, x0)
+        end = np.where(steep, y1, x1)
+        lo = np.ceil(np.minimum(start, end))
+        hi = np.floor(np.maximum(start, end))
+        steps = np.maximum(hi - lo, -1).astype(np.int64) + 1
+    else:
+        steps = np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(x0)), steps)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)
+    if centers:
+        major = lo[segment] + k
+        d_major = np.where(steep, dy, dx)[segment]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(d_major != 0, (major - np.where(steep, y0, x0)[segment]) / d_major, 0)
+    else:
+        t = np.where(steps[segment] > 1, k / np.maximum(steps[segment] - 1, 1), 0)
+    return x0[segment] + t * dx[segment], y0[segment] + t * dy[segment], steep[segment]
+
 class Canvas:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, dtype=np.float64):
+        """
+        Initializes a black canvas.
+        Pixels are stored in one contiguous (height, width, 3) RGB buffer of
+        float32 or float64 values, i.e. 12 or 24 bytes per pixel.
+        """
         self.width = width
         self.height = height
         # Initialize canvas with black pixels
-        self.canvas = [[(0,0,0) for _ in range(width)] for _ in range(height)]
+        self._pixels = np.zeros((height, width, 3), dtype=dtype)
+        # Integer pixel data loaded from a file, decoded into pixels on first use
+        self.raw = None
+        self.maxval = 255
+
+    @property
+    def pixels(self):
+        """The (height, width, 3) float RGB buffer with components in [0, 1]."""
+        if self._pixels is None:
+            self._pixels = self.raw.astype(np.float64) / self.maxval
+        return self._pixels
+
+    @classmethod
+    def from_ppm(cls, path):
+        """
+        Loads a P3 or P6 PPM file into a new canvas.
+        P6 files are memory-mapped: canvas.raw is a read-only zero-copy
+        (height, width, 3) view of the file's pixel bytes, and the float
+        pixel buffer is only decoded if it is read or written.
+        Args:
+            path: The path of the PPM file.
+        Returns:
+            A new Canvas.
+        Raises:
+            ValueError: If the file is not a valid P3 or P6 image.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, height, maxval, offset = _read_ppm_header(data)
+        if not 0 < maxval < 65536:
+            raise ValueError("PPM maxval must be between 1 and 65535")
+        count = width * height * 3
+        if magic == b"P6":
+            dtype = np.dtype(np.uint8) if maxval < 256 else np.dtype(">u2")
+            if len(data) < offset + count * dtype.itemsize:
+                raise ValueError("PPM pixel data is truncated")
+            raw = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        elif magic == b"P3":
+            raw = np.array(bytes(data[offset:]).split(), dtype=np.int64)
+            data.close()
+            if len(raw) < count:
+                raise ValueError("PPM pixel data is truncated")
+            raw = raw[:count]
+            raw.flags.writeable = False
+        else:
+            raise ValueError("Only P3 and P6 PPM files are supported")
+        canvas = cls.__new__(cls)
+        canvas.width = width
+        canvas.height = height
+        canvas._pixels = None
+        canvas.raw = raw.reshape(height, width, 3)
+        canvas.maxval = maxval
+        return canvas
+
+    @property
+    def canvas(self):
+        """Returns a row-indexable view of the pixels, so canvas[y][x] gives an (r, g, b) tuple."""
+        return CanvasRows(self)
 
     def write_pixel(self, x: int, y: int, color: tuple):
         """Sets the color of a pixel at (x,y) on the canvas to the specified color."""
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.canvas[y][x] = color
+            if hasattr(color, "x"):
+                # Color objects store red, green and blue in x, y and z
+                color = (color.x, color.y, color.z)
+            self.pixels[y, x] = color
         else:
             raise ValueError("Pixel coordinates out of bounds")
 
+    def pixel_at(self, x: int, y: int) -> tuple:
+        """Returns the color of the pixel at (x,y) as an (r, g, b) tuple."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return tuple(self.pixels[y, x].tolist())
+        raise ValueError("Pixel coordinates out of bounds")
+
+    def write_rows(self, y: int, rows):
+        """
+        Overwrites whole rows starting at row y.
+        Args:
+            y: The first row to write.
+            rows: An array-like of shape (n, width, 3).
+        Raises:
+            ValueError: If the rows do not fit on the canvas.
+        """
+        rows = np.asarray(rows)
+        if rows.ndim != 3 or rows.shape[1:] != (self.width, 3):
+            raise ValueError("Rows must have shape (n, width, 3)")
+        if y < 0 or y + rows.shape[0] > self.height:
+            raise ValueError("Pixel coordinates out of bounds")
+        self.write_region(0, y, rows)
+
+    def write_region(self, x: int, y: int, region):
+        """
+        Overwrites a rectangular block of pixels whose top-left corner is (x,y).
+        Args:
+            x: The left column of the block.
+            y: The top row of the block.
+            region: An array-like of shape (h, w, 3).
+        Raises:
+            ValueError: If the block does not fit on the canvas.
+        """
+        region = np.asarray(region)
+        if region.ndim != 3 or region.shape[2] != 3:
+            raise ValueError("Region must have shape (h, w, 3)")
+        h, w = region.shape[:2]
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            raise ValueError("Pixel coordinates out of bounds")
+        self.pixels[y:y + h, x:x + w] = region
+
     def draw(self):
         """Prints text-based representation of the canvas."""
-        for row in self.canvas:
-            print(" ".join(f"{pixel}" for pixel in row))
+        for row in self._rows():
+            print(" ".join(f"{tuple(pixel)}" for pixel in row.tolist()))
 
     def scale_and_clamp(self, value: float) -> int:
         """Scales and clams the value to the range [0, 255]."""
@@ -26,27 +232,445 @@ class Canvas:
         """Scales and clamps the color tuple to the range [0, 255]."""
         return tuple(self.scale_and_clamp(c) for c in color)
     
+    def draw_points(self, xs, ys, color):
+        """
+        Writes a color to every pixel containing one of the points (xs[i], ys[i]).
+        Points off the canvas are skipped instead of raising.
+        Args:
+            xs: The x coordinates in pixels.
+            ys: The y coordinates in pixels.
+            color: One (r, g, b) color, or an (N, 3) array with one color per point.
+        """
+        x = np.floor(np.asarray(xs, dtype=np.float64)).astype(np.int64).ravel()
+        y = np.floor(np.asarray(ys, dtype=np.float64)).astype(np.int64).ravel()
+        colors = _colors(color, len(x))
+        inside = (0 <= x) & (x < self.width) & (0 <= y) & (y < self.height)
+        if colors.ndim == 2:
+            colors = colors[inside]
+        self._scatter(x[inside], y[inside], colors)
+
+    def draw_polyline(self, xs, ys, color, antialias=False):
+        """
+        Draws straight segments between consecutive vertices (xs[i], ys[i]).
+        Every segment is clipped to the canvas and rasterized with a DDA, and
+        all covered pixels are written in one pass. Segments with a NaN or
+        infinite vertex are skipped, like points off the canvas.
+        Args:
+            xs: The vertex x coordinates in pixels.
+            ys: The vertex y coordinates in pixels.
+            color: The (r, g, b) line color.
+            antialias: Whether to blend the line into the canvas with
+                Xiaolin Wu style coverage instead of writing solid pixels.
+        """
+        x = np.asarray(xs, dtype=np.float64).ravel()
+        y = np.asarray(ys, dtype=np.float64).ravel()
+        if len(x) != len(y):
+            raise ValueError("xs and ys must have the same length")
+        if len(x) == 1:
+            self.draw_points(x, y, color)
+            return
+        x0, y0, x1, y1 = _clip_segments(x[:-1], y[:-1], x[1:], y[1:], self.width, self.height)
+        if not antialias:
+            px, py, _ = _dda(x0, y0, x1, y1)
+            self.draw_points(px, py, color)
+            return
+        # Sample along the major axis from pixel centers; the minor axis
+        # position is split between the two nearest pixels
+        px, py, steep = _dda(x0 - 0.5, y0 - 0.5, x1 - 0.5, y1 - 0.5, centers=True)
+        minor = np.where(steep, px, py)
+        major = np.rint(np.where(steep, py, px))
+        low = np.floor(minor)
+        frac = minor - low
+        minor = np.concatenate([low, low + 1])
+        major = np.concatenate([major, major])
+        steep = np.concatenate([steep, steep])
+        coverage = np.concatenate([1 - frac, frac])
+        px = np.where(steep, minor, major).astype(np.int64)
+        py = np.where(steep, major, minor).astype(np.int64)
+        keep = (coverage > 0) & (0 <= px) & (px < self.width) & (0 <= py) & (py < self.height)
+        px, py, coverage = px[keep], py[keep], coverage[keep]
+        # Where samples overlap, keep the strongest coverage of each pixel
+        flat = py * self.width + px
+        order = np.lexsort((coverage, flat))
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = flat[order][1:] != flat[order][:-1]
+        order = order[last]
+        self._scatter(px[order], py[order], _colors(color, 1), coverage[order])
+
+    def _scatter(self, xs, ys, colors, alpha=None):
+        """
+        Writes colors to in-bounds integer pixel coordinates.
+        With alpha, each pixel becomes pixel * (1 - alpha) + color * alpha instead.
+        """
+        if alpha is None:
+            self.pixels[ys, xs] = colors
+        else:
+            alpha = alpha[:, None]
+            self.pixels[ys, xs] = self.pixels[ys, xs] * (1 - alpha) + colors * alpha
+
+    def _row(self, y):
+        """Returns row y as a (width, 3) array."""
+        return self.pixels[y]
+
+    def _rows(self):
+        """Yields the canvas rows from top to bottom as (width, 3) arrays."""
+        for y in range(self.height):
+            yield self._row(y)
+
+    def _ppm_row_lines(self, row):
+        """Returns the P3 text lines for one row, wrapped at 70 characters."""
+        scaled = quantize(row)
+        lines = []
+        current_line = ""
+        for value_str in map(str, scaled.ravel().tolist()):
+            # Check if adding this value would exceed 70 characters
+            if len(current_line) + len(value_str) + (1 if current_line else 0) > 70:
+                lines.append(current_line) # Append current line as is
+                current_line = value_str # Start a new line with the current value
+            else:
+                current_line += (" " if current_line else "") + value_str # Add space if not the first value
+        if current_line: # Append remaining values in the current line
+            lines.append(current_line)
+        return lines
+
     def pixel_to_ppm(self):
         """Converts pixel data to PPM string."""
         lines = []
-        for row in self.canvas:
-            current_line = ""
-            for pixel in row:
-                scaled = self.scale_and_clamp_color(pixel)
-                for component in scaled:
-                    value_str = str(component)
-                    # Check if adding this value would exceed 70 characters
-                    if len(current_line) + len(value_str) + (1 if current_line else 0) > 70:
-                        lines.append(current_line) # Append current line as is
-                        current_line = value_str # Start a new line with the current value
-                    else: 
-                        current_line += (" " if current_line else "") + value_str # Add space if not the first value
-            if current_line: # Append remaining values in the current line
-                lines.append(current_line)
+        for row in self._rows():
+            lines.extend(self._ppm_row_lines(row))
         return "\n".join(lines)
 
     def canvas_to_ppm(self):
         """Converts the canvas to PPM format."""
-        header = f"P3\n{self.width} {self.height}\n255"
-        body = self.pixel_to_ppm()
-        return header + "\n" + body + "\n"
\ No newline at end of file
+        out = io.StringIO()
+        self.write_ppm(out)
+        return out.getvalue()
+
+    def canvas_to_ppm_binary(self):
+        """Converts the canvas to binary (P6) PPM format."""
+        out = io.BytesIO()
+        self.write_ppm(out, binary=True)
+        return out.getvalue()
+
+    def save_ppm(self, path, binary=False):
+        """Writes the canvas to a PPM file at the given path, in P3 or P6 format."""
+        with open(path, "wb") as f:
+            self.write_ppm(f, binary=binary)
+
+    def _write_p6(self, fileobj):
+        """Writes the canvas in P6 format, quantizing the whole buffer in one pass."""
+        fileobj.write(f"P6\n{self.width} {self.height}\n255\n".encode("ascii"))
+        if self._pixels is None and self.raw.dtype == np.uint8 and self.maxval == 255:
+            # Untouched 8-bit data loaded from a file is written back as is
+            fileobj.write(memoryview(np.ascontiguousarray(self.raw)).cast("B"))
+        else:
+            fileobj.write(quantize(self.pixels).tobytes())
+
+    def write_ppm(self, fileobj, buffer_size=1 << 16, binary=False):
+        """
+        Writes the canvas to a file object in P3 format, row by row.
+        The output is identical to canvas_to_ppm(), but at most about
+        buffer_size characters are held in memory before being written.
+        With binary=True the canvas is written as P6 instead, which needs a
+        binary file object.
+        Args:
+            fileobj: A text or binary file object.
+            buffer_size: The number of characters to collect per write.
+            binary: Whether to write binary P6 instead of text P3.
+        Raises:
+            TypeError: If binary output is requested for a text file object.
+        """
+        if binary:
+            if isinstance(fileobj, io.TextIOBase):
+                raise TypeError("Binary PPM output needs a binary file object")
+            self._write_p6(fileobj)
+            return
+        write = fileobj.write
+        if not isinstance(fileobj, io.TextIOBase):
+            write = lambda text: fileobj.write(text.encode("ascii"))
+        write(f"P3\n{self.width} {self.height}\n255\n")
+        chunk = []
+        pending = 0
+        wrote_lines = False
+        for row in self._rows():
+            for line in self._ppm_row_lines(row):
+                chunk.append(line)
+                pending += len(line) + 1
+                wrote_lines = True
+            if pending >= buffer_size:
+                chunk.append("")
+                write("\n".join(chunk))
+                chunk = []
+                pending = 0
+        if chunk:
+            chunk.append("")
+            write("\n".join(chunk))
+        if not wrote_lines:
+            # An image without pixel values still ends with an empty body line
+            write("\n")
+
+
+class TiledCanvas(Canvas):
+    """
+    A canvas for images too large to keep in memory.
+    The image is split into tile_size x tile_size tiles stored in a
+    memory-mapped scratch file. At most cache_tiles tiles are held in memory
+    at once; the least recently used tile is written back to the scratch
+    file when another one is needed. Pixel access and the PPM exporters work
+    across tiles, so memory use is bounded by the cache, not the image.
+    """
+    def __init__(self, width: int, height: int, tile_size=256, cache_tiles=64,
+                 dtype=np.float64, scratch_dir=None):
+        """
+        Initializes a black tiled canvas.
+        Args:
+            width: The image width in pixels.
+            height: The image height in pixels.
+            tile_size: The width and height of one tile in pixels.
+            cache_tiles: The maximum number of tiles kept in memory.
+            dtype: The float type of the pixel components.
+            scratch_dir: The directory for the scratch file (default: system temp dir).
+        """
+        if tile_size <= 0 or cache_tiles <= 0:
+            raise ValueError("Tile size and cache size must be positive integers")
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.cache_tiles = cache_tiles
+        self.tiles_x = -(-width // tile_size)
+        self.tiles_y = -(-height // tile_size)
+        self.raw = None
+        self.maxval = 255
+        self._scratch = tempfile.TemporaryFile(dir=scratch_dir)
+        # The scratch file starts out sparse and zero-filled, i.e. black
+        self._store = np.memmap(self._scratch, dtype=dtype, mode="w+",
+                                shape=(self.tiles_y, self.tiles_x, tile_size, tile_size, 3))
+        # (ty, tx) -> [tile array, dirty flag], least recently used first
+        self._cache = OrderedDict()
+
+    @property
+    def pixels(self):
+        """
+        Returns a read-only copy of the whole image; this materializes it in
+        memory. Write pixels with write_pixel or write_region instead.
+        """
+        self.flush()
+        ts = self.tile_size
+        image = self._store.transpose(0, 2, 1, 3, 4).reshape(self.tiles_y * ts, self.tiles_x * ts, 3)
+        image = np.array(image[:self.height, :self.width])
+        image.flags.writeable = False
+        return image
+
+    def _tile(self, ty, tx, dirty=False):
+        """Returns the cached tile at (ty, tx), loading it and evicting the oldest tile if needed."""
+        key = (ty, tx)
+        entry = self._cache.get(key)
+        if entry is None:
+            if len(self._cache) >= self.cache_tiles:
+                (old_ty, old_tx), (old_tile, old_dirty) = self._cache.popitem(last=False)
+                if old_dirty:
+                    self._store[old_ty, old_tx] = old_tile
+            entry = self._cache[key] = [np.array(self._store[ty, tx]), False]
+        else:
+            self._cache.move_to_end(key)
+        if dirty:
+            entry[1] = True
+        return entry[0]
+
+    def flush(self):
+        """Writes every modified cached tile back to the scratch file."""
+        for (ty, tx), entry in self._cache.items():
+            if entry[1]:
+                self._store[ty, tx] = entry[0]
+                entry[1] = False
+        self._store.flush()
+
+    def close(self):
+        """Releases the tile cache and deletes the scratch file."""
+        self._cache.clear()
+        self._store = None
+        self._scratch.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_pixel(self, x: int, y: int, color: tuple):
+        """Sets the color of a pixel at (x,y) on the canvas to the specified color."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if hasattr(color, "x"):
+                color = (color.x, color.y, color.z)
+            ts = self.tile_size
+            self._tile(y // ts, x // ts, dirty=True)[y % ts, x % ts] = color
+        else:
+            raise ValueError("Pixel coordinates out of bounds")
+
+    def pixel_at(self, x: int, y: int) -> tuple:
+        """Returns the color of the pixel at (x,y) as an (r, g, b) tuple."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            ts = self.tile_size
+            return tuple(self._tile(y // ts, x // ts)[y % ts, x % ts].tolist())
+        raise ValueError("Pixel coordinates out of bounds")
+
+    def write_region(self, x: int, y: int, region):
+        """Overwrites a rectangular block of pixels, splitting it across tiles."""
+        region = np.asarray(region)
+        if region.ndim != 3 or region.shape[2] != 3:
+            raise ValueError("Region must have shape (h, w, 3)")
+        h, w = region.shape[:2]
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            raise ValueError("Pixel coordinates out of bounds")
+        ts = self.tile_size
+        for ty in range(y // ts, -(-(y + h) // ts)):
+            y0 = max(y, ty * ts)
+            y1 = min(y + h, (ty + 1) * ts)
+            for tx in range(x // ts, -(-(x + w) // ts)):
+                x0 = max(x, tx * ts)
+                x1 = min(x + w, (tx + 1) * ts)
+                tile = self._tile(ty, tx, dirty=True)
+                tile[y0 - ty * ts:y1 - ty * ts, x0 - tx * ts:x1 - tx * ts] = region[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    def _scatter(self, xs, ys, colors, alpha=None):
+        """Writes colors to in-bounds pixel coordinates, one tile at a time."""
+        ts = self.tile_size
+        tile_ids = (ys // ts) * self.tiles_x + xs // ts
+        order = np.argsort(tile_ids, kind="stable")
+        bounds = np.flatnonzero(np.diff(tile_ids[order])) + 1
+        per_point = np.ndim(colors) == 2
+        for group in np.split(order, bounds):
+            if not len(group):
+                continue
+            ty, tx = divmod(int(tile_ids[group[0]]), self.tiles_x)
+            tile = self._tile(ty, tx, dirty=True)
+            gy, gx = ys[group] % ts, xs[group] % ts
+            c = colors[group] if per_point else colors
+            if alpha is None:
+                tile[gy, gx] = c
+            else:
+                a = alpha[group][:, None]
+                tile[gy, gx] = tile[gy, gx] * (1 - a) + c * a
+
+    def _row(self, y):
+        """Returns row y as a (width, 3) array, reading modified tiles from the cache."""
+        ts = self.tile_size
+        ty, ry = divmod(y, ts)
+        row = np.array(self._store[ty, :, ry])
+        for (cached_ty, tx), (tile, dirty) in self._cache.items():
+            if dirty and cached_ty == ty:
+                row[tx] = tile[ry]
+        return row.reshape(self.tiles_x * ts, 3)[:self.width]
+
+    def _rows(self):
+        """Yields the canvas rows from top to bottom, flushing cached tiles first."""
+        self.flush()
+        for y in range(self.height):
+            yield self._row(y)
+
+    def _write_p6(self, fileobj):
+        """Writes the canvas in P6 format one row at a time."""
+        fileobj.write(f"P6\n{self.width} {self.height}\n255\n".encode("ascii"))
+        for row in self._rows():
+            fileobj.write(quantize(row).tobytes())
+
+
+class SharedCanvas(Canvas):
+    """
+    A canvas whose pixel buffer lives in a multiprocessing.shared_memory
+    block, so several processes can write pixels of the same image without
+    copying. The creating process owns the block and removes it on close();
+    other processes attach to it by name.
+    """
+    def __init__(self, width: int, height: int, name=None, dtype=np.float64):
+        """
+        Creates a black shared canvas, or attaches to an existing one.
+        Args:
+            width: The image width in pixels.
+            height: The image height in pixels.
+            name: The name of a block to attach to (default: create a new one).
+            dtype: The float type of the pixel components; must match when attaching.
+        """
+        self.width = width
+        self.height = height
+        self.raw = None
+        self.maxval = 255
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        size = width * height * 3 * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self._pixels = np.ndarray((height, width, 3), dtype=self.dtype, buffer=self._shm.buf)
+        if self.owner:
+            self._pixels.fill(0)
+
+    @property
+    def name(self):
+        """The name other processes use to attach to the buffer."""
+        return self._shm.name
+
+    def to_canvas(self):
+        """Returns a regular Canvas holding a copy of the pixels."""
+        canvas = Canvas(self.width, self.height, dtype=self.dtype)
+        canvas._pixels[...] = self._pixels
+        return canvas
+
+    def close(self):
+        """Detaches from the shared block, and removes it if this canvas created it."""
+        if self._shm is None:
+            return
+        # The NumPy view must go before the block can be closed
+        self._pixels = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CanvasRows:
+    """
+    Read/write view of a Canvas as a sequence of rows of (r, g, b) tuples.
+    It keeps canvas.canvas[y][x] indexing working on top of the flat buffer.
+    """
+    def __init__(self, canvas):
+        self._canvas = canvas
+
+    def __len__(self):
+        return self._canvas.height
+
+    def __getitem__(self, y):
+        if y < -self._canvas.height or y >= self._canvas.height:
+            raise IndexError("Row index out of range")
+        return CanvasRow(self._canvas, y % self._canvas.height)
+
+    def __iter__(self):
+        return (CanvasRow(self._canvas, y) for y in range(self._canvas.height))
+
+
+class CanvasRow:
+    """Read/write view of one canvas row; pixels are returned as (r, g, b) tuples."""
+    def __init__(self, canvas, y):
+        self._canvas = canvas
+        self._y = y
+
+    def __len__(self):
+        return self._canvas.width
+
+    def _column(self, x):
+        if x < -self._canvas.width or x >= self._canvas.width:
+            raise IndexError("Column index out of range")
+        return x % self._canvas.width
+
+    def __getitem__(self, x):
+        return self._canvas.pixel_at(self._column(x), self._y)
+
+    def __setitem__(self, x, color):
+        self._canvas.write_pixel(self._column(x), self._y, color)
+
+    def __iter__(self):
+        return (tuple(pixel) for pixel in self._canvas._row(self._y).tolist())
@@ -0,0 +1,211 @@
+import os
+import struct
+import time
+import numpy as np
+from core.render import TileRenderer
+
+# File layout: header, tile bitmap (one bit per tile in row-major tile grid
+# order), zero padding up to PIXEL_ALIGNMENT, then the (height, width, 3)
+# pixel buffer in the stored dtype.
+MAGIC = b"RTCKPT01"
+HEADER = struct.Struct("<8sIIIB3x")
+PIXEL_ALIGNMENT = 64
+DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f8")}
+
+
+class Checkpoint:
+    """
+    A render checkpoint: a pixel buffer plus a bitmap of finished tiles in
+    one memory-mapped file.
+    The file is created atomically (written under a temporary name, then
+    renamed), and updated in place: update() copies only tiles finished
+    since the last update, flushes their pixels and only then sets their
+    bits in the bitmap. A tile is therefore never marked finished in the
+    file before its pixels are, so a checkpoint interrupted at any point is
+    still consistent, and each update writes roughly the changed tiles.
+    Attributes:
+        path: The checkpoint file.
+        width, height, tile_size: The image and tile geometry.
+        tiles_x, tiles_y: The tile grid size.
+        pixels: The memory-mapped (height, width, 3) pixel buffer.
+    """
+
+    def __init__(self, path, width, height, tile_size, dtype_code, mode):
+        """Maps an existing checkpoint file; use create() or open()."""
+        self.path = path
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles_x = -(-width // tile_size)
+        self.tiles_y = -(-height // tile_size)
+        self.dtype = DTYPES[dtype_code]
+        bitmap_size = -(-self.tiles_x * self.tiles_y // 8)
+        pixel_offset = -(-(HEADER.size + bitmap_size) // PIXEL_ALIGNMENT) * PIXEL_ALIGNMENT
+        self._bitmap = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER.size, shape=(bitmap_size,))
+        self.pixels = np.memmap(path, dtype=self.dtype, mode=mode, offset=pixel_offset,
+                                shape=(height, width, 3))
+
+    @staticmethod
+    def _layout_size(width, height, tile_size, dtype):
+        """Returns the total file size for an image geometry."""
+        tiles = -(-width // tile_size) * -(-height // tile_size)
+        pixel_offset = -(-(HEADER.size + -(-tiles // 8)) // PIXEL_ALIGNMENT) * PIXEL_ALIGNMENT
+        return pixel_offset + width * height * 3 * dtype.itemsize
+
+    @classmethod
+    def create(cls, path, width, height, tile_size, dtype=np.float32):
+        """
+        Creates an empty checkpoint, replacing any existing file atomically.
+        Args:
+            path: The checkpoint file.
+            width: The image width in pixels.
+            height: The image height in pixels.
+            tile_size: The tile size the renderer uses.
+            dtype: np.float32 (compact) or np.float64 (exact) pixel storage.
+        Raises:
+            ValueError: If the dtype is not supported.
+        """
+        dtype = np.dtype(dtype).newbyteorder("<")
+        codes = {value: key for key, value in DTYPES.items()}
+        if dtype not in codes:
+            raise ValueError("Checkpoint pixels must be float32 or float64")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, width, height, tile_size, codes[dtype]))
+            # The rest stays sparse and zero-filled: no tiles done, black pixels
+            f.truncate(cls._layout_size(width, height, tile_size, dtype))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+        return cls(path, width, height, tile_size, codes[dtype], "r+")
+
+    @classmethod
+    def open(cls, path, mode="r+"):
+        """
+        Opens an existing checkpoint.
+        Raises:
+            ValueError: If the file is not a valid checkpoint.
+        """
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("Checkpoint file is truncated")
+        magic, width, height, tile_size, dtype_code = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not a checkpoint file")
+        if dtype_code not in DTYPES:
+            raise ValueError("Unsupported checkpoint pixel type")
+        if os.path.getsize(path) != cls._layout_size(width, height, tile_size, DTYPES[dtype_code]):
+            raise ValueError("Checkpoint file is truncated")
+        return cls(path, width, height, tile_size, dtype_code, mode)
+
+    def matches(self, width, height, tile_size):
+        """Returns True if the checkpoint was made for this image and tile geometry."""
+        return (self.width, self.height, self.tile_size) == (width, height, tile_size)
+
+    @property
+    def done(self):
+        """A (tiles_y * tiles_x,) boolean array of finished tiles in row-major grid order."""
+        return np.unpackbits(self._bitmap, count=self.tiles_x * self.tiles_y).astype(bool)
+
+    def tile_index(self, x0, y0):
+        """Returns the grid index of the tile whose top-left pixel is (x0, y0)."""
+        return (y0 // self.tile_size) * self.tiles_x + x0 // self.tile_size
+
+    def tile_rect(self, index):
+        """Returns the (x0, y0, x1, y1) rectangle of the tile with a grid index."""
+        ty, tx = divmod(int(index), self.tiles_x)
+        x0, y0 = tx * self.tile_size, ty * self.tile_size
+        return x0, y0, min(x0 + self.tile_size, self.width), min(y0 + self.tile_size, self.height)
+
+    def update(self, pixels, done):
+        """
+        Records newly finished tiles.
+        Args:
+            pixels: The (height, width, 3) image being rendered.
+            done: A boolean array of finished tiles in grid order.
+        Returns:
+            The number of tiles written.
+        """
+        done = np.asarray(done, dtype=bool)
+        new = np.flatnonzero(done & ~self.done)
+        if len(new) == 0:
+            return 0
+        for index in new:
+            x0, y0, x1, y1 = self.tile_rect(index)
+            self.pixels[y0:y1, x0:x1] = pixels[y0:y1, x0:x1]
+        # Pixels must be on disk before the bitmap says they are done
+        self.pixels.flush()
+        self._bitmap[:] = np.packbits(done | self.done)
+        self._bitmap.flush()
+        return len(new)
+
+    def close(self):
+        """Flushes and unmaps the file."""
+        if self.pixels is None:
+            return
+        self._bitmap.flush()
+        self.pixels.flush()
+        self._bitmap = None
+        self.pixels = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_with_checkpoints(path, width, height, sample, tile_size=32, workers=None, curve="hilbert",
+                            interval=30.0, resume=True, dtype=np.float32):
+    """
+    Renders an image with a TileRenderer, checkpointing finished tiles to
+    path every interval seconds and when the render ends or fails.
+    Args:
+        path: The checkpoint file.
+        width, height: The image size in pixels.
+        sample: The sample function, see TileRenderer.
+        tile_size, workers, curve: Passed on to TileRenderer.
+        interval: Seconds between checkpoints.
+        resume: If True and path holds a checkpoint for the same geometry,
+            its finished tiles are loaded and not rendered again; otherwise
+            a new checkpoint replaces it.
+        dtype: The checkpoint pixel storage type, see Checkpoint.create.
+    Returns:
+        The finished image as a Canvas.
+    """
+    checkpoint = None
+    if resume and os.path.exists(path):
+        try:
+            checkpoint = Checkpoint.open(path)
+        except ValueError:
+            checkpoint = None
+        if checkpoint is not None and not checkpoint.matches(width, height, tile_size):
+            checkpoint.close()
+            checkpoint = None
+    if checkpoint is None:
+        checkpoint = Checkpoint.create(path, width, height, tile_size, dtype)
+
+    with checkpoint, TileRenderer(width, height, sample, tile_size, workers, curve) as renderer:
+        # Map the renderer's curve-ordered tiles onto the checkpoint's grid order
+        grid = checkpoint.tile_index(renderer.tiles[:, 0], renderer.tiles[:, 1])
+        renderer.canvas.pixels[...] = checkpoint.pixels
+        renderer.done[:] = checkpoint.done[grid]
+        done = np.zeros(len(grid), dtype=bool)
+        last_save = time.perf_counter()
+
+        def save():
+            nonlocal last_save
+            done[grid] = renderer.done.astype(bool)
+            checkpoint.update(renderer.canvas.pixels, done)
+            last_save = time.perf_counter()
+
+        def on_progress(renderer):
+            if time.perf_counter() - last_save >= interval:
+                save()
+
+        try:
+            renderer.render(on_progress=on_progress, poll_interval=min(interval, 1.0))
+        finally:
+            save()
+        return renderer.canvas.to_canvas()
@@ -0,0 +1,197 @@
+import functools
+import importlib
+import time
+from contextlib import contextmanager
+
+# Methods wrapped when instrumentation is enabled, by module and class.
+# Only names defined on the class itself are wrapped, so an override in a
+# subclass (e.g. Matrix4.inverse) is reported under the subclass name.
+TARGETS = {
+    "core.tuples": {
+        "Tuple": ("__init__", "add", "subtract", "negate", "multiply", "divide",
+                  "magnitude", "normalize", "dot", "cross", "__iadd__", "__isub__",
+                  "__imul__", "__itruediv__"),
+        "Point": ("__init__",),
+        "Vector": ("__init__",),
+        "Color": ("__init__", "add", "subtract", "multiply", "multiply_color"),
+        "Projectile": ("tick", "step"),
+        "TupleArray": ("add", "subtract", "multiply", "divide", "magnitude",
+                       "normalize", "dot", "cross"),
+    },
+    "core.matrices": {
+        "Matrix": ("__init__", "copy", "multiply", "tuple_multiply", "identity",
+                   "transpose", "determinant", "submatrix", "minor", "cofactor",
+                   "inverse", "lu_decomposition", "solve", "__mul__", "scale",
+                   "transform_many"),
+        "Matrix4": ("multiply", "identity", "transpose", "determinant", "inverse",
+                    "scale"),
+        "LUDecomposition": ("__init__", "determinant", "solve"),
+        "Transform": ("matrix", "inverse", "inverse_transpose", "transform_many"),
+    },
+    "core.canvas": {
+        "Canvas": ("__init__", "from_ppm", "write_pixel", "pixel_at", "write_region",
+                   "draw_points", "draw_polyline", "write_ppm"),
+        "TiledCanvas": ("write_pixel", "pixel_at", "write_region", "flush"),
+    },
+}
+
+_stats = {}
+_patched = []
+
+
+class OperationStats:
+    """
+    Call count and accumulated wall time for one instrumented method.
+    Times are inclusive: a call to Matrix.inverse also includes the time of
+    the cofactor calls it makes.
+    """
+
+    def __init__(self, calls=0, seconds=0.0):
+        self.calls = calls
+        self.seconds = seconds
+
+    @property
+    def per_call(self):
+        """Returns the mean time per call in seconds."""
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def __sub__(self, other):
+        return OperationStats(self.calls - other.calls, self.seconds - other.seconds)
+
+    def __eq__(self, other):
+        if not isinstance(other, OperationStats):
+            return NotImplemented
+        return self.calls == other.calls and self.seconds == other.seconds
+
+    def __repr__(self):
+        return f"OperationStats(calls={self.calls}, seconds={self.seconds:.6f})"
+
+
+def _wrap(name, func):
+    """Returns func wrapped so that each call updates the counters for name."""
+    stat = _stats.setdefault(name, [0, 0.0])
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stat[0] += 1
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stat[1] += clock() - start
+    return wrapper
+
+
+def enable():
+    """
+    Starts counting calls to every method listed in TARGETS.
+    The methods are wrapped in place, so while disabled they run exactly as
+    written and instrumentation costs nothing. Calling enable twice is a no-op.
+    Note that this patches the classes in core.tuples, core.matrices and
+    core.canvas; scripts importing those files under another module name
+    (such as projectile_sim.py) are not affected.
+    """
+    if _patched:
+        return
+    for module_name, classes in TARGETS.items():
+        module = importlib.import_module(module_name)
+        for class_name, names in classes.items():
+            cls = getattr(module, class_name)
+            for name in names:
+                original = cls.__dict__.get(name)
+                if original is None:
+                    continue
+                label = f"{class_name}.{name}"
+                if isinstance(original, classmethod):
+                    wrapped = classmethod(_wrap(label, original.__func__))
+                elif isinstance(original, staticmethod):
+                    wrapped = staticmethod(_wrap(label, original.__func__))
+                else:
+                    wrapped = _wrap(label, original)
+                setattr(cls, name, wrapped)
+                _patched.append((cls, name, original))
+
+
+def disable():
+    """Restores the original methods. Collected counts are kept until reset()."""
+    while _patched:
+        cls, name, original = _patched.pop()
+        setattr(cls, name, original)
+
+
+def is_enabled():
+    """Returns True if instrumentation is currently active."""
+    return bool(_patched)
+
+
+def reset():
+    """Zeroes all counters."""
+    for stat in _stats.values():
+        stat[0] = 0
+        stat[1] = 0.0
+
+
+def snapshot():
+    """Returns a dict mapping "Class.method" to OperationStats for every method called so far."""
+    return {name: OperationStats(calls, seconds)
+            for name, (calls, seconds) in _stats.items() if calls}
+
+
+def difference(after, before):
+    """Returns the per-method stats accumulated between two snapshots."""
+    stats = {}
+    for name, stat in after.items():
+        delta = stat - before.get(name, OperationStats())
+        if delta.calls:
+            stats[name] = delta
+    return stats
+
+
+def report(stats=None):
+    """
+    Formats stats (the current snapshot by default) as a table sorted by
+    total time, slowest first.
+    """
+    if stats is None:
+        stats = snapshot()
+    lines = [f"{'operation':<32}{'calls':>12}{'total ms':>12}{'us/call':>10}"]
+    for name, stat in sorted(stats.items(), key=lambda item: item[1].seconds, reverse=True):
+        lines.append(f"{name:<32}{stat.calls:>12}{stat.seconds * 1e3:>12.3f}{stat.per_call * 1e6:>10.3f}")
+    return "\n".join(lines)
+
+
+class Measurement:
+    """The result of a measure() block; stats is filled in when the block exits."""
+
+    def __init__(self):
+        self.stats = {}
+
+    def report(self):
+        """Formats the collected stats as a table."""
+        return report(self.stats)
+
+
+@contextmanager
+def measure():
+    """
+    Context manager that collects stats for the calls made inside the block,
+    e.g. for a single frame:
+
+        with measure() as frame:
+            render(...)
+        print(frame.report())
+
+    Instrumentation is enabled for the block if it was not already, and
+    disabled again afterwards. Blocks may be nested.
+    """
+    was_enabled = is_enabled()
+    enable()
+    measurement = Measurement()
+    before = snapshot()
+    try:
+        yield measurement
+    finally:
+        measurement.stats = difference(snapshot(), before)
+        if not was_enabled:
+            disable()
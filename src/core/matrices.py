@@ -1,32 +1,235 @@
 import math
-from core.tuples import Tuple, Point, Vector
+from array import array
+import numpy as np
+from core.tuples import Tuple, Point, Vector, TupleArray, _wrap
+
+# Matrices larger than this use LU factorization instead of cofactor expansion
+LU_THRESHOLD = 4
+# Relative tolerance under which a pivot or determinant is treated as zero
+SINGULAR_TOLERANCE = 1e-12
+
+def is_singular(det, rows):
+    """
+    Returns True if a determinant is negligible relative to the matrix.
+    By Hadamard's inequality |det| is at most the product of the row norms,
+    and also of the column norms; the smaller bound is used, so the test
+    does not depend on how rows or columns are scaled and an affine matrix
+    with a large translation is as invertible as one without.
+    Args:
+        det: The determinant.
+        rows: The rows of the matrix, as sequences of numbers.
+    """
+    rows = [list(row) for row in rows]
+    row_bound = math.prod(math.hypot(*row) for row in rows)
+    col_bound = math.prod(math.hypot(*col) for col in zip(*rows))
+    return abs(det) <= SINGULAR_TOLERANCE * min(row_bound, col_bound)
+
+
+def _snap_w(w):
+    """Snaps w components in place to exactly 1.0 where they are close, as __mul__ does."""
+    w[np.isclose(w, 1.0, rtol=1e-9, atol=0.0)] = 1.0
+
+
+class LUDecomposition:
+    """
+    An LU factorization with partial pivoting, P * A = L * U.
+    L (unit lower triangular) and U are packed into one square list of rows.
+    """
+    def __init__(self, matrix):
+        """Factorizes the given square matrix."""
+        if matrix.rows != matrix.cols:
+            raise ValueError("LU decomposition is only defined for square matrices")
+        n = matrix.rows
+        a = [[float(v) for v in matrix[i]] for i in range(n)]
+        # Pivots are compared with the magnitude of their own column, so a
+        # column of large entries (e.g. a translation) does not make the
+        # others look negligible
+        tolerances = [SINGULAR_TOLERANCE * max(abs(row[k]) for row in a) for k in range(n)]
+        perm = list(range(n))
+        sign = 1
+        singular = False
+        for k in range(n):
+            p = max(range(k, n), key=lambda i: abs(a[i][k]))
+            if abs(a[p][k]) <= tolerances[k]:
+                singular = True
+                continue
+            if p != k:
+                a[k], a[p] = a[p], a[k]
+                perm[k], perm[p] = perm[p], perm[k]
+                sign = -sign
+            pivot_row = a[k]
+            pivot = pivot_row[k]
+            for i in range(k + 1, n):
+                row = a[i]
+                factor = row[k] / pivot
+                row[k] = factor
+                if factor:
+                    for j in range(k + 1, n):
+                        row[j] -= factor * pivot_row[j]
+        self.size = n
+        self.lu = a
+        self.perm = perm
+        self.sign = sign
+        self.singular = singular
+
+    def determinant(self):
+        """Returns the determinant as the signed product of the pivots."""
+        if self.singular:
+            return 0.0
+        det = float(self.sign)
+        for i in range(self.size):
+            det *= self.lu[i][i]
+        return det
+
+    def solve(self, b):
+        """
+        Solves A * x = b for a single right-hand side.
+        Args:
+            b: A sequence of `size` numbers.
+        Returns:
+            The solution as a list of floats.
+        Raises:
+            ValueError: If the matrix is singular or b has the wrong length.
+        """
+        if self.singular:
+            raise ValueError("Matrix is not invertible")
+        n = self.size
+        if len(b) != n:
+            raise ValueError("Right-hand side length must match the matrix size")
+        lu = self.lu
+        # Forward substitution with the permuted right-hand side
+        y = [float(b[p]) for p in self.perm]
+        for i in range(n):
+            row = lu[i]
+            y[i] -= sum(row[k] * y[k] for k in range(i))
+        # Back substitution
+        for i in range(n - 1, -1, -1):
+            row = lu[i]
+            y[i] = (y[i] - sum(row[k] * y[k] for k in range(i + 1, n))) / row[i]
+        return y
+
 
 class Matrix:
+    """
+    A rows x cols matrix stored in a single flat array('d') buffer.
+    Element (i, j) lives at buffer[row_offsets[i] + col_offsets[j]], so
+    transpose() and submatrix() can return views that share the buffer by
+    rearranging the offsets. A matrix copies its buffer the first time it is
+    written to while the buffer is shared.
+    """
+    # Cached LU factorization and the matrix version it was computed from
+    _lu = None
+    _lu_version = None
+    # Cached MatrixRow views, one per row, created on first access
+    _row_views = None
+
     def __init__(self, rows, cols):
         """Initializes a matrix with the given number of rows and columns."""
         if rows <= 0 or cols <= 0:
             raise ValueError("Matrix dimensions must be positive integers")
         self.rows = rows
         self.cols = cols
-        self.data = [[0 for _ in range(cols)] for _ in range(rows)]
+        self._buf = array("d", bytes(8 * rows * cols))
+        self._row_offsets = tuple(range(0, rows * cols, cols))
+        self._col_offsets = tuple(range(cols))
+        self._shared = False
+        self._version = 0
+
+    @classmethod
+    def _from_buffer(cls, rows, cols, buf):
+        """Creates a contiguous matrix that takes ownership of a row-major buffer."""
+        result = cls.__new__(cls)
+        result.rows = rows
+        result.cols = cols
+        result._buf = buf
+        result._row_offsets = tuple(range(0, rows * cols, cols))
+        result._col_offsets = tuple(range(cols))
+        result._shared = False
+        result._version = 0
+        return result
+
+    def _view(self, rows, cols, row_offsets, col_offsets):
+        """Returns a matrix that shares this matrix's buffer under new offsets."""
+        view = Matrix.__new__(Matrix)
+        view.rows = rows
+        view.cols = cols
+        view._buf = self._buf
+        view._row_offsets = row_offsets
+        view._col_offsets = col_offsets
+        view._shared = True
+        view._version = 0
+        self._shared = True
+        return view
+
+    def _flat(self):
+        """Returns the elements in row-major order."""
+        buf = self._buf
+        return [buf[r + c] for r in self._row_offsets for c in self._col_offsets]
+
+    def _detach(self):
+        """Copies the elements into a private contiguous buffer."""
+        self._buf = array("d", self._flat())
+        self._row_offsets = tuple(range(0, self.rows * self.cols, self.cols))
+        self._col_offsets = tuple(range(self.cols))
+        self._shared = False
+
+    def _get(self, row, col):
+        """Returns the element at the given row and column."""
+        return self._buf[self._row_offsets[row] + self._col_offsets[col]]
+
+    def _set(self, row, col, value):
+        """Sets the element at the given row and column, copying a shared buffer first."""
+        if self._shared:
+            self._detach()
+        self._buf[self._row_offsets[row] + self._col_offsets[col]] = value
+        self._version += 1
 
     def __getitem__(self, index):
-        """Returns the row at the given index."""
-        return self.data[index]
+        """Returns a live view of the row at the given index."""
+        if index < -self.rows or index >= self.rows:
+            raise IndexError("Row index out of range")
+        index %= self.rows
+        views = self._row_views
+        if views is None:
+            views = self._row_views = [None] * self.rows
+        view = views[index]
+        if view is None:
+            view = views[index] = MatrixRow(self, index)
+        return view
     
     def __setitem__(self, index, value):
-        """Sets the row at the given index."""
-        if (len(value) != self.cols):
+        """
+        Sets the row at the given index.
+        Like replacing a row list, this detaches the previous row object: it
+        keeps the old values, so m[0], m[1] = m[1], m[0] swaps the rows.
+        """
+        if index < -self.rows or index >= self.rows:
+            raise IndexError("Row index out of range")
+        index %= self.rows
+        # Read the new values before the old row is touched; value may be a view of it
+        values = list(value)
+        if (len(values) != self.cols):
             raise ValueError("Row length must match the number of columns")
-        self.data[index] = value
+        views = self._row_views
+        if views is not None and views[index] is not None:
+            views[index]._detach()
+            views[index] = None
+        for j, v in enumerate(values):
+            self._set(index, j, v)
 
     def set_values(self, values):
         """Set matrix values from a 2D list of the same dimensions."""
         if len(values) != self.rows or any(len(row) != self.cols for row in values):
             raise ValueError("Input dimensions do not match the matrix size")
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.data[i][j] = values[i][j]
+        self._buf = array("d", [value for row in values for value in row])
+        self._row_offsets = tuple(range(0, self.rows * self.cols, self.cols))
+        self._col_offsets = tuple(range(self.cols))
+        self._shared = False
+        self._version += 1
+
+    def copy(self):
+        """Returns an independent copy of the matrix."""
+        return type(self)._from_buffer(self.rows, self.cols, array("d", self._flat()))
 
     def compare(self, other, epsilon=1e-5):
         """Compares two matrices for equality."""
@@ -34,7 +237,7 @@ class Matrix:
             return False
         for i in range(self.rows):
             for j in range(self.cols):
-                if not math.isclose(self.data[i][j], other.data[i][j], abs_tol=epsilon):
+                if not math.isclose(self._get(i, j), other._get(i, j), abs_tol=epsilon):
                     return False
         return True
 
@@ -42,11 +245,10 @@ class Matrix:
         """Multiplies two matrices."""
         if (self.cols != other.rows):
             raise ValueError("Number of columns in the first matrix must match the number of rows in the second matrix")
-        result = Matrix(self.rows, other.cols)
-        for i in range(self.rows):
-            for j in range(other.cols):
-                result[i][j] = sum(self[i][k] * other[k][j] for k in range(self.cols))
-        return result
+        a = [[self._get(i, k) for k in range(self.cols)] for i in range(self.rows)]
+        b = [[other._get(k, j) for k in range(other.rows)] for j in range(other.cols)]
+        values = array("d", [sum(x * y for x, y in zip(row, col)) for row in a for col in b])
+        return Matrix._from_buffer(self.rows, other.cols, values)
     
     def tuple_multiply(self, tuple):
         """Multiplies a matrix by a tuple."""
@@ -54,7 +256,7 @@ class Matrix:
             raise ValueError("Number of columns in the matrix must match the length of the tuple")
         result = Matrix(self.rows, 1)
         for i in range(self.rows):
-            result[i][0] = sum(self[i][j] * tuple[j] for j in range(self.cols))
+            result[i][0] = sum(self._get(i, j) * tuple[j] for j in range(self.cols))
         return result
     
     @classmethod
@@ -68,34 +270,32 @@ class Matrix:
         return identity_matrix
 
     def transpose(self):
-        """Transposes the matrix."""
-        transposed = Matrix(self.cols, self.rows)
-        for i in range(self.rows):
-            for j in range(self.cols):
-                transposed[j][i] = self[i][j]
-        return transposed
+        """Returns the transposed matrix as a view sharing this matrix's buffer."""
+        return self._view(self.cols, self.rows, self._col_offsets, self._row_offsets)
     
     def determinant(self):
         """Calculates the determinant of a matrix."""
         if self.rows < 2 or self.cols < 2:
             raise ValueError("Determinant is only defined for 2x2 matrices")
         if (self.rows == 2 and self.cols == 2):
-            return self[0][0] * self[1][1] - self[0][1] * self[1][0]
+            return self._get(0, 0) * self._get(1, 1) - self._get(0, 1) * self._get(1, 0)
+        if self.rows > LU_THRESHOLD:
+            return self.lu_decomposition().determinant()
         det = 0
         for c in range(self.cols):
-            det += self[0][c] * self.cofactor(0, c)
+            det += self._get(0, c) * self.cofactor(0, c)
         return det
     
     def submatrix(self, row, col):
-        """Returns the submatrix obtained by removing the specified row and column."""
-        if row < 0 or row > self.rows or col < 0 or col > self.cols:
+        """
+        Returns the submatrix obtained by removing the specified row and column.
+        The submatrix is a view sharing this matrix's buffer.
+        """
+        if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
             raise ValueError("Row and column indices must be within the matrix dimensions")
-        submatrix = Matrix(self.rows - 1, self.cols - 1)
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if i != row and j != col:
-                    submatrix[i - (i > row)][j - (j > col)] = self[i][j]
-        return submatrix
+        rows = self._row_offsets[:row] + self._row_offsets[row + 1:]
+        cols = self._col_offsets[:col] + self._col_offsets[col + 1:]
+        return self._view(self.rows - 1, self.cols - 1, rows, cols)
     
     def minor(self, row, col):
         """Calculates the minor of the matrix at the specified row and column."""
@@ -109,8 +309,16 @@ class Matrix:
         """Calculates the inverse of the matrix."""
         if self.rows != self.cols:
             raise ValueError("Inverse is only defined for square matrices")
+        if self.rows > LU_THRESHOLD:
+            lu = self.lu_decomposition()
+            inverse_matrix = Matrix(self.rows, self.cols)
+            for j in range(self.cols):
+                column = lu.solve([1 if i == j else 0 for i in range(self.rows)])
+                for i in range(self.rows):
+                    inverse_matrix[i][j] = column[i]
+            return inverse_matrix
         det = self.determinant()
-        if det == 0:
+        if is_singular(det, (self[i] for i in range(self.rows))):
             raise ValueError("Matrix is not invertible")
         inverse_matrix = Matrix(self.rows, self.cols)
         for i in range(self.rows):
@@ -119,10 +327,51 @@ class Matrix:
                 inverse_matrix[j][i] = self.cofactor(i, j) / det
         return inverse_matrix
     
+    def lu_decomposition(self):
+        """
+        Returns the LU factorization of the matrix.
+        The factorization is cached and reused until the matrix values change.
+        """
+        if self._lu is None or self._lu_version != self._version:
+            self._lu = LUDecomposition(self)
+            self._lu_version = self._version
+        return self._lu
+
+    def solve(self, b):
+        """
+        Solves the linear system self * x = b.
+        Repeated solves against an unchanged matrix reuse the cached factorization.
+        Args:
+            b: A list of numbers, a Tuple, or a Matrix of right-hand side columns.
+        Returns:
+            The solution in the same form as b.
+        Raises:
+            ValueError: If the matrix is singular or the dimensions do not match.
+        """
+        lu = self.lu_decomposition()
+        if isinstance(b, Matrix):
+            if b.rows != self.rows:
+                raise ValueError("Right-hand side must have as many rows as the matrix")
+            result = Matrix(b.rows, b.cols)
+            for j in range(b.cols):
+                column = lu.solve([b[i][j] for i in range(b.rows)])
+                for i in range(b.rows):
+                    result[i][j] = column[i]
+            return result
+        if isinstance(b, Tuple):
+            x, y, z, w = lu.solve([b.x, b.y, b.z, b.w])
+            if (math.isclose(w, 0.0)):
+                return Vector(x, y, z)
+            elif math.isclose(w, 1.0):
+                return Point(x, y, z)
+            else:
+                return Tuple(x, y, z, w)
+        return lu.solve(b)
+
     @classmethod
     def translation_matrix(cls, x, y, z):
         """Create a translation matrix."""
-        translation_matrix = Matrix.identity(4)
+        translation_matrix = cls.identity(4)
         translation_matrix[0][3] = x
         translation_matrix[1][3] = y
         translation_matrix[2][3] = z
@@ -137,10 +386,12 @@ class Matrix:
         """
         if (self.cols != len(tuple)):
             raise ValueError("Number of columns in the matrix must match the length of the tuple")
-        x = (self[0][0] * tuple.x + self[0][1] * tuple.y + self[0][2] * tuple.z + self[0][3] * tuple.w)
-        y = (self[1][0] * tuple.x + self[1][1] * tuple.y + self[1][2] * tuple.z + self[1][3] * tuple.w)
-        z = (self[2][0] * tuple.x + self[2][1] * tuple.y + self[2][2] * tuple.z + self[2][3] * tuple.w)
-        w = (self[3][0] * tuple.x + self[3][1] * tuple.y + self[3][2] * tuple.z + self[3][3] * tuple.w)
+        m = self._flat()
+        tx, ty, tz, tw = tuple.x, tuple.y, tuple.z, tuple.w
+        x = m[0] * tx + m[1] * ty + m[2] * tz + m[3] * tw
+        y = m[4] * tx + m[5] * ty + m[6] * tz + m[7] * tw
+        z = m[8] * tx + m[9] * ty + m[10] * tz + m[11] * tw
+        w = m[12] * tx + m[13] * ty + m[14] * tz + m[15] * tw
 
         if (math.isclose(w, 0.0)):
             return Vector(x, y, z)
@@ -152,7 +403,7 @@ class Matrix:
     @classmethod
     def scaled_matrix(cls, x, y, z):
         """Creates a scaling matrix."""
-        scaled_matrix = Matrix.identity(4)
+        scaled_matrix = cls.identity(4)
         scaled_matrix[0][0] = x
         scaled_matrix[1][1] = y
         scaled_matrix[2][2] = z
@@ -174,10 +425,44 @@ class Matrix:
         else:
             return Tuple(x, y, z, w)
 
+    def to_numpy(self):
+        """Returns the matrix values as a new rows x cols NumPy array."""
+        return np.array(self._flat(), dtype=np.float64).reshape(self.rows, self.cols)
+
+    def transform_many(self, tuples):
+        """
+        Multiplies the matrix by many tuples in one vectorized call.
+        Like __mul__, a result whose w is close to 1.0 is snapped to a point and
+        a result whose w is 0.0 to a vector, but the classification is kept in
+        the w components (see TupleArray.is_point and is_vector) instead of
+        building one object per tuple.
+        Args:
+            tuples: A TupleArray, a list of Tuples, or an (N, 4) NumPy array.
+        Returns:
+            A TupleArray for TupleArray or list input, or an (N, 4) array for
+            array input.
+        Raises:
+            ValueError: If the matrix is not 4 columns wide or the array shape is wrong.
+        """
+        if self.cols != 4:
+            raise ValueError("Number of columns in the matrix must match the length of the tuple")
+        m = self.to_numpy()
+        if isinstance(tuples, np.ndarray):
+            if tuples.ndim != 2 or tuples.shape[1] != 4:
+                raise ValueError("Tuple buffer must have shape (N, 4)")
+            result = tuples @ m.T
+            _snap_w(result[:, 3])
+            return result
+        if not isinstance(tuples, TupleArray):
+            tuples = TupleArray.from_tuples(tuples)
+        result = m @ tuples.data
+        _snap_w(result[3])
+        return _wrap(result)
+
     @classmethod
     def rotation_matrix_x(self, angle):
         """Creates a rotation matrix around the x-axis."""
-        rotation_matrix = Matrix.identity(4)
+        rotation_matrix = self.identity(4)
         rotation_matrix[1][1] = math.cos(angle)
         rotation_matrix[2][2] = math.cos(angle)
         rotation_matrix[1][2] = -math.sin(angle)
@@ -187,7 +472,7 @@ class Matrix:
     @classmethod
     def rotation_matrix_y(self, angle):
         """Creates a rotation matrix around the y-axis."""
-        rotation_matrix = Matrix.identity(4)
+        rotation_matrix = self.identity(4)
         rotation_matrix[0][0] = math.cos(angle)
         rotation_matrix[2][2] = math.cos(angle)
         rotation_matrix[0][2] = math.sin(angle)
@@ -197,7 +482,7 @@ class Matrix:
     @classmethod
     def rotation_matrix_z(self, angle):
         """Creates a rotation matrix around the z-axis."""
-        rotation_matrix = Matrix.identity(4)
+        rotation_matrix = self.identity(4)
         rotation_matrix[0][0] = math.cos(angle)
         rotation_matrix[1][1] = math.cos(angle)
         rotation_matrix[0][1] = -math.sin(angle)
@@ -207,7 +492,7 @@ class Matrix:
     @classmethod
     def shearing_matrix(self, xy=0, xz=0, yx=0, yz=0, zx=0, zy=0):
         """Creates a shear matrix."""
-        shear_matrix = Matrix.identity(4)
+        shear_matrix = self.identity(4)
         shear_matrix[0][1] = xy
         shear_matrix[0][2] = xz
         shear_matrix[1][0] = yx
@@ -215,7 +500,342 @@ class Matrix:
         shear_matrix[2][0] = zx
         shear_matrix[2][1] = zy
         return shear_matrix
+
+    @classmethod
+    def view_transform(cls, from_point, to_point, up):
+        """
+        Creates the world-to-eye matrix of an eye at from_point looking at
+        to_point, with up giving the approximate up direction.
+        """
+        forward = to_point.subtract(from_point).normalize()
+        left = forward.cross(up.normalize())
+        true_up = left.cross(forward)
+        orientation = cls.identity(4)
+        orientation.set_values([[left.x, left.y, left.z, 0],
+                                [true_up.x, true_up.y, true_up.z, 0],
+                                [-forward.x, -forward.y, -forward.z, 0],
+                                [0, 0, 0, 1]])
+        return orientation.multiply(cls.translation_matrix(-from_point.x, -from_point.y, -from_point.z))
          
     def __repr__(self):
         """Returns a string representation of the matrix."""
-        return "\n".join([" ".join([str(self.data[i][j]) for j in range(self.cols)]) for i in range(self.rows)])
\ No newline at end of file
+        return "\n".join([" ".join([str(self._get(i, j)) for j in range(self.cols)]) for i in range(self.rows)])
+
+class MatrixRow:
+    """
+    A live view of one matrix row; writes go through to the matrix.
+    It behaves like the row list it replaces: it supports indexing, slicing,
+    iteration and comparison, and once the matrix row is replaced through
+    Matrix.__setitem__ it becomes a detached copy of the old values.
+    """
+    __slots__ = ("_matrix", "_row", "_values")
+
+    def __init__(self, matrix, row):
+        self._matrix = matrix
+        self._row = row
+        self._values = None
+
+    def _detach(self):
+        """Keeps the current values and disconnects the view from the matrix."""
+        self._values = list(self)
+        self._matrix = None
+
+    def __getitem__(self, index):
+        """Returns the value at the given column, or a list of values for a slice."""
+        if self._values is not None:
+            return self._values[index]
+        if isinstance(index, slice):
+            return list(self)[index]
+        matrix = self._matrix
+        return matrix._buf[matrix._row_offsets[self._row] + matrix._col_offsets[index]]
+
+    def __setitem__(self, index, value):
+        """Sets the value at the given column, or the values of a slice."""
+        if self._values is not None:
+            self._values[index] = value
+        elif isinstance(index, slice):
+            values = list(self)
+            values[index] = value
+            if len(values) != self._matrix.cols:
+                raise ValueError("Row length must match the number of columns")
+            for j, v in enumerate(values):
+                self._matrix._set(self._row, j, v)
+        else:
+            self._matrix._set(self._row, index, value)
+
+    def __len__(self):
+        """Returns the number of columns in the row."""
+        if self._values is not None:
+            return len(self._values)
+        return self._matrix.cols
+
+    def __iter__(self):
+        """Iterates over the values in the row."""
+        if self._values is not None:
+            return iter(list(self._values))
+        matrix = self._matrix
+        buf = matrix._buf
+        offset = matrix._row_offsets[self._row]
+        return iter([buf[offset + c] for c in matrix._col_offsets])
+
+    def __eq__(self, other):
+        """Compares the row with another sequence of values."""
+        try:
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        """Returns a string representation of the row."""
+        return repr(list(self))
+
+
+class Matrix4(Matrix):
+    """
+    A 4x4 matrix with flat row-major storage.
+    Multiplication, transposition, determinant and inverse are fully unrolled,
+    so no intermediate submatrices are built. Matrix4 shares Matrix's API and
+    can be used anywhere a 4x4 Matrix is expected.
+    """
+    def __init__(self, rows=4, cols=4):
+        """Initializes a 4x4 matrix filled with zeros."""
+        if rows != 4 or cols != 4:
+            raise ValueError("Matrix4 must be 4x4")
+        super().__init__(4, 4)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Creates a Matrix4 from any 4x4 Matrix."""
+        if matrix.rows != 4 or matrix.cols != 4:
+            raise ValueError("Matrix must be 4x4")
+        return cls._from_flat(matrix._flat())
+
+    @classmethod
+    def _from_flat(cls, values):
+        """Creates a Matrix4 from a flat row-major sequence of 16 values."""
+        return cls._from_buffer(4, 4, array("d", values))
+
+    def _flat(self):
+        """Returns the row-major buffer, which is always contiguous for a Matrix4."""
+        return self._buf
+
+    def compare(self, other, epsilon=1e-5):
+        """Compares two matrices for equality."""
+        if not isinstance(other, Matrix4):
+            return super().compare(other, epsilon)
+        return all(math.isclose(a, b, abs_tol=epsilon) for a, b in zip(self._buf, other._buf))
+
+    def multiply(self, other):
+        """Multiplies two matrices."""
+        if not isinstance(other, Matrix4):
+            return super().multiply(other)
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self._buf
+        b00, b01, b02, b03, b10, b11, b12, b13, b20, b21, b22, b23, b30, b31, b32, b33 = other._buf
+        return Matrix4._from_flat([
+            a00*b00 + a01*b10 + a02*b20 + a03*b30, a00*b01 + a01*b11 + a02*b21 + a03*b31,
+            a00*b02 + a01*b12 + a02*b22 + a03*b32, a00*b03 + a01*b13 + a02*b23 + a03*b33,
+            a10*b00 + a11*b10 + a12*b20 + a13*b30, a10*b01 + a11*b11 + a12*b21 + a13*b31,
+            a10*b02 + a11*b12 + a12*b22 + a13*b32, a10*b03 + a11*b13 + a12*b23 + a13*b33,
+            a20*b00 + a21*b10 + a22*b20 + a23*b30, a20*b01 + a21*b11 + a22*b21 + a23*b31,
+            a20*b02 + a21*b12 + a22*b22 + a23*b32, a20*b03 + a21*b13 + a22*b23 + a23*b33,
+            a30*b00 + a31*b10 + a32*b20 + a33*b30, a30*b01 + a31*b11 + a32*b21 + a33*b31,
+            a30*b02 + a31*b12 + a32*b22 + a33*b32, a30*b03 + a31*b13 + a32*b23 + a33*b33,
+        ])
+
+    @classmethod
+    def identity(cls, size=4):
+        """Creates a 4x4 identity matrix."""
+        if size != 4:
+            raise ValueError("Matrix4 identity must be 4x4")
+        return cls._from_flat([1, 0, 0, 0,
+                               0, 1, 0, 0,
+                               0, 0, 1, 0,
+                               0, 0, 0, 1])
+
+    def transpose(self):
+        """Transposes the matrix."""
+        m = self._buf
+        return Matrix4._from_flat([m[0], m[4], m[8], m[12],
+                                   m[1], m[5], m[9], m[13],
+                                   m[2], m[6], m[10], m[14],
+                                   m[3], m[7], m[11], m[15]])
+
+    def _minors(self):
+        """Returns the twelve 2x2 determinants shared by determinant and inverse."""
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self._buf
+        s0 = a00*a11 - a10*a01
+        s1 = a00*a12 - a10*a02
+        s2 = a00*a13 - a10*a03
+        s3 = a01*a12 - a11*a02
+        s4 = a01*a13 - a11*a03
+        s5 = a02*a13 - a12*a03
+        c0 = a20*a31 - a30*a21
+        c1 = a20*a32 - a30*a22
+        c2 = a20*a33 - a30*a23
+        c3 = a21*a32 - a31*a22
+        c4 = a21*a33 - a31*a23
+        c5 = a22*a33 - a32*a23
+        return s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5
+
+    def determinant(self):
+        """Calculates the determinant of the matrix in closed form."""
+        s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5 = self._minors()
+        return s0*c5 - s1*c4 + s2*c3 + s3*c2 - s4*c1 + s5*c0
+
+    def inverse(self):
+        """Calculates the inverse of the matrix from its closed-form adjugate."""
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self._buf
+        s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5 = self._minors()
+        det = s0*c5 - s1*c4 + s2*c3 + s3*c2 - s4*c1 + s5*c0
+        if is_singular(det, (self._buf[i:i + 4] for i in range(0, 16, 4))):
+            raise ValueError("Matrix is not invertible")
+        return Matrix4._from_flat([
+            ( a11*c5 - a12*c4 + a13*c3) / det, (-a01*c5 + a02*c4 - a03*c3) / det,
+            ( a31*s5 - a32*s4 + a33*s3) / det, (-a21*s5 + a22*s4 - a23*s3) / det,
+            (-a10*c5 + a12*c2 - a13*c1) / det, ( a00*c5 - a02*c2 + a03*c1) / det,
+            (-a30*s5 + a32*s2 - a33*s1) / det, ( a20*s5 - a22*s2 + a23*s1) / det,
+            ( a10*c4 - a11*c2 + a13*c0) / det, (-a00*c4 + a01*c2 - a03*c0) / det,
+            ( a30*s4 - a31*s2 + a33*s0) / det, (-a20*s4 + a21*s2 - a23*s0) / det,
+            (-a10*c3 + a11*c1 - a12*c0) / det, ( a00*c3 - a01*c1 + a02*c0) / det,
+            (-a30*s3 + a31*s1 - a32*s0) / det, ( a20*s3 - a21*s1 + a22*s0) / det,
+        ])
+
+    def scale(self, tuple):
+        """Scales a tuple using the matrix."""
+        return self * tuple
+
+    def __repr__(self):
+        """Returns a string representation of the matrix."""
+        return "\n".join([" ".join([str(v) for v in self._buf[i * 4:i * 4 + 4]]) for i in range(4)])
+
+
+class Transform:
+    """
+    A chain of transformations built with a fluent API, e.g.
+    Transform().rotate_x(math.pi / 2).scale(5, 5, 5).translate(10, 5, 7).
+    Steps are applied in the order they are added. The composed matrix, its
+    inverse and its inverse-transpose are computed on first use and memoized.
+    Chains of translations, scalings and rotations are inverted by composing
+    the inverse of each step instead of running a general inverse.
+    Transforms are immutable: every builder method returns a new Transform.
+    """
+    # Steps whose inverse is known in closed form
+    STRUCTURED_STEPS = ("translate", "scale", "rotate_x", "rotate_y", "rotate_z")
+
+    def __init__(self, steps=()):
+        """Initializes a transform from a sequence of (kind, args) steps."""
+        self.steps = tuple(steps)
+        self._matrix = None
+        self._inverse = None
+        self._inverse_transpose = None
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Creates a transform that applies an arbitrary 4x4 matrix."""
+        return cls((("matrix", (Matrix4.from_matrix(matrix),)),))
+
+    def _then(self, kind, *args):
+        """Returns a new transform with one more step appended."""
+        return Transform(self.steps + ((kind, args),))
+
+    def translate(self, x, y, z):
+        """Appends a translation."""
+        return self._then("translate", x, y, z)
+
+    def scale(self, x, y, z):
+        """Appends a scaling."""
+        return self._then("scale", x, y, z)
+
+    def rotate_x(self, angle):
+        """Appends a rotation around the x-axis."""
+        return self._then("rotate_x", angle)
+
+    def rotate_y(self, angle):
+        """Appends a rotation around the y-axis."""
+        return self._then("rotate_y", angle)
+
+    def rotate_z(self, angle):
+        """Appends a rotation around the z-axis."""
+        return self._then("rotate_z", angle)
+
+    def shear(self, xy=0, xz=0, yx=0, yz=0, zx=0, zy=0):
+        """Appends a shear."""
+        return self._then("shear", xy, xz, yx, yz, zx, zy)
+
+    def then(self, other):
+        """Returns a transform that applies this transform and then the other one."""
+        return Transform(self.steps + other.steps)
+
+    def is_structured(self):
+        """Returns True if every step has a closed-form inverse."""
+        return all(kind in Transform.STRUCTURED_STEPS for kind, _ in self.steps)
+
+    @staticmethod
+    def _step_matrix(kind, args):
+        """Returns the Matrix4 for one step."""
+        if kind == "translate":
+            return Matrix4.translation_matrix(*args)
+        if kind == "scale":
+            return Matrix4.scaled_matrix(*args)
+        if kind == "rotate_x":
+            return Matrix4.rotation_matrix_x(*args)
+        if kind == "rotate_y":
+            return Matrix4.rotation_matrix_y(*args)
+        if kind == "rotate_z":
+            return Matrix4.rotation_matrix_z(*args)
+        if kind == "shear":
+            return Matrix4.shearing_matrix(*args)
+        return args[0]
+
+    @staticmethod
+    def _inverse_step_matrix(kind, args):
+        """Returns the inverse Matrix4 of a structured step."""
+        if kind == "translate":
+            x, y, z = args
+            return Matrix4.translation_matrix(-x, -y, -z)
+        if kind == "scale":
+            x, y, z = args
+            if x == 0 or y == 0 or z == 0:
+                raise ValueError("Matrix is not invertible")
+            return Matrix4.scaled_matrix(1 / x, 1 / y, 1 / z)
+        # The inverse of a rotation is its transpose
+        return Transform._step_matrix(kind, args).transpose()
+
+    def matrix(self):
+        """Returns the composed transformation matrix."""
+        if self._matrix is None:
+            result = Matrix4.identity()
+            for kind, args in self.steps:
+                result = Transform._step_matrix(kind, args).multiply(result)
+            self._matrix = result
+        return self._matrix
+
+    def inverse(self):
+        """Returns the inverse of the composed matrix."""
+        if self._inverse is None:
+            if self.is_structured():
+                result = Matrix4.identity()
+                for kind, args in self.steps:
+                    result = result.multiply(Transform._inverse_step_matrix(kind, args))
+                self._inverse = result
+            else:
+                self._inverse = self.matrix().inverse()
+        return self._inverse
+
+    def inverse_transpose(self):
+        """Returns the transpose of the inverse, used to transform normals."""
+        if self._inverse_transpose is None:
+            self._inverse_transpose = self.inverse().transpose()
+        return self._inverse_transpose
+
+    def __mul__(self, tuple):
+        """Applies the transform to a tuple."""
+        return self.matrix() * tuple
+
+    def transform_many(self, tuples):
+        """Applies the transform to many tuples at once, see Matrix.transform_many."""
+        return self.matrix().transform_many(tuples)
+
+    def __repr__(self):
+        """Returns a string representation of the transform."""
+        return "Transform(" + ", ".join(f"{kind}{args}" for kind, args in self.steps) + ")"
@@ -0,0 +1,220 @@
+import os
+import time
+import numpy as np
+from core.canvas import Canvas
+
+
+class AccumulationBuffer:
+    """
+    A floating point (HDR) image that accumulates many samples per pixel.
+    It keeps the per-channel sum and sum of squares and the sample count of
+    every pixel, so the mean colour and the uncertainty of that mean are
+    always available. Values are not clamped; clamping happens only when
+    the image is exported.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.sum = np.zeros((height, width, 3))
+        self.sum_squares = np.zeros((height, width, 3))
+        self.count = np.zeros((height, width), dtype=np.int64)
+
+    def add(self, xs, ys, colors):
+        """
+        Adds one sample to each pixel (xs[i], ys[i]).
+        Args:
+            xs: Integer pixel columns; a pixel may appear more than once.
+            ys: Integer pixel rows.
+            colors: An (N, 3) array of sample colours.
+        """
+        colors = np.asarray(colors, dtype=np.float64)
+        np.add.at(self.sum, (ys, xs), colors)
+        np.add.at(self.sum_squares, (ys, xs), colors * colors)
+        np.add.at(self.count, (ys, xs), 1)
+
+    def mean(self):
+        """Returns the (height, width, 3) mean colour, black where there are no samples."""
+        count = np.maximum(self.count, 1)[..., None]
+        return self.sum / count
+
+    def standard_error(self):
+        """
+        Returns the (height, width) standard error of each pixel's mean, the
+        largest over its three channels. Pixels with fewer than two samples
+        have an infinite error.
+        """
+        n = self.count[..., None].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sum / n
+            variance = (self.sum_squares / n - mean * mean) * n / (n - 1)
+            error = np.sqrt(np.maximum(variance, 0.0) / n).max(axis=2)
+        error[self.count < 2] = np.inf
+        return error
+
+    def preview(self, stride=1):
+        """
+        Returns the mean image with pixels that have no samples yet filled in
+        from the sampled pixel at the top-left corner of their stride x stride block.
+        """
+        image = self.mean()
+        if stride > 1:
+            holes = self.count == 0
+            ys, xs = np.nonzero(holes)
+            image[ys, xs] = image[ys - ys % stride, xs - xs % stride]
+        return image
+
+    def to_canvas(self, stride=1):
+        """Returns the preview image as a Canvas."""
+        canvas = Canvas(self.width, self.height)
+        canvas.write_region(0, 0, self.preview(stride))
+        return canvas
+
+
+class ProgressiveStats:
+    """
+    Statistics of a progressive render.
+    Attributes:
+        passes: The number of passes run.
+        samples: The total number of samples taken.
+        converged: The fraction of pixels whose error is below the threshold.
+        stopped_early: True if the render ended because every pixel converged.
+        snapshots: The paths of the snapshots written, in order.
+        seconds: The wall time of the render.
+    """
+    def __init__(self):
+        self.passes = 0
+        self.samples = 0
+        self.converged = 0.0
+        self.stopped_early = False
+        self.snapshots = []
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (f"ProgressiveStats(passes={self.passes}, samples={self.samples}, "
+                f"converged={self.converged:.3f}, stopped_early={self.stopped_early}, "
+                f"seconds={self.seconds:.3f})")
+
+
+class ProgressiveRenderer:
+    """
+    Renders an image in passes that each improve on the last.
+    The first passes sample a sparse grid, every stride-th pixel for strides
+    2 ** sparse_levels down to 1, so a coarse preview of the whole image is
+    available almost immediately. Later passes add one jittered sample to
+    every pixel that has not converged yet, i.e. has fewer than min_samples
+    samples or a standard error above threshold, until every pixel has
+    converged or reached max_samples.
+    The sample function has the same form as for TileRenderer:
+    sample(xs, ys) takes (N,) float pixel coordinates (pixel centres at +0.5)
+    and returns (N, 3) colours.
+    """
+
+    def __init__(self, width, height, sample, threshold=0.01, min_samples=4, max_samples=64,
+                 sparse_levels=3, snapshot_interval=None, snapshot_path=None, on_snapshot=None,
+                 chunk_size=1 << 16, seed=0):
+        """
+        Initializes the renderer.
+        Args:
+            width: The image width in pixels.
+            height: The image height in pixels.
+            sample: The sample function.
+            threshold: The standard error below which a pixel has converged.
+            min_samples: The minimum number of samples per pixel; at least 2,
+                since the error of a single sample is unknown.
+            max_samples: The maximum number of samples per pixel.
+            sparse_levels: The number of sparse passes before the first full one.
+            snapshot_interval: Seconds between snapshots (0 for every pass,
+                None for no snapshots).
+            snapshot_path: Where to write snapshots as binary PPM; may contain
+                "{pass}", which is replaced by the pass number.
+            on_snapshot: Called as on_snapshot(canvas, stats) for every snapshot.
+            chunk_size: The maximum number of samples per sample() call.
+            seed: Seed for the sub-pixel jitter.
+        """
+        if min_samples < 2 or max_samples < min_samples:
+            raise ValueError("Need 2 <= min_samples <= max_samples")
+        self.width = width
+        self.height = height
+        self.sample = sample
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.sparse_levels = sparse_levels
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_path = snapshot_path
+        self.on_snapshot = on_snapshot
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+        self.buffer = AccumulationBuffer(width, height)
+        self.stats = ProgressiveStats()
+
+    def _sample(self, xs, ys, jitter):
+        """Takes one sample at each integer pixel (xs, ys) and accumulates it."""
+        for start in range(0, len(xs), self.chunk_size):
+            px = xs[start:start + self.chunk_size]
+            py = ys[start:start + self.chunk_size]
+            if jitter:
+                fx = px + self.rng.random(len(px))
+                fy = py + self.rng.random(len(py))
+            else:
+                fx, fy = px + 0.5, py + 0.5
+            self.buffer.add(px, py, self.sample(fx, fy))
+        self.stats.samples += len(xs)
+
+    def _passes(self):
+        """Yields (xs, ys, jitter, preview stride) for every pass."""
+        ys, xs = np.mgrid[0:self.height, 0:self.width]
+        sampled = np.zeros((self.height, self.width), dtype=bool)
+        for level in range(self.sparse_levels, -1, -1):
+            stride = 1 << level
+            grid = (xs % stride == 0) & (ys % stride == 0) & ~sampled
+            sampled |= grid
+            yield xs[grid], ys[grid], False, stride
+        while True:
+            active = self.active()
+            if not active.any():
+                return
+            yield xs[active], ys[active], True, 1
+
+    def active(self):
+        """Returns the (height, width) mask of pixels that still need samples."""
+        count = self.buffer.count
+        unconverged = (count < self.min_samples) | (self.buffer.standard_error() > self.threshold)
+        return unconverged & (count < self.max_samples)
+
+    def snapshot(self, stride=1):
+        """Writes the current preview to snapshot_path and/or passes it to on_snapshot."""
+        canvas = self.buffer.to_canvas(stride)
+        if self.snapshot_path is not None:
+            path = self.snapshot_path.replace("{pass}", str(self.stats.passes))
+            # Write next to the target and rename, so viewers never see a partial file
+            temporary = path + ".tmp"
+            canvas.save_ppm(temporary, binary=True)
+            os.replace(temporary, path)
+            self.stats.snapshots.append(path)
+        if self.on_snapshot is not None:
+            self.on_snapshot(canvas, self.stats)
+        return canvas
+
+    def render(self):
+        """
+        Runs passes until every pixel has converged or reached max_samples.
+        Returns:
+            The final image as a Canvas.
+        """
+        start_time = time.perf_counter()
+        last_snapshot = start_time
+        for xs, ys, jitter, stride in self._passes():
+            self._sample(xs, ys, jitter)
+            self.stats.passes += 1
+            now = time.perf_counter()
+            if self.snapshot_interval is not None and now - last_snapshot >= self.snapshot_interval:
+                self.snapshot(stride)
+                last_snapshot = now
+        count = self.buffer.count
+        converged = (count >= self.min_samples) & (self.buffer.standard_error() <= self.threshold)
+        self.stats.converged = float(converged.mean())
+        self.stats.stopped_early = bool(converged.all())
+        self.stats.seconds = time.perf_counter() - start_time
+        return self.buffer.to_canvas()
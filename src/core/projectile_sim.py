@@ -11,8 +11,11 @@ env = Environment(gravity, wind)
 
 canvas = Canvas(900,550)
 color = (1, 0, 0) # Red color
+max_ticks = 100000 # Stop even if the projectile never comes down
 
-while proj.position.y > 0:
+for _ in range(max_ticks):
+    if proj.position.y <= 0:
+        break
     x = int(proj.position.x)
     # Flip y to match canvas coordinates
     y = canvas.height - int(proj.position.y)
@@ -21,4 +24,4 @@ while proj.position.y > 0:
     proj = proj.tick(env, proj)
 
 with open("projectile.ppm", "w") as f:
-    f.write(canvas.canvas_to_ppm())
\ No newline at end of file
+    canvas.write_ppm(f)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import numpy as np
+from core.tuples import Point, Vector, _as_xyz
+
+
+class Ray:
+    """A ray with an origin point and a direction vector."""
+
+    def __init__(self, origin, direction):
+        """
+        Initializes a Ray.
+        Args:
+            origin: The Point the ray starts from.
+            direction: The Vector the ray travels along (not necessarily normalized).
+        """
+        self.origin = origin
+        self.direction = direction
+
+    def position(self, t):
+        """Returns the Point at distance t along the ray."""
+        return self.origin + self.direction * t
+
+    def transform(self, matrix):
+        """Returns a new Ray with the matrix applied to its origin and direction."""
+        return Ray(matrix * self.origin, matrix * self.direction)
+
+    def __repr__(self):
+        """Returns a string representation of the ray."""
+        return f"Ray({self.origin}, {self.direction})"
+
+
+class RayPacket:
+    """
+    Many rays stored as arrays, so they can be transformed and intersected
+    in single vectorized calls.
+    Attributes:
+        origins: An (N, 3) array of ray origins.
+        directions: An (N, 3) array of ray directions.
+    """
+
+    def __init__(self, origins, directions):
+        """
+        Initializes a packet.
+        Args:
+            origins: The origins, as a PointArray, a list of Points or an (N, 3) array.
+            directions: The directions, as a VectorArray, a list of Vectors or an (N, 3) array.
+        Raises:
+            ValueError: If the shapes do not match.
+        """
+        self.origins = _as_xyz(origins, "origins")
+        self.directions = _as_xyz(directions, "directions")
+        if self.origins.shape != self.directions.shape:
+            raise ValueError("origins and directions must have the same shape")
+
+    @classmethod
+    def from_rays(cls, rays):
+        """Creates a packet from a list of Rays."""
+        return cls([ray.origin for ray in rays], [ray.direction for ray in rays])
+
+    def __len__(self):
+        """Returns the number of rays."""
+        return len(self.origins)
+
+    def __getitem__(self, index):
+        """Returns ray i as a Ray."""
+        ox, oy, oz = self.origins[index]
+        dx, dy, dz = self.directions[index]
+        return Ray(Point(float(ox), float(oy), float(oz)), Vector(float(dx), float(dy), float(dz)))
+
+    def position(self, t):
+        """
+        Returns the (N, 3) positions at distance t along each ray.
+        t may be a scalar or an (N,) array with one distance per ray.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        if t.ndim:
+            t = t[:, None]
+        return self.origins + self.directions * t
+
+    def transform(self, matrix):
+        """
+        Returns a new packet with a 4x4 matrix applied to every ray.
+        Origins are transformed as points and directions as vectors.
+        """
+        m = matrix.to_numpy()
+        linear = m[:3, :3].T
+        return RayPacket(self.origins @ linear + m[:3, 3], self.directions @ linear)
+
+    def __repr__(self):
+        """Returns a string representation of the packet."""
+        return f"RayPacket(n={len(self)})"
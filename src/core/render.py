@@ -0,0 +1,297 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+import multiprocessing
+import numpy as np
+from core.canvas import SharedCanvas
+
+CURVES = ("hilbert", "z", "rows")
+
+
+def hilbert_index(n, x, y):
+    """
+    Returns the position of cells (x, y) along a Hilbert curve filling an
+    n x n grid, where n is a power of two. x and y may be arrays.
+    """
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    d = np.zeros(np.broadcast(x, y).shape, dtype=np.int64)
+    s = n // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the sub-curve is in standard orientation
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s //= 2
+    return d
+
+
+def morton_index(x, y):
+    """Returns the Z-order (Morton) index of cells (x, y) by interleaving their bits."""
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    d = np.zeros(np.broadcast(x, y).shape, dtype=np.int64)
+    for bit in range(31):
+        d |= ((x >> bit) & 1) << (2 * bit)
+        d |= ((y >> bit) & 1) << (2 * bit + 1)
+    return d
+
+
+def tile_order(width, height, tile_size, curve="hilbert"):
+    """
+    Splits an image into tiles and orders them along a space-filling curve,
+    so consecutive tiles are neighbours in the image.
+    Args:
+        width: The image width in pixels.
+        height: The image height in pixels.
+        tile_size: The width and height of a tile; edge tiles may be smaller.
+        curve: "hilbert", "z" (Morton order) or "rows" (scanline order).
+    Returns:
+        A (T, 4) int array of (x0, y0, x1, y1) tile rectangles, end exclusive.
+    Raises:
+        ValueError: If the tile size or curve is invalid.
+    """
+    if tile_size <= 0:
+        raise ValueError("Tile size must be a positive integer")
+    if curve not in CURVES:
+        raise ValueError(f"Unknown curve {curve!r}, expected one of {CURVES}")
+    tiles_x = -(-width // tile_size)
+    tiles_y = -(-height // tile_size)
+    ty, tx = np.divmod(np.arange(tiles_x * tiles_y), tiles_x)
+    if curve == "hilbert":
+        n = 1 << max(tiles_x - 1, tiles_y - 1, 1).bit_length()
+        keys = hilbert_index(n, tx, ty)
+    elif curve == "z":
+        keys = morton_index(tx, ty)
+    else:
+        keys = ty * tiles_x + tx
+    order = np.argsort(keys, kind="stable")
+    tx, ty = tx[order], ty[order]
+    x0, y0 = tx * tile_size, ty * tile_size
+    return np.stack([x0, y0, np.minimum(x0 + tile_size, width), np.minimum(y0 + tile_size, height)], axis=1)
+
+
+def pixel_centers(x0, y0, x1, y1):
+    """Returns the flat row-major xs, ys float coordinates of the pixel centres of a rectangle."""
+    ys, xs = np.mgrid[y0:y1, x0:x1]
+    return xs.ravel() + 0.5, ys.ravel() + 0.5
+
+
+class RenderStats:
+    """
+    Per-worker counters from the last TileRenderer.render call.
+    Attributes:
+        tiles: An array with the number of tiles each worker rendered.
+        steals: An array with the number of times each worker stole work.
+        seconds: The wall time of the render.
+    """
+    def __init__(self, tiles, steals, seconds):
+        self.tiles = tiles
+        self.steals = steals
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (f"RenderStats(tiles={self.tiles.tolist()}, steals={self.steals.tolist()}, "
+                f"seconds={self.seconds:.3f})")
+
+
+# Per-process state of a render worker, set up by _init_worker
+_worker = None
+
+
+def _init_worker(canvas_name, width, height, dtype, sample, tiles, pending, queues, counters, done):
+    """Attaches a worker process to the shared canvas and scheduling state."""
+    global _worker
+    _worker = {
+        "canvas": SharedCanvas(width, height, name=canvas_name, dtype=dtype),
+        "sample": sample,
+        "tiles": tiles,
+        "pending": pending,
+        "queues": queues,
+        "counters": counters,
+        "done": np.frombuffer(done, dtype=np.uint8),
+    }
+
+
+def _close_worker():
+    """Detaches the worker state set up by _init_worker."""
+    global _worker
+    _worker["canvas"].close()
+    _worker = None
+
+
+def _next_tile(worker_id, queues, counters):
+    """
+    Returns the position in the pending list of the next tile for a worker,
+    or None when every tile has been handed out.
+    Each worker owns a range [head, tail) of the pending list and takes tiles
+    from its head, so it walks along the curve. A worker whose range is empty
+    steals the back half of the largest remaining range.
+    """
+    with queues.get_lock():
+        head, tail = queues[2 * worker_id], queues[2 * worker_id + 1]
+        if head >= tail:
+            workers = len(queues) // 2
+            remaining = [queues[2 * w + 1] - queues[2 * w] for w in range(workers)]
+            victim = max(range(workers), key=remaining.__getitem__)
+            if remaining[victim] <= 0:
+                return None
+            victim_tail = queues[2 * victim + 1]
+            middle = victim_tail - (remaining[victim] + 1) // 2
+            queues[2 * victim + 1] = middle
+            head, tail = middle, victim_tail
+            counters[2 * worker_id + 1] += 1
+        queues[2 * worker_id] = head + 1
+        queues[2 * worker_id + 1] = tail
+        return head
+
+
+def _run_worker(worker_id, on_tile=None):
+    """
+    Renders tiles until none are left and returns the number rendered.
+    on_tile, if given, is called with no arguments after every tile.
+    """
+    state = _worker
+    pixels = state["canvas"].pixels
+    rendered = 0
+    while True:
+        position = _next_tile(worker_id, state["queues"], state["counters"])
+        if position is None:
+            break
+        tile = state["pending"][position]
+        x0, y0, x1, y1 = state["tiles"][tile]
+        xs, ys = pixel_centers(x0, y0, x1, y1)
+        colors = np.asarray(state["sample"](xs, ys), dtype=np.float64)
+        pixels[y0:y1, x0:x1] = colors.reshape(y1 - y0, x1 - x0, 3)
+        # Mark the tile only once its pixels are in the buffer
+        state["done"][tile] = 1
+        rendered += 1
+        if on_tile is not None:
+            on_tile()
+    with state["queues"].get_lock():
+        state["counters"][2 * worker_id] += rendered
+    return rendered
+
+
+class TileRenderer:
+    """
+    Renders an image tile by tile on a pool of worker processes.
+    Every worker writes its tiles straight into a SharedCanvas, so no pixel
+    data is pickled. Tiles are handed out along a space-filling curve, each
+    worker starting on its own contiguous stretch of it; a worker that runs
+    out steals from the one with the most work left.
+    The image is defined by a sample function: sample(xs, ys) receives two
+    (N,) float arrays of pixel coordinates (pixel centres are at +0.5) and
+    returns an (N, 3) array of RGB colours. It must be picklable, e.g. a
+    module-level function or an instance of a module-level class.
+    Attributes:
+        canvas: The SharedCanvas being rendered; it works with every PPM exporter.
+        tiles: The (T, 4) tile rectangles in curve order.
+        done: A (T,) uint8 array, shared with the workers, marking finished tiles.
+        stats: RenderStats of the last render.
+    """
+    def __init__(self, width, height, sample, tile_size=32, workers=None, curve="hilbert",
+                 dtype=np.float64):
+        """
+        Initializes the renderer and allocates the shared canvas.
+        Args:
+            width: The image width in pixels.
+            height: The image height in pixels.
+            sample: The sample function.
+            tile_size: The width and height of a tile in pixels.
+            workers: The number of worker processes (default: every core).
+                With 1 the tiles are rendered in this process.
+            curve: The tile order, see tile_order.
+            dtype: The float type of the pixel components.
+        """
+        self.width = width
+        self.height = height
+        self.sample = sample
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count()
+        self.tiles = tile_order(width, height, tile_size, curve)
+        self.canvas = SharedCanvas(width, height, dtype=dtype)
+        self._done = multiprocessing.RawArray("B", len(self.tiles))
+        self.done = np.frombuffer(self._done, dtype=np.uint8)
+        self.stats = None
+
+    def render(self, on_progress=None, poll_interval=0.5):
+        """
+        Renders every tile not yet marked in done and returns the canvas.
+        Args:
+            on_progress: Called as on_progress(renderer) every poll_interval
+                seconds while tiles are rendered, and once at the end. With
+                one worker it is called between tiles.
+            poll_interval: Seconds between on_progress calls.
+        Returns:
+            The SharedCanvas.
+        """
+        start_time = time.perf_counter()
+        pending = np.flatnonzero(self.done == 0)
+        workers = max(1, min(self.workers, len(pending)))
+        # Worker w starts with the w-th contiguous stretch of the pending tiles
+        bounds = np.linspace(0, len(pending), workers + 1).astype(np.int64)
+        queues = multiprocessing.Array("q", workers * 2)
+        queues[:] = np.stack([bounds[:-1], bounds[1:]], axis=1).ravel().tolist()
+        counters = multiprocessing.Array("q", workers * 2, lock=False)
+        initargs = (self.canvas.name, self.width, self.height, self.canvas.dtype.str, self.sample,
+                    self.tiles, pending, queues, counters, self._done)
+        if workers == 1:
+            last_progress = time.perf_counter()
+
+            def on_tile():
+                nonlocal last_progress
+                if on_progress is not None and time.perf_counter() - last_progress >= poll_interval:
+                    on_progress(self)
+                    last_progress = time.perf_counter()
+
+            _init_worker(*initargs)
+            try:
+                _run_worker(0, on_tile)
+            finally:
+                _close_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=initargs) as pool:
+                futures = [pool.submit(_run_worker, w) for w in range(workers)]
+                while True:
+                    finished, running = wait(futures, timeout=poll_interval, return_when=FIRST_EXCEPTION)
+                    if not running or any(f.exception() for f in finished):
+                        break
+                    if on_progress is not None:
+                        on_progress(self)
+                for future in futures:
+                    future.result()
+        counts = np.array(counters[:]).reshape(workers, 2)
+        self.stats = RenderStats(counts[:, 0], counts[:, 1], time.perf_counter() - start_time)
+        if on_progress is not None:
+            on_progress(self)
+        return self.canvas
+
+    @property
+    def progress(self):
+        """The fraction of tiles finished."""
+        return float(self.done.mean()) if len(self.done) else 1.0
+
+    def close(self):
+        """Releases the shared canvas."""
+        self.canvas.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render(width, height, sample, tile_size=32, workers=None, curve="hilbert"):
+    """
+    Renders an image with a TileRenderer and returns it as a regular Canvas,
+    releasing the shared memory. See TileRenderer for the sample function.
+    """
+    with TileRenderer(width, height, sample, tile_size, workers, curve) as renderer:
+        return renderer.render().to_canvas()
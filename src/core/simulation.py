@@ -0,0 +1,143 @@
+import numpy as np
+from core.tuples import Environment, _as_xyz
+
+
+class BatchResult:
+    """
+    The outcome of a batch projectile simulation.
+    Attributes:
+        trajectories: One (n_i, 3) array per projectile with every position
+            it had while still in the air (y > 0), in tick order. None if the
+            simulation was run with record=False.
+        landing_points: An (N, 3) array with the first position at or below
+            y = 0, or NaN for projectiles still in the air after max_ticks.
+        landing_ticks: An (N,) array with the number of ticks each projectile
+            flew, or max_ticks if it never landed.
+        landed: An (N,) boolean mask of projectiles that reached y <= 0.
+        max_heights: An (N,) array with the highest y of each trajectory, or
+            NaN for projectiles that start at or below y = 0. It is tracked
+            while stepping, so it is available with record=False too.
+    """
+    def __init__(self, trajectories, landing_points, landing_ticks, landed, max_heights):
+        self.trajectories = trajectories
+        self.landing_points = landing_points
+        self.landing_ticks = landing_ticks
+        self.landed = landed
+        self.max_heights = max_heights
+
+    def __len__(self):
+        """Returns the number of simulated projectiles."""
+        return len(self.landing_ticks)
+
+    def __repr__(self):
+        """Returns a string representation of the result."""
+        return f"BatchResult(n={len(self)}, landed={int(self.landed.sum())})"
+
+
+def simulate(positions, velocities, environments, env_index=None, max_ticks=100000, record=True):
+    """
+    Advances N projectiles in lockstep until every one of them has landed.
+    Each tick applies the same update as Projectile.tick to every projectile
+    still in the air: the position moves by the velocity, then the velocity
+    changes by its environment's (wind.x, gravity.y, gravity.z). A projectile
+    drops out of the active set as soon as its y coordinate is at or below 0.
+    Args:
+        positions: The start positions, as a PointArray or an (N, 3) array.
+        velocities: The start velocities, as a VectorArray or an (N, 3) array.
+        environments: An Environment, or a sequence of Environments.
+        env_index: For each projectile, the index of its environment (default 0).
+        max_ticks: The maximum number of ticks to simulate.
+        record: Whether to keep the full trajectory of every projectile.
+    Returns:
+        A BatchResult.
+    Raises:
+        ValueError: If the input shapes do not match.
+    """
+    position = _as_xyz(positions, "Positions")
+    velocity = _as_xyz(velocities, "Velocities")
+    if position.shape != velocity.shape:
+        raise ValueError("Positions and velocities must have the same shape")
+    if isinstance(environments, Environment):
+        environments = [environments]
+    # One acceleration vector per environment, mixed as in Projectile.tick
+    accelerations = np.array([[e.wind.x, e.gravity.y, e.gravity.z]
+                              for e in environments], dtype=np.float64).reshape(-1, 3)
+    n = len(position)
+    if env_index is None:
+        env_index = np.zeros(n, dtype=np.intp)
+    env_index = np.asarray(env_index, dtype=np.intp)
+    if env_index.shape != (n,):
+        raise ValueError("There must be one environment index per projectile")
+    if n and (env_index.min() < 0 or env_index.max() >= len(accelerations)):
+        raise ValueError("Environment index out of range")
+
+    landing_points = np.full((n, 3), np.nan)
+    landing_ticks = np.full(n, max_ticks, dtype=np.int64)
+    landed = np.zeros(n, dtype=bool)
+    max_heights = np.full(n, np.nan)
+    recorded_index = []
+    recorded_position = []
+
+    active = np.flatnonzero(position[:, 1] > 0)
+    grounded = np.flatnonzero(position[:, 1] <= 0)
+    landing_points[grounded] = position[grounded]
+    landing_ticks[grounded] = 0
+    landed[grounded] = True
+    position = position[active]
+    velocity = velocity[active]
+    acceleration = accelerations[env_index[active]]
+    height = position[:, 1].copy()
+
+    tick = 0
+    while len(active) and tick < max_ticks:
+        if record:
+            recorded_index.append(active)
+            recorded_position.append(position.copy())
+        np.maximum(height, position[:, 1], out=height)
+        position += velocity
+        velocity += acceleration
+        tick += 1
+        down = position[:, 1] <= 0
+        if down.any():
+            done = active[down]
+            landing_points[done] = position[down]
+            landing_ticks[done] = tick
+            landed[done] = True
+            max_heights[done] = height[down]
+            keep = ~down
+            active = active[keep]
+            position = position[keep]
+            velocity = velocity[keep]
+            acceleration = acceleration[keep]
+            height = height[keep]
+    max_heights[active] = height
+
+    trajectories = None
+    if record:
+        if recorded_index:
+            index = np.concatenate(recorded_index)
+            samples = np.concatenate(recorded_position)
+            order = np.argsort(index, kind="stable")
+            counts = np.bincount(index, minlength=n)
+            trajectories = np.split(samples[order], np.cumsum(counts)[:-1])
+        else:
+            trajectories = [np.empty((0, 3)) for _ in range(n)]
+    return BatchResult(trajectories, landing_points, landing_ticks, landed, max_heights)
+
+
+def simulate_projectiles(projectiles, environments, env_index=None, max_ticks=100000, record=True):
+    """
+    Runs simulate() for a list of Projectile objects.
+    Args:
+        projectiles: A sequence of Projectile objects.
+        environments: An Environment, or a sequence of Environments.
+        env_index: For each projectile, the index of its environment (default 0).
+        max_ticks: The maximum number of ticks to simulate.
+        record: Whether to keep the full trajectory of every projectile.
+    Returns:
+        A BatchResult.
+    """
+    positions = [[p.position.x, p.position.y, p.position.z] for p in projectiles]
+    velocities = [[p.velocity.x, p.velocity.y, p.velocity.z] for p in projectiles]
+    return simulate(np.reshape(positions, (-1, 3)), np.reshape(velocities, (-1, 3)),
+                    environments, env_index, max_ticks, record)
@@ -0,0 +1,208 @@
+import math
+import numpy as np
+from core.tuples import Point, Vector
+from core.matrices import Matrix, Transform
+
+
+class Intersection:
+    """The distance t along a ray at which it meets an object."""
+
+    def __init__(self, t, object):
+        self.t = t
+        self.object = object
+
+    def __eq__(self, other):
+        if not isinstance(other, Intersection):
+            return NotImplemented
+        return self.t == other.t and self.object is other.object
+
+    def __repr__(self):
+        """Returns a string representation of the intersection."""
+        return f"Intersection({self.t}, {self.object})"
+
+
+def intersections(*xs):
+    """Returns the given intersections as a list sorted by t."""
+    return sorted(xs, key=lambda i: i.t)
+
+
+def hit(xs):
+    """Returns the intersection with the lowest non-negative t, or None if there is none."""
+    best = None
+    for i in xs:
+        if i.t >= 0 and (best is None or i.t < best.t):
+            best = i
+    return best
+
+
+def hit_distances(ts):
+    """
+    Returns, for each row of an (N, k) array of distances, the lowest
+    non-negative one, or inf if the row has none.
+    """
+    ts = np.where(ts >= 0, ts, np.inf)
+    return ts.min(axis=1)
+
+
+class Sphere:
+    """
+    A unit sphere centred on the origin, placed in the world by a transform.
+    The inverse of the transform, which maps world-space rays into object
+    space, is computed on first use after the transform is set and reused by
+    every intersection.
+    """
+
+    def __init__(self, transform=None):
+        """
+        Initializes a sphere.
+        Args:
+            transform: A Transform or 4x4 Matrix (default: identity).
+        """
+        self.transform = transform
+
+    @property
+    def transform(self):
+        """The object-to-world Transform."""
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        if transform is None:
+            transform = Transform()
+        elif isinstance(transform, Matrix):
+            transform = Transform.from_matrix(transform)
+        self._transform = transform
+        # NumPy copies of the inverse for the vectorized paths, built on first use
+        self._inverse_np = None
+        self._normal_np = None
+
+    def set_transform(self, transform):
+        """Sets the object-to-world transform."""
+        self.transform = transform
+
+    def _inverse_arrays(self):
+        """Returns the world-to-object inverse and the normal matrix as NumPy arrays."""
+        if self._inverse_np is None:
+            self._inverse_np = self._transform.inverse().to_numpy()
+            self._normal_np = self._transform.inverse_transpose().to_numpy()
+        return self._inverse_np, self._normal_np
+
+    def intersect(self, ray):
+        """
+        Returns the intersections of a Ray with the sphere, sorted by t.
+        The list is empty if the ray misses and holds two entries otherwise
+        (equal if the ray is tangent).
+        """
+        ray = ray.transform(self._transform.inverse())
+        origin = ray.origin - Point(0, 0, 0)
+        a = ray.direction.dot(ray.direction)
+        b = 2 * ray.direction.dot(origin)
+        c = origin.dot(origin) - 1
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return []
+        root = math.sqrt(discriminant)
+        return [Intersection((-b - root) / (2 * a), self),
+                Intersection((-b + root) / (2 * a), self)]
+
+    def intersect_packet(self, packet):
+        """
+        Intersects every ray of a RayPacket with the sphere in one vectorized solve.
+        Args:
+            packet: A RayPacket in world space.
+        Returns:
+            An (N, 2) array with the two distances of each ray in increasing
+            order, both inf for rays that miss.
+        """
+        inverse, _ = self._inverse_arrays()
+        linear = inverse[:3, :3].T
+        origins = packet.origins @ linear + inverse[:3, 3]
+        directions = packet.directions @ linear
+        a = np.einsum("ij,ij->i", directions, directions)
+        b = 2 * np.einsum("ij,ij->i", directions, origins)
+        c = np.einsum("ij,ij->i", origins, origins) - 1
+        discriminant = b * b - 4 * a * c
+        miss = discriminant < 0
+        root = np.sqrt(np.where(miss, 0.0, discriminant))
+        ts = np.empty((len(packet), 2))
+        ts[:, 0] = (-b - root) / (2 * a)
+        ts[:, 1] = (-b + root) / (2 * a)
+        ts[miss] = np.inf
+        return ts
+
+    def bounds(self):
+        """
+        Returns the world-space axis-aligned bounding box as a (min, max) pair
+        of (3,) arrays. For an affine transform M the unit sphere extends
+        along axis i by the length of row i of M's linear part.
+        """
+        m = self._transform.matrix().to_numpy()
+        half = np.sqrt((m[:3, :3] ** 2).sum(axis=1))
+        return m[:3, 3] - half, m[:3, 3] + half
+
+    def normal_at(self, point):
+        """Returns the world-space surface normal at a world-space Point."""
+        object_point = self._transform.inverse() * point
+        object_normal = object_point - Point(0, 0, 0)
+        world_normal = self._transform.inverse_transpose() * object_normal
+        return Vector(world_normal.x, world_normal.y, world_normal.z).normalize()
+
+    def normals_at(self, points):
+        """Returns the normalized world-space normals at an (N, 3) array of world-space points."""
+        inverse, normal = self._inverse_arrays()
+        object_points = np.asarray(points, dtype=np.float64) @ inverse[:3, :3].T + inverse[:3, 3]
+        normals = object_points @ normal[:3, :3].T
+        return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+    def __repr__(self):
+        """Returns a string representation of the sphere."""
+        return f"Sphere({self._transform})"
+
+
+def intersect_spheres(inverses, origins, directions):
+    """
+    Intersects R rays with K spheres in one vectorized solve.
+    Args:
+        inverses: A (K, 4, 4) array of world-to-object matrices.
+        origins: An (R, 3) array of world-space ray origins.
+        directions: An (R, 3) array of world-space ray directions.
+    Returns:
+        An (R, K) array with the lowest non-negative hit distance of each
+        ray against each sphere, or inf where there is none.
+    """
+    linear = inverses[:, :3, :3]
+    # (R, K, 3) rays in the object space of every sphere
+    o = np.einsum("kij,rj->rki", linear, origins) + inverses[:, :3, 3]
+    d = np.einsum("kij,rj->rki", linear, directions)
+    a = (d * d).sum(axis=2)
+    b = 2 * (d * o).sum(axis=2)
+    c = (o * o).sum(axis=2) - 1
+    discriminant = b * b - 4 * a * c
+    miss = discriminant < 0
+    root = np.sqrt(np.where(miss, 0.0, discriminant))
+    t0 = (-b - root) / (2 * a)
+    t1 = (-b + root) / (2 * a)
+    ts = np.where(t0 >= 0, t0, np.where(t1 >= 0, t1, np.inf))
+    ts[miss] = np.inf
+    return ts
+
+
+def closest_hits(packet, shapes):
+    """
+    Finds the nearest object hit by each ray of a packet.
+    Args:
+        packet: A RayPacket in world space.
+        shapes: A sequence of objects with an intersect_packet method.
+    Returns:
+        A (distances, indices) pair of (N,) arrays: the lowest non-negative
+        hit distance of each ray (inf on a miss) and the index into shapes
+        of the object hit (-1 on a miss).
+    """
+    distances = np.full(len(packet), np.inf)
+    indices = np.full(len(packet), -1, dtype=np.intp)
+    for index, shape in enumerate(shapes):
+        ts = hit_distances(shape.intersect_packet(packet))
+        closer = ts < distances
+        distances[closer] = ts[closer]
+        indices[closer] = index
+    return distances, indices
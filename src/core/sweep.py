@@ -0,0 +1,217 @@
+import functools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from core.canvas import Canvas
+from core.simulation import simulate
+from core.tuples import Vector, Environment
+
+
+def launch_velocities(angles, speeds):
+    """
+    Returns the (N, 3) velocities for every combination of launch angle and speed.
+    Args:
+        angles: Launch angles in radians above the x-axis.
+        speeds: Launch speeds.
+    """
+    angle, speed = np.meshgrid(np.asarray(angles, dtype=np.float64), np.asarray(speeds, dtype=np.float64), indexing="ij")
+    angle, speed = angle.ravel(), speed.ravel()
+    return np.stack([np.cos(angle) * speed, np.sin(angle) * speed, np.zeros_like(angle)], axis=1)
+
+
+class ProjectileGrid:
+    """
+    The Cartesian product of start positions, velocities, gravities and winds.
+    Job i of the sweep is the combination at np.unravel_index(i, grid.shape),
+    so every job has a fixed index no matter how the work is split up.
+    """
+    def __init__(self, starts, velocities, gravities, winds):
+        """
+        Initializes the grid from sequences of (x, y, z) triples.
+        Args:
+            starts: Start positions.
+            velocities: Start velocities.
+            gravities: Gravity vectors.
+            winds: Wind vectors.
+        """
+        self.starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+        self.velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 3)
+        self.gravities = np.asarray(gravities, dtype=np.float64).reshape(-1, 3)
+        self.winds = np.asarray(winds, dtype=np.float64).reshape(-1, 3)
+        self.shape = (len(self.starts), len(self.velocities), len(self.gravities), len(self.winds))
+
+    def __len__(self):
+        """Returns the number of jobs in the grid."""
+        return math.prod(self.shape)
+
+    def parameters(self, start, stop):
+        """Returns the start, velocity, gravity and wind (M, 3) arrays for jobs start..stop-1."""
+        s, v, g, w = np.unravel_index(np.arange(start, stop), self.shape)
+        return self.starts[s], self.velocities[v], self.gravities[g], self.winds[w]
+
+    def environments(self):
+        """Returns one Environment per (gravity, wind) pair, in grid order."""
+        return [Environment(Vector(*gravity), Vector(*wind)) for gravity in self.gravities for wind in self.winds]
+
+
+class ChunkResult:
+    """
+    The results of one contiguous range of sweep jobs.
+    Attributes:
+        start: The index of the first job in the chunk.
+        stop: One past the index of the last job in the chunk.
+        landing_points: An (M, 3) array of landing points.
+        landing_ticks: An (M,) array of flight times in ticks.
+        landed: An (M,) boolean mask of jobs that landed within max_ticks.
+        max_heights: An (M,) array with the highest y of each trajectory.
+        pixels: Flat canvas pixel indices covered by the chunk's trajectories.
+        hits: How many trajectory samples fell on each of those pixels.
+        trajectories: One (n_i, 3) position array per job, or None unless
+            they were requested.
+    """
+    def __init__(self, start, stop, landing_points, landing_ticks, landed, max_heights, pixels, hits,
+                 trajectories=None):
+        self.start = start
+        self.stop = stop
+        self.landing_points = landing_points
+        self.landing_ticks = landing_ticks
+        self.landed = landed
+        self.max_heights = max_heights
+        self.pixels = pixels
+        self.hits = hits
+        self.trajectories = trajectories
+
+
+def simulate_chunk(grid, start, stop, max_ticks, image_size=None, keep_trajectories=False):
+    """
+    Simulates jobs start..stop-1 of a grid. This is the worker function of
+    run_sweep and is also usable on its own. Trajectories are only recorded
+    for the image or when they are kept, so otherwise memory does not grow
+    with the number of ticks.
+    Args:
+        grid: A ProjectileGrid.
+        start: The index of the first job.
+        stop: One past the index of the last job.
+        max_ticks: The maximum number of ticks per projectile.
+        image_size: (width, height) of the composite image, or None to skip it.
+        keep_trajectories: Whether to return the full trajectories.
+    Returns:
+        A ChunkResult.
+    """
+    starts, velocities, _, _ = grid.parameters(start, stop)
+    s, v, g, w = np.unravel_index(np.arange(start, stop), grid.shape)
+    env_index = g * grid.shape[3] + w
+    record = image_size is not None or keep_trajectories
+    result = simulate(starts, velocities, grid.environments(), env_index, max_ticks, record=record)
+    pixels = hits = None
+    if image_size is not None:
+        width, height = image_size
+        samples = np.concatenate(result.trajectories) if result.trajectories else np.empty((0, 3))
+        # Same mapping as projectile_sim.py: y is flipped to canvas coordinates
+        x = samples[:, 0].astype(np.int64)
+        y = height - samples[:, 1].astype(np.int64)
+        inside = (0 <= x) & (x < width) & (0 <= y) & (y < height)
+        pixels, hits = np.unique(y[inside] * width + x[inside], return_counts=True)
+    return ChunkResult(start, stop, result.landing_points, result.landing_ticks, result.landed,
+                       result.max_heights, pixels, hits, result.trajectories if keep_trajectories else None)
+
+
+def iter_chunks(func, total, chunk_size, max_workers=None):
+    """
+    Calls func(start, stop) for consecutive index ranges covering 0..total-1
+    on a process pool and yields the results as they finish.
+    The ranges only depend on total and chunk_size, never on the worker count.
+    Args:
+        func: A picklable function, e.g. functools.partial of a module-level function.
+        total: The number of jobs.
+        chunk_size: The number of jobs per call.
+        max_workers: The number of worker processes (default: every core).
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be a positive integer")
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [pool.submit(func, start, min(start + chunk_size, total))
+                   for start in range(0, total, chunk_size)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class SweepSummary:
+    """
+    The aggregated results of a projectile sweep.
+    Attributes:
+        table: A structured array with one row per job, in job index order.
+        canvas: A composite Canvas of every trajectory, or None.
+    """
+    FIELDS = [("index", np.int64), ("start", np.float64, 3), ("velocity", np.float64, 3),
+              ("gravity", np.float64, 3), ("wind", np.float64, 3), ("landed", np.bool_),
+              ("ticks", np.int64), ("landing", np.float64, 3), ("max_height", np.float64)]
+
+    def __init__(self, table, canvas=None):
+        self.table = table
+        self.canvas = canvas
+
+    def format_table(self, limit=20):
+        """Returns the first rows of the table as aligned text."""
+        lines = [f"{'index':>7} {'speed':>8} {'ticks':>7} {'landing x':>10} {'max height':>11}"]
+        for row in self.table[:limit]:
+            speed = float(np.linalg.norm(row["velocity"]))
+            lines.append(f"{row['index']:>7} {speed:>8.3f} {row['ticks']:>7} "
+                         f"{row['landing'][0]:>10.3f} {row['max_height']:>11.3f}")
+        return "\n".join(lines)
+
+
+def run_sweep(grid, chunk_size=1000, max_workers=None, max_ticks=100000, image_size=None,
+              color=(1, 0, 0), on_chunk=None):
+    """
+    Simulates every job of a ProjectileGrid across a process pool.
+    Chunks are streamed back as they finish. Results are stored by job index
+    and image hits are summed, so the summary is identical for any worker count.
+    Args:
+        grid: A ProjectileGrid.
+        chunk_size: The number of jobs per worker task.
+        max_workers: The number of worker processes (default: every core).
+        max_ticks: The maximum number of ticks per projectile.
+        image_size: (width, height) of a composite trajectory image, or None.
+        color: The color of the most visited pixels in the composite image.
+        on_chunk: Optional callback called with each ChunkResult as it arrives.
+    Returns:
+        A SweepSummary.
+    """
+    total = len(grid)
+    table = np.zeros(total, dtype=SweepSummary.FIELDS)
+    table["index"] = np.arange(total)
+    table["start"], table["velocity"], table["gravity"], table["wind"] = grid.parameters(0, total)
+    hits = None
+    if image_size is not None:
+        hits = np.zeros(image_size[0] * image_size[1], dtype=np.int64)
+    worker = functools.partial(simulate_chunk, grid, max_ticks=max_ticks, image_size=image_size)
+    for chunk in iter_chunks(worker, total, chunk_size, max_workers):
+        rows = table[chunk.start:chunk.stop]
+        rows["landed"] = chunk.landed
+        rows["ticks"] = chunk.landing_ticks
+        rows["landing"] = chunk.landing_points
+        rows["max_height"] = chunk.max_heights
+        if hits is not None:
+            np.add.at(hits, chunk.pixels, chunk.hits)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    canvas = None
+    if hits is not None:
+        width, height = image_size
+        canvas = Canvas(width, height)
+        if hits.any():
+            density = (hits / hits.max()).reshape(height, width, 1)
+            canvas.write_rows(0, density * np.asarray(color, dtype=np.float64))
+    return SweepSummary(table, canvas)
+
+
+if __name__ == "__main__":
+    # Sweep launch angles and speeds in the environment of projectile_sim.py
+    angles = np.linspace(0.1, 1.5, 200)
+    speeds = np.linspace(2, 12, 50)
+    grid = ProjectileGrid([(0, 1, 0)], launch_velocities(angles, speeds), [(0, -0.1, 0)], [(-0.01, 0, 0)])
+    summary = run_sweep(grid, image_size=(900, 550))
+    print(summary.format_table())
+    summary.canvas.save_ppm("sweep.ppm", binary=True)
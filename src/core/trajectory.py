@@ -0,0 +1,210 @@
+import math
+import numpy as np
+from core.tuples import Point, Vector
+
+
+def _vectors(projectile, environment):
+    """
+    Returns the position, velocity and acceleration of a projectile as float
+    arrays. The acceleration mixes the environment like Projectile.tick:
+    (wind.x, gravity.y, gravity.z).
+    """
+    p, v = projectile.position, projectile.velocity
+    g, w = environment.gravity, environment.wind
+    return (np.array([p.x, p.y, p.z], dtype=np.float64),
+            np.array([v.x, v.y, v.z], dtype=np.float64),
+            np.array([w.x, g.y, g.z], dtype=np.float64))
+
+
+def _first_nonnegative_root(a, b, c):
+    """Returns the smallest root t >= 0 of a*t^2 + b*t + c = 0, or None."""
+    if a == 0:
+        if b == 0:
+            return None
+        t = -c / b
+        return t if t >= 0 else None
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    sqrt_disc = math.sqrt(disc)
+    # Numerically stable form of the quadratic formula
+    q = -0.5 * (b + math.copysign(sqrt_disc, b))
+    roots = sorted(r for r in ((q / a), (c / q if q != 0 else -b / a)) if r >= 0)
+    return roots[0] if roots else None
+
+
+def discrete_state(projectile, environment, ticks):
+    """
+    Returns the projectile after the given number of Projectile.tick steps, in O(1).
+    With constant acceleration a, after n ticks
+    position = p + n*v + a*n*(n-1)/2 and velocity = v + n*a.
+    Args:
+        projectile: A Projectile.
+        environment: An Environment.
+        ticks: The number of ticks.
+    Returns:
+        A (Point, Vector) pair with the position and velocity.
+    """
+    p, v, a = _vectors(projectile, environment)
+    position = p + ticks * v + a * (ticks * (ticks - 1) / 2)
+    velocity = v + ticks * a
+    return Point(*position.tolist()), Vector(*velocity.tolist())
+
+
+def discrete_landing_tick(projectile, environment):
+    """
+    Returns the number of Projectile.tick steps after which y is first <= 0.
+    This is the same tick count the `while proj.position.y > 0` loop of
+    projectile_sim.py runs, computed in O(1).
+    Returns:
+        The tick count, or None if the projectile never comes down.
+    """
+    p, v, a = _vectors(projectile, environment)
+    if p[1] <= 0:
+        return 0
+    # y(n) = y0 + n*vy + ay*n*(n-1)/2 is a quadratic in n
+    root = _first_nonnegative_root(a[1] / 2, v[1] - a[1] / 2, p[1])
+    if root is None:
+        return None
+    n = max(1, math.ceil(root))
+    y = lambda n: p[1] + n * v[1] + a[1] * n * (n - 1) / 2
+    # Correct for rounding in the root near integer values
+    while n > 1 and y(n - 1) <= 0:
+        n -= 1
+    while y(n) > 0:
+        n += 1
+    return n
+
+
+def analytic_state(projectile, environment, t):
+    """
+    Returns the exact state at time t of a projectile under constant gravity and wind:
+    position = p + v*t + a*t^2/2 and velocity = v + a*t.
+    Returns:
+        A (Point, Vector) pair with the position and velocity.
+    """
+    p, v, a = _vectors(projectile, environment)
+    position = p + v * t + a * (t * t / 2)
+    velocity = v + a * t
+    return Point(*position.tolist()), Vector(*velocity.tolist())
+
+
+def analytic_landing_time(projectile, environment):
+    """
+    Returns the time at which the exact trajectory reaches y = 0.
+    Returns:
+        The landing time, or None if the projectile never comes down.
+    """
+    p, v, a = _vectors(projectile, environment)
+    if p[1] <= 0:
+        return 0.0
+    return _first_nonnegative_root(a[1] / 2, v[1], p[1])
+
+
+class IntegrationResult:
+    """
+    The output of integrate().
+    Attributes:
+        times: The accepted sample times, starting at 0.
+        positions: A (K, 3) array of positions at those times.
+        velocities: A (K, 3) array of velocities at those times.
+        landed: Whether y reached 0 before the step or time limits.
+        landing_time: The time of the landing, or None.
+        landing_point: The landing position as a Point, or None.
+        steps: The number of accepted steps.
+        rejected: The number of steps rejected by the error control.
+    """
+    def __init__(self, times, positions, velocities, landed, landing_time, landing_point, steps, rejected):
+        self.times = times
+        self.positions = positions
+        self.velocities = velocities
+        self.landed = landed
+        self.landing_time = landing_time
+        self.landing_point = landing_point
+        self.steps = steps
+        self.rejected = rejected
+
+
+def _rk4(derivative, t, state, h):
+    """Advances state by one classic Runge-Kutta step of size h."""
+    k1 = derivative(t, state)
+    k2 = derivative(t + h / 2, state + h / 2 * k1)
+    k3 = derivative(t + h / 2, state + h / 2 * k2)
+    k4 = derivative(t + h, state + h * k3)
+    return state + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def integrate(projectile, environment, acceleration=None, tolerance=1e-6, initial_step=1.0,
+              max_step=None, t_max=1e6, max_steps=100000):
+    """
+    Integrates a trajectory with adaptive-step RK4 until it reaches y = 0.
+    Each step is compared against two half steps; the step is rejected and
+    shrunk if they differ by more than the tolerance, and grown otherwise.
+    The landing time is found by bisecting the final step.
+    Args:
+        projectile: A Projectile with the start position and velocity.
+        environment: An Environment; its Projectile.tick acceleration is the default.
+        acceleration: Optional function (t, position, velocity) -> (3,) array,
+            e.g. to add drag. It replaces the constant environment acceleration.
+        tolerance: The maximum position/velocity error allowed per step.
+        initial_step: The first step size to try.
+        max_step: The largest allowed step size (default: unlimited).
+        t_max: Stop integrating at this time.
+        max_steps: Stop after this many accepted steps.
+    Returns:
+        An IntegrationResult.
+    """
+    p, v, a = _vectors(projectile, environment)
+    if acceleration is None:
+        accel = lambda t, position, velocity: a
+    else:
+        accel = lambda t, position, velocity: np.asarray(acceleration(t, position, velocity), dtype=np.float64)
+    derivative = lambda t, s: np.concatenate([s[3:], accel(t, s[:3], s[3:])])
+    max_step = max_step or math.inf
+
+    t = 0.0
+    state = np.concatenate([p, v])
+    times = [t]
+    states = [state]
+    h = min(initial_step, max_step)
+    steps = rejected = 0
+    landed = state[1] <= 0
+    landing_time = 0.0 if landed else None
+    while not landed and steps < max_steps and t < t_max:
+        h = min(h, max_step, t_max - t)
+        full = _rk4(derivative, t, state, h)
+        half = _rk4(derivative, t + h / 2, _rk4(derivative, t, state, h / 2), h / 2)
+        error = np.max(np.abs(full - half)) / 15
+        if error > tolerance and h > 1e-12:
+            h *= max(0.1, 0.9 * (tolerance / error) ** 0.2)
+            rejected += 1
+            continue
+        # Richardson extrapolation of the two estimates
+        new_state = half + (half - full) / 15
+        if new_state[1] <= 0:
+            # Bisect the step for the time at which y crosses 0
+            low, high = 0.0, h
+            for _ in range(60):
+                mid = (low + high) / 2
+                if _rk4(derivative, t, state, mid)[1] > 0:
+                    low = mid
+                else:
+                    high = mid
+            new_state = _rk4(derivative, t, state, high)
+            new_state[1] = 0.0
+            h = high
+            landed = True
+            landing_time = t + h
+        t += h
+        state = new_state
+        times.append(t)
+        states.append(state)
+        steps += 1
+        if error > 0:
+            h *= min(5.0, 0.9 * (tolerance / error) ** 0.2)
+        else:
+            h *= 5.0
+    states = np.array(states)
+    landing_point = Point(*states[-1, :3].tolist()) if landed else None
+    return IntegrationResult(np.array(times), states[:, :3], states[:, 3:], bool(landed),
+                             landing_time, landing_point, steps, rejected)
@@ -1,6 +1,9 @@
 import math
+import numpy as np
 
 class Tuple:
+    __slots__ = ("x", "y", "z", "w")
+
     def __init__(self, x, y, z, w):
         """
         Initializes a Tuple object with x, y, z coordinates and a w component.
@@ -29,13 +32,13 @@ class Tuple:
             TypeError: If the other object is not a Tuple."""
         if not isinstance(other, Tuple):
             raise TypeError("Can only add another Tuple")
-        result = Tuple(self.x + other.x, self.y + other.y, self.z + other.z, self.w + other.w)
-        if result.w == 1.0 or result.w == 2.0:
-            return Point(result.x, result.y, result.z)
-        elif result.w == 0.0:
-            return Vector(result.x, result.y, result.z)
+        w = self.w + other.w
+        if w == 1.0 or w == 2.0:
+            return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+        elif w == 0.0:
+            return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
         else:
-            return result
+            return Tuple(self.x + other.x, self.y + other.y, self.z + other.z, w)
 
     def subtract(self, other):
         """
@@ -175,9 +178,15 @@ class Tuple:
         Raises:
             IndexError: If the index is out of range.
         """
-        if index < 0 or index >= 4:
-            raise IndexError("Index out of range")
-        return [self.x, self.y, self.z, self.w][index]
+        if index == 0:
+            return self.x
+        elif index == 1:
+            return self.y
+        elif index == 2:
+            return self.z
+        elif index == 3:
+            return self.w
+        raise IndexError("Index out of range")
     
     def __setitem__(self, index, value):
         """
@@ -218,13 +227,104 @@ class Tuple:
                 abs(self.z - other.z) < epsilon and 
                 abs(self.w - other.w) < epsilon)
 
+    def __add__(self, other):
+        """Returns self.add(other)."""
+        if not isinstance(other, Tuple):
+            return NotImplemented
+        return self.add(other)
+
+    def __sub__(self, other):
+        """Returns self.subtract(other)."""
+        if not isinstance(other, Tuple):
+            return NotImplemented
+        return self.subtract(other)
+
+    def __neg__(self):
+        """Returns self.negate()."""
+        return self.negate()
+
+    def __mul__(self, scalar):
+        """Returns self.multiply(scalar)."""
+        if isinstance(scalar, Tuple):
+            return NotImplemented
+        return self.multiply(scalar)
+
+    def __rmul__(self, scalar):
+        """Returns self.multiply(scalar), so scalar * tuple works too."""
+        return self.__mul__(scalar)
+
+    def __truediv__(self, scalar):
+        """Returns self.divide(scalar)."""
+        return self.divide(scalar)
+
+    def __iadd__(self, other):
+        """
+        Adds other to this Tuple in place.
+        The Tuple is updated without allocating when the result keeps its w
+        component (e.g. Point += Vector); otherwise a new Tuple is returned.
+        """
+        if not isinstance(other, Tuple):
+            return NotImplemented
+        if other.w != 0.0 and not isinstance(self, Color):
+            return self.add(other)
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __isub__(self, other):
+        """
+        Subtracts other from this Tuple in place.
+        The Tuple is updated without allocating when the result keeps its w
+        component (e.g. Point -= Vector); otherwise a new Tuple is returned.
+        """
+        if not isinstance(other, Tuple):
+            return NotImplemented
+        if other.w != 0.0 and not isinstance(self, Color):
+            return self.subtract(other)
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
+
+    def __imul__(self, scalar):
+        """
+        Multiplies this Tuple by a scalar in place.
+        Points are not scaled in place because their w component would change.
+        """
+        if isinstance(scalar, Tuple):
+            return NotImplemented
+        if self.w != 0.0 and scalar != 1:
+            return self.multiply(scalar)
+        self.x *= scalar
+        self.y *= scalar
+        self.z *= scalar
+        return self
+
+    def __itruediv__(self, scalar):
+        """
+        Divides this Tuple by a scalar in place.
+        Points are not divided in place because their w component would change.
+        """
+        if self.w != 0.0 and scalar != 1:
+            return self.divide(scalar)
+        self.x /= scalar
+        self.y /= scalar
+        self.z /= scalar
+        return self
+
 class Point(Tuple):
     """
     Represents a point in 3D space.
     Inherits from the Tuple class.
     """
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 1.0)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 1.0
 
     def __repr__(self):
         """Returns a string representation of the Point."""
@@ -235,8 +335,13 @@ class Vector(Tuple):
     Represents a vector in 3D space.
     Inherits from the Tuple class.
     """
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 0.0)
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = 0.0
     def __repr__(self):
         """Returns a string representation of the Vector."""
         return f"Vector({self.x}, {self.y}, {self.z})"
@@ -260,10 +365,27 @@ class Projectile():
         Returns:
             A new Projectile with updated position and velocity.
         """
-        position = Point(proj.position.x + proj.velocity.x, proj.position.y + proj.velocity.y, proj.position.z + proj.velocity.z)
+        position = proj.position + proj.velocity
         velocity = Vector(proj.velocity.x + env.wind.x, proj.velocity.y + env.gravity.y, proj.velocity.z + env.gravity.z)
         return Projectile(position, velocity)
 
+    def step(self, env):
+        """
+        Advances this projectile by one time step in place, like tick.
+        The position and velocity Tuples are updated without allocating,
+        so they must not be shared with other code that expects them to stay fixed.
+        Args:
+            env: An object with gravity and wind vectors.
+        Returns:
+            This projectile.
+        """
+        self.position += self.velocity
+        velocity = self.velocity
+        velocity.x += env.wind.x
+        velocity.y += env.gravity.y
+        velocity.z += env.gravity.z
+        return self
+
 class Environment():
     """
     Represents the environment in which a projectile moves.
@@ -278,8 +400,13 @@ class Color(Tuple):
     Represents a color in RGB space.
     Contains red, green, and blue components.
     """
+    __slots__ = ()
+
     def __init__(self, red, green, blue):
-        super().__init__(red, green, blue, 0.0)
+        self.x = red
+        self.y = green
+        self.z = blue
+        self.w = 0.0
 
     def add(self, other):
         """
@@ -321,6 +448,12 @@ class Color(Tuple):
             A new Color with the product of components.
         """
         return Color(self.x * other.x, self.y * other.y, self.z * other.z)
+
+    def __mul__(self, other):
+        """Multiplies by another Color (Hadamard product) or by a scalar."""
+        if isinstance(other, Color):
+            return self.multiply_color(other)
+        return Tuple.__mul__(self, other)
     
     def __eq__(self, other):
         """
@@ -333,4 +466,334 @@ class Color(Tuple):
         if not isinstance(other, Color):
             return False
         return (self.x - other.x < 1e-5) and (self.y - other.y < 1e-5) and (self.z - other.z < 1e-5) and (self.w - other.w < 1e-5)
-    
\ No newline at end of file
+    
+class TupleArray:
+    """
+    Represents many Tuples at once as a structure of arrays.
+    The x, y, z and w components are stored as the rows of a single
+    contiguous (4, N) NumPy buffer so that arithmetic runs vectorized
+    over every element instead of allocating one object per Tuple.
+    """
+    def __init__(self, x, y, z, w):
+        """
+        Initializes a TupleArray from per-component sequences.
+        Args:
+            x: The x coordinates.
+            y: The y coordinates.
+            z: The z coordinates.
+            w: The w components (a scalar is broadcast to every element).
+        Raises:
+            ValueError: If the component sequences differ in length.
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        z = np.asarray(z, dtype=np.float64).ravel()
+        if not (len(x) == len(y) == len(z)):
+            raise ValueError("Component arrays must have the same length")
+        self.data = np.empty((4, len(x)), dtype=np.float64)
+        self.data[0] = x
+        self.data[1] = y
+        self.data[2] = z
+        self.data[3] = w
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Wraps an existing (4, N) array without copying it.
+        Args:
+            data: A float64 array of shape (4, N).
+        Returns:
+            A new array Tuple sharing the given buffer.
+        Raises:
+            ValueError: If the array does not have four rows.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[0] != 4:
+            raise ValueError("Data must have shape (4, N)")
+        result = cls.__new__(cls)
+        result.data = data
+        return result
+
+    @classmethod
+    def from_tuples(cls, tuples):
+        """
+        Builds an array from a sequence of Tuple objects.
+        Args:
+            tuples: A sequence of Tuple objects.
+        Returns:
+            A new array holding the components of every Tuple.
+        """
+        data = np.array([[t.x, t.y, t.z, t.w] for t in tuples], dtype=np.float64).reshape(-1, 4)
+        return cls.from_data(np.ascontiguousarray(data.T))
+
+    def to_tuples(self):
+        """
+        Returns a list of Tuple objects, one per element.
+        Elements with w = 1.0 become Points and elements with w = 0.0 become
+        Vectors, like the results of the scalar Tuple operations.
+        """
+        return [self[i] for i in range(len(self))]
+
+    @property
+    def x(self):
+        """The x coordinates."""
+        return self.data[0]
+
+    @property
+    def y(self):
+        """The y coordinates."""
+        return self.data[1]
+
+    @property
+    def z(self):
+        """The z coordinates."""
+        return self.data[2]
+
+    @property
+    def w(self):
+        """The w components."""
+        return self.data[3]
+
+    def add(self, other):
+        """
+        Returns the element-wise sum of two arrays.
+        Follows the scalar rules: Point + Vector is a Point, Vector + Vector
+        is a Vector and Point + Point collapses back to w = 1.0.
+        Args:
+            other: A TupleArray of the same length, or a single Tuple.
+        Returns:
+            A new array with the sum of coordinates.
+        Raises:
+            TypeError: If the other object is not a Tuple or TupleArray.
+        """
+        other = _as_tuple_data(other, "Can only add another Tuple")
+        data = self.data + other
+        data[3] = np.where(data[3] == 2.0, 1.0, data[3])
+        return _wrap(data)
+
+    def subtract(self, other):
+        """
+        Returns the element-wise difference between two arrays.
+        Args:
+            other: A TupleArray of the same length, or a single Tuple.
+        Returns:
+            A new array with the difference of coordinates.
+        Raises:
+            TypeError: If the other object is not a Tuple or TupleArray,
+                or if a Point would be subtracted from a Vector.
+        """
+        other = _as_tuple_data(other, "Can only subtract another Tuple")
+        if np.any((self.data[3] == 0.0) & (other[3] == 1.0)):
+            raise TypeError("Cannot subtract a Point from a Vector")
+        return _wrap(self.data - other)
+
+    def negate(self):
+        """
+        Returns a new array with each element negated.
+        Points and Vectors keep their w component, generic Tuples negate it.
+        """
+        data = -self.data
+        data[3] = np.where(self.data[3] == 1.0, 1.0, data[3])
+        return _wrap(data)
+
+    def multiply(self, scalar):
+        """
+        Returns a new array with each component multiplied by the scalar.
+        Args:
+            scalar: A float, or an array of N floats applied per element.
+        Returns:
+            A new array with each component multiplied by the scalar.
+        """
+        return _wrap(self.data * np.asarray(scalar, dtype=np.float64))
+
+    def divide(self, scalar):
+        """
+        Returns a new array with each component divided by the scalar.
+        Args:
+            scalar: A float, or an array of N floats applied per element.
+        Returns:
+            A new array with each component divided by the scalar.
+        """
+        return _wrap(self.data / np.asarray(scalar, dtype=np.float64))
+
+    def magnitude(self):
+        """
+        Returns an array with the magnitude (length) of every element.
+        """
+        return np.sqrt(np.einsum("ij,ij->j", self.data, self.data))
+
+    def normalize(self):
+        """
+        Returns a new array where every element has length 1.
+        """
+        return _wrap(self.data / self.magnitude())
+
+    def dot(self, other):
+        """
+        Returns an array with the dot product of each pair of elements.
+        Args:
+            other: A TupleArray of the same length, or a single Tuple.
+        """
+        other = _as_tuple_data(other, "Can only dot another Tuple")
+        return np.einsum("ij,ij->j", self.data, np.broadcast_to(other, self.data.shape))
+
+    def cross(self, other):
+        """
+        Returns a VectorArray with the cross product of each pair of elements.
+        Args:
+            other: A TupleArray of the same length, or a single Tuple.
+        """
+        other = _as_tuple_data(other, "Can only cross another Tuple")
+        ax, ay, az = self.data[0], self.data[1], self.data[2]
+        bx, by, bz = other[0], other[1], other[2]
+        return VectorArray(ay*bz - az*by, az*bx - ax*bz, ax*by - ay*bx)
+
+    def is_point(self):
+        """
+        Returns a boolean mask that is True where w = 1.0.
+        """
+        return self.data[3] == 1.0
+
+    def is_vector(self):
+        """
+        Returns a boolean mask that is True where w = 0.0.
+        """
+        return self.data[3] == 0.0
+
+    def compare(self, other, epsilon=1e-5):
+        """
+        Compares two arrays element by element within a tolerance.
+        Args:
+            other: A TupleArray of the same length, or a single Tuple.
+            epsilon: A small value for comparing floating-point numbers.
+        Returns:
+            A boolean mask that is True where the elements are equal.
+        """
+        other = _as_tuple_data(other, "Can only compare another Tuple")
+        return np.all(np.abs(self.data - other) < epsilon, axis=0)
+
+    def __len__(self):
+        """
+        Returns the number of Tuples in the array.
+        """
+        return self.data.shape[1]
+
+    def __getitem__(self, index):
+        """
+        Returns the element at the given index as a Tuple object.
+        Args:
+            index: An integer index.
+        Returns:
+            A Point, Vector or Tuple depending on the w component.
+        """
+        x, y, z, w = (float(c) for c in self.data[:, index])
+        if w == 1.0:
+            return Point(x, y, z)
+        elif w == 0.0:
+            return Vector(x, y, z)
+        return Tuple(x, y, z, w)
+
+    def __repr__(self):
+        """Returns a string representation of the TupleArray."""
+        return f"{type(self).__name__}(n={len(self)})"
+
+class PointArray(TupleArray):
+    """
+    Represents many points in 3D space.
+    Inherits from the TupleArray class.
+    """
+    def __init__(self, x, y, z):
+        super().__init__(x, y, z, 1.0)
+
+class VectorArray(TupleArray):
+    """
+    Represents many vectors in 3D space.
+    Inherits from the TupleArray class.
+    """
+    def __init__(self, x, y, z):
+        super().__init__(x, y, z, 0.0)
+
+class ColorArray(TupleArray):
+    """
+    Represents many colors in RGB space.
+    Color arithmetic is component-wise and ignores the point/vector w rules.
+    """
+    def __init__(self, red, green, blue):
+        super().__init__(red, green, blue, 0.0)
+
+    def add(self, other):
+        """
+        Returns a new ColorArray with the sum of components.
+        """
+        return ColorArray.from_data(self.data + _as_tuple_data(other, "Can only add another Color"))
+
+    def subtract(self, other):
+        """
+        Returns a new ColorArray with the difference of components.
+        """
+        return ColorArray.from_data(self.data - _as_tuple_data(other, "Can only subtract another Color"))
+
+    def multiply(self, scalar):
+        """
+        Returns a new ColorArray with each component multiplied by the scalar.
+        """
+        return ColorArray.from_data(self.data * np.asarray(scalar, dtype=np.float64))
+
+    def divide(self, scalar):
+        """
+        Returns a new ColorArray with each component divided by the scalar.
+        """
+        return ColorArray.from_data(self.data / np.asarray(scalar, dtype=np.float64))
+
+    def negate(self):
+        """
+        Returns a new ColorArray with each component negated.
+        """
+        return ColorArray.from_data(-self.data)
+
+    def normalize(self):
+        """
+        Returns a new ColorArray where every color has length 1.
+        """
+        return ColorArray.from_data(self.data / self.magnitude())
+
+    def multiply_color(self, other):
+        """
+        Returns a new ColorArray with the Hadamard product of two colors.
+        """
+        return ColorArray.from_data(self.data * _as_tuple_data(other, "Can only multiply another Color"))
+
+    def __getitem__(self, index):
+        """
+        Returns the element at the given index as a Color object.
+        """
+        red, green, blue = (float(c) for c in self.data[:3, index])
+        return Color(red, green, blue)
+
+def _as_tuple_data(other, message):
+    """Returns the (4, N) or (4, 1) component data of a TupleArray or Tuple."""
+    if isinstance(other, TupleArray):
+        return other.data
+    if isinstance(other, Tuple):
+        return np.array([[other.x], [other.y], [other.z], [other.w]], dtype=np.float64)
+    raise TypeError(message)
+
+def _as_xyz(values, name):
+    """Returns an (N, 3) float array from a TupleArray, a list of Tuples or an array-like of xyz rows."""
+    if isinstance(values, TupleArray):
+        return np.ascontiguousarray(values.data[:3].T)
+    if len(values) and isinstance(values[0], Tuple):
+        return np.array([(t.x, t.y, t.z) for t in values], dtype=np.float64)
+    values = np.array(values, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] != 3:
+        raise ValueError(f"{name} must have shape (N, 3)")
+    return values
+
+def _wrap(data):
+    """Wraps component data in the most specific array type for its w values."""
+    w = data[3]
+    if np.all(w == 1.0):
+        return PointArray.from_data(data)
+    if np.all(w == 0.0):
+        return VectorArray.from_data(data)
+    return TupleArray.from_data(data)
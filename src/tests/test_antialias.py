@@ -0,0 +1,72 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.antialias import AdaptiveSupersampler, contrast
+from core.canvas import TiledCanvas
+
+def disc(xs, ys):
+    """A white disc of radius 10 centred at (16, 16) on black."""
+    inside = (xs - 16) ** 2 + (ys - 16) ** 2 <= 100
+    return np.repeat(inside[:, None].astype(np.float64), 3, axis=1)
+
+def reference(n=32):
+    """Returns the disc supersampled on a fine 32 x 32 grid per pixel."""
+    sampler = AdaptiveSupersampler(32, 32, disc)
+    ys, xs = np.mgrid[0:32, 0:32]
+    return sampler._sample_grid(xs.ravel(), ys.ravel(), n).mean(axis=1).reshape(32, 32, 3)
+
+def test_contrast():
+    """Tests the neighbour contrast measure."""
+    pixels = np.zeros((3, 4, 3))
+    pixels[1, 1] = [0.2, 0.9, 0.0]
+    c = contrast(pixels)
+    # Test 1: The pixel and its four neighbours see the largest channel difference
+    assert c[1, 1] == pytest.approx(0.9)
+    assert c[0, 1] == pytest.approx(0.9) and c[1, 2] == pytest.approx(0.9)
+    # Test 2: Diagonal and distant pixels are flat
+    assert c[0, 0] == 0 and c[2, 3] == 0
+
+def test_adaptive_supersampling_refines_edges_only():
+    """Tests that extra samples go only to edge pixels and improve them."""
+    sampler = AdaptiveSupersampler(32, 32, disc, threshold=0.1, max_depth=3)
+    canvas = sampler.render()
+    stats = sampler.stats
+    # Test 1: Only a band around the circle is refined, in shrinking sets
+    assert 0 < stats.refined_fraction < 0.3
+    assert len(stats.refined) == 3
+    assert stats.refined[0] >= stats.refined[1] >= stats.refined[2]
+    assert stats.samples == 32 * 32 + 4 * stats.refined[0] + 16 * stats.refined[1] + 64 * stats.refined[2]
+    assert stats.samples_per_pixel < 8
+    # Test 2: Flat areas keep their single sample
+    assert canvas.pixel_at(16, 16) == (1, 1, 1)
+    assert canvas.pixel_at(0, 0) == (0, 0, 0)
+    # Test 3: Closer to the reference than one sample per pixel
+    single = AdaptiveSupersampler(32, 32, disc, max_depth=0)
+    aliased = single.render()
+    assert single.stats.refined == [] and single.stats.samples == 32 * 32
+    expected = reference()
+    assert np.abs(canvas.pixels - expected).mean() < np.abs(aliased.pixels - expected).mean() / 2
+
+def test_refine_existing_canvas():
+    """Tests refining a canvas rendered elsewhere."""
+    first = AdaptiveSupersampler(32, 32, disc, max_depth=0).render()
+    sampler = AdaptiveSupersampler(32, 32, disc, threshold=0.1, max_depth=2)
+    # Test 1: Refines in place and counts only the extra samples
+    result = sampler.refine(first)
+    assert result is first
+    assert sampler.stats.samples == 4 * sampler.stats.refined[0] + 16 * sampler.stats.refined[1]
+    # Test 2: Same result as a full render
+    assert np.array_equal(first.pixels, AdaptiveSupersampler(32, 32, disc, 0.1, 2).render().pixels)
+
+def test_refine_tiled_canvas():
+    """Tests refining a tiled canvas through its tile cache."""
+    expected = AdaptiveSupersampler(32, 32, disc, 0.1, 2).render().pixels
+    first = AdaptiveSupersampler(32, 32, disc, max_depth=0).render()
+    with TiledCanvas(32, 32, tile_size=8, cache_tiles=3) as tiled:
+        tiled.write_region(0, 0, first.pixels)
+        AdaptiveSupersampler(32, 32, disc, threshold=0.1, max_depth=2).refine(tiled)
+        assert np.array_equal(tiled.pixels, expected)
@@ -0,0 +1,136 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.bvh import BVH
+from core.spheres import Sphere, closest_hits
+from core.rays import Ray, RayPacket
+from core.matrices import Transform
+from core.tuples import Point, Vector
+
+def random_scene(n, seed=0):
+    """Returns n randomly placed and scaled spheres."""
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-10, 10, (n, 3))
+    radii = rng.uniform(0.1, 0.8, n)
+    return [Sphere(Transform().scale(r, r * 1.5, r).rotate_y(r).translate(*p))
+            for p, r in zip(positions, radii)]
+
+def camera_packet(n=40):
+    """Returns an n x n grid of rays looking down +z through the scene."""
+    xs, ys = np.meshgrid(np.linspace(-0.6, 0.6, n), np.linspace(-0.6, 0.6, n))
+    directions = np.stack([xs.ravel(), ys.ravel(), np.ones(n * n)], axis=1)
+    return RayPacket(np.tile([0.0, 0.0, -20.0], (n * n, 1)), directions)
+
+class Proxy:
+    """A shape that is not a Sphere, to exercise the generic leaf path."""
+    def __init__(self, sphere):
+        self.sphere = sphere
+    def bounds(self):
+        return self.sphere.bounds()
+    def intersect_packet(self, packet):
+        return self.sphere.intersect_packet(packet)
+
+def test_sphere_bounds():
+    """Tests world-space bounds derived from the sphere transform."""
+    lo, hi = Sphere().bounds()
+    # Test 1: Unit sphere
+    assert np.allclose(lo, [-1, -1, -1]) and np.allclose(hi, [1, 1, 1])
+    # Test 2: Scaled and translated
+    lo, hi = Sphere(Transform().scale(2, 3, 4).translate(1, 0, 0)).bounds()
+    assert np.allclose(lo, [-1, -3, -4]) and np.allclose(hi, [3, 3, 4])
+    # Test 3: Rotated ellipsoid is tight, not the box of a rotated box
+    lo, hi = Sphere(Transform().scale(2, 1, 1).rotate_z(np.pi / 4)).bounds()
+    assert np.allclose(hi, [np.sqrt(2.5), np.sqrt(2.5), 1])
+
+def test_bvh_matches_brute_force():
+    """Tests that BVH traversal finds the same hits as testing every shape."""
+    shapes = random_scene(300)
+    packet = camera_packet()
+    bvh = BVH(shapes)
+    distances, indices = bvh.intersect(packet)
+    expected_distances, expected_indices = closest_hits(packet, shapes)
+    # Test 1: Same hits
+    assert (indices >= 0).any() and (indices < 0).any()
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(distances, expected_distances)
+    # Test 2: The generic leaf path agrees
+    generic = BVH([Proxy(s) for s in shapes])
+    distances, indices = generic.intersect(packet)
+    assert np.array_equal(indices, expected_indices)
+    # Test 3: Single ray helper
+    hit = bvh.hit(packet[int(np.flatnonzero(expected_indices >= 0)[0])])
+    assert hit.object is shapes[expected_indices[expected_indices >= 0][0]]
+    assert bvh.hit(Ray(Point(0, 100, 0), Vector(0, 1, 0))) is None
+
+def test_bvh_layout_and_stats():
+    """Tests the flattened node array and the build and traversal statistics."""
+    shapes = random_scene(500, seed=3)
+    bvh = BVH(shapes, max_leaf_size=4)
+    nodes = bvh.nodes
+    leaf = nodes["count"] > 0
+    # Test 1: Leaves cover every primitive exactly once
+    assert nodes["count"].sum() == 500
+    assert sorted(bvh.order.tolist()) == list(range(500))
+    assert nodes["count"].max() <= 4
+    # Test 2: Children are adjacent, after their parent, and inside its box
+    left = nodes["offset"][~leaf]
+    parents = np.flatnonzero(~leaf)
+    assert (left > parents).all()
+    for child in (left, left + 1):
+        assert (nodes["lo"][child] >= nodes["lo"][parents]).all()
+        assert (nodes["hi"][child] <= nodes["hi"][parents]).all()
+    # Test 3: Build stats
+    stats = bvh.build_stats
+    assert stats.primitives == 500
+    assert stats.nodes == len(nodes)
+    assert stats.leaves == int(leaf.sum())
+    assert stats.leaves * 2 - 1 == stats.nodes
+    assert stats.mean_leaf_size == pytest.approx(500 / stats.leaves)
+    # Test 4: Traversal stats accumulate and culling beats brute force
+    packet = camera_packet(20)
+    bvh.intersect(packet)
+    traversal = bvh.traversal_stats
+    assert traversal.rays == 400
+    assert 0 < traversal.primitive_tests_per_ray < 500
+    bvh.intersect(packet)
+    assert traversal.rays == 800
+    traversal.reset()
+    assert traversal.rays == 0
+
+def test_bvh_refit():
+    """Tests refitting after shapes move."""
+    shapes = random_scene(200, seed=5)
+    bvh = BVH(shapes)
+    # Test 1: Refit with no change keeps the bounds
+    before = bvh.nodes.copy()
+    bvh.refit()
+    assert np.array_equal(before["lo"], bvh.nodes["lo"])
+    assert np.array_equal(before["hi"], bvh.nodes["hi"])
+    # Test 2: Move some spheres; refit gives the same answers as brute force
+    for shape in shapes[::3]:
+        shape.transform = shape.transform.translate(0, 0, 5)
+    bvh.refit()
+    packet = camera_packet()
+    distances, indices = bvh.intersect(packet)
+    assert np.array_equal(indices, closest_hits(packet, shapes)[1])
+    lo, hi = bvh.bounds
+    assert np.allclose(hi, np.max([s.bounds()[1] for s in shapes], axis=0))
+
+def test_bvh_degenerate_scenes():
+    """Tests scenes with one shape and with coincident shapes."""
+    # Test 1: A single shape is one leaf
+    bvh = BVH([Sphere()])
+    assert len(bvh.nodes) == 1
+    assert bvh.hit(Ray(Point(0, 0, -5), Vector(0, 0, 1))).t == 4.0
+    # Test 2: Coincident centroids are still split down to the leaf size
+    bvh = BVH([Sphere(Transform().scale(s, s, s)) for s in np.linspace(0.5, 1, 20)], max_leaf_size=4)
+    assert bvh.nodes["count"].max() <= 4
+    hit = bvh.hit(Ray(Point(0, 0, -5), Vector(0, 0, 1)))
+    assert hit.t == pytest.approx(4.0)
+    # Test 3: Empty scenes are rejected
+    with pytest.raises(ValueError):
+        BVH([])
@@ -0,0 +1,80 @@
+import sys
+import os
+import math
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.camera import Camera
+from core.matrices import Matrix, Matrix4, Transform
+from core.tuples import Point, Vector
+
+def test_view_transform():
+    """Tests building view transforms from an eye, a target and an up vector."""
+    # Test 1: Default orientation is the identity
+    t = Matrix.view_transform(Point(0, 0, 0), Point(0, 0, -1), Vector(0, 1, 0))
+    assert t.compare(Matrix4.identity())
+    # Test 2: Looking in the positive z direction mirrors x and z
+    t = Matrix.view_transform(Point(0, 0, 0), Point(0, 0, 1), Vector(0, 1, 0))
+    assert t.compare(Matrix4.scaled_matrix(-1, 1, -1))
+    # Test 3: Moving the eye moves the world
+    t = Matrix4.view_transform(Point(0, 0, 8), Point(0, 0, 0), Vector(0, 1, 0))
+    assert t.compare(Matrix4.translation_matrix(0, 0, -8))
+    # Test 4: Arbitrary view
+    t = Matrix4.view_transform(Point(1, 3, 2), Point(4, -2, 8), Vector(1, 1, 0))
+    expected = Matrix(4, 4)
+    expected.set_values([[-0.50709, 0.50709, 0.67612, -2.36643],
+                         [0.76772, 0.60609, 0.12122, -2.82843],
+                         [-0.35857, 0.59761, -0.71714, 0.00000],
+                         [0.00000, 0.00000, 0.00000, 1.00000]])
+    assert t.compare(expected)
+
+def test_camera_pixel_size():
+    """Tests the pixel size for landscape and portrait canvases."""
+    assert Camera(200, 125, math.pi / 2).pixel_size == pytest.approx(0.01)
+    assert Camera(125, 200, math.pi / 2).pixel_size == pytest.approx(0.01)
+
+def test_ray_for_pixel():
+    """Tests constructing single rays through the canvas."""
+    c = Camera(201, 101, math.pi / 2)
+    # Test 1: Through the centre of the canvas
+    r = c.ray_for_pixel(100, 50)
+    assert r.origin == Point(0, 0, 0)
+    assert r.direction == Vector(0, 0, -1)
+    # Test 2: Through a corner
+    r = c.ray_for_pixel(0, 0)
+    assert r.direction == Vector(0.66519, 0.33259, -0.66851)
+    # Test 3: With a transformed camera
+    c.transform = Transform().translate(0, -2, 5).rotate_y(math.pi / 4)
+    r = c.ray_for_pixel(100, 50)
+    assert r.origin == Point(0, 2, -5)
+    assert r.direction == Vector(math.sqrt(2) / 2, 0, -math.sqrt(2) / 2)
+
+def test_packet_rays_match_scalar():
+    """Tests that tile and frame rays match ray_for_pixel."""
+    c = Camera(32, 24, math.pi / 3).look_at(Point(1, 3, -6), Point(0, 0.5, 0), Vector(0, 1, 0))
+    frame = c.frame_rays()
+    # Test 1: One ray per pixel, row by row
+    assert len(frame) == 32 * 24
+    for px, py in [(0, 0), (31, 0), (5, 17), (31, 23)]:
+        expected = c.ray_for_pixel(px, py)
+        ray = frame[py * 32 + px]
+        assert ray.origin == expected.origin
+        assert ray.direction == expected.direction
+    # Test 2: A tile is the matching part of the frame
+    tile = c.tile_rays(8, 4, 12, 7)
+    rows = frame.directions.reshape(24, 32, 3)[4:7, 8:12].reshape(-1, 3)
+    assert np.allclose(tile.directions, rows)
+    # Test 3: Arbitrary sub-pixel positions
+    packet = c.rays([0.5, 0.25], [0.5, 0.75])
+    assert np.allclose(packet.directions[0], frame.directions[0])
+    assert np.allclose(np.linalg.norm(packet.directions, axis=1), 1)
+
+def test_far_camera():
+    """Tests that a camera far from the origin still builds its rays."""
+    c = Camera(11, 11, math.pi / 2).look_at(Point(0, 0, -1500), Point(0, 0, 0), Vector(0, 1, 0))
+    ray = c.ray_for_pixel(5, 5)
+    assert ray.origin == Point(0, 0, -1500)
+    assert ray.direction == Vector(0, 0, 1)
+    assert np.allclose(c.frame_rays().origins[60], [0, 0, -1500])
@@ -1,10 +1,13 @@
 import sys
 import os
+import io
 import pytest
+import numpy as np
 
 # Add the src directory to the sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
-from core.canvas import Canvas
+from core.canvas import Canvas, TiledCanvas
+from core.tuples import Color
 
 @pytest.fixture
 def setup_canvas():
@@ -31,6 +34,17 @@ def test_write_pixel(setup_canvas):
     canvas.write_pixel(9, 15, (0, 255, 0))
     assert canvas.canvas[15][9] == (0, 255, 0)
 
+def test_canvas_row_bounds(setup_canvas):
+    """Test that canvas rows reject out-of-range columns like lists do."""
+    canvas = setup_canvas
+    canvas.canvas[2][-1] = (0, 0, 1)
+    assert canvas.pixel_at(9, 2) == (0, 0, 1)
+    with pytest.raises(IndexError):
+        canvas.canvas[0][15]
+    with pytest.raises(IndexError):
+        canvas.canvas[0][-11] = (1, 1, 1)
+    assert canvas.pixel_at(5, 0) == (0, 0, 0)
+
 def test_canvas_to_ppm(setup_canvas):
     """Test the conversion of canvas to PPM format."""
     canvas = Canvas(5, 3)
@@ -75,4 +89,233 @@ def test_ppm_ends_with_newline():
     canvas.write_pixel(4, 2, (-0.5, 0, 1))
 
     ppm_output = canvas.canvas_to_ppm()
-    assert ppm_output.endswith("\n")
\ No newline at end of file
+    assert ppm_output.endswith("\n")
+
+def test_canvas_buffer():
+    """Test that pixels live in one contiguous RGB buffer."""
+    canvas = Canvas(10, 20)
+    assert canvas.pixels.shape == (20, 10, 3)
+    assert canvas.pixels.nbytes == 10 * 20 * 24
+    assert Canvas(10, 20, dtype=np.float32).pixels.nbytes == 10 * 20 * 12
+
+def test_pixel_at(setup_canvas):
+    """Test reading pixels back from the canvas."""
+    canvas = setup_canvas
+    canvas.write_pixel(2, 3, Color(0.5, 0.25, 1))
+    assert canvas.pixel_at(2, 3) == (0.5, 0.25, 1)
+    assert canvas.pixel_at(0, 0) == (0, 0, 0)
+    with pytest.raises(ValueError):
+        canvas.pixel_at(10, 0)
+
+def test_write_rows_and_region(setup_canvas):
+    """Test bulk writes of whole rows and rectangular regions."""
+    canvas = setup_canvas
+    canvas.write_rows(4, np.ones((2, 10, 3)))
+    assert canvas.pixel_at(0, 4) == (1, 1, 1)
+    assert canvas.pixel_at(9, 5) == (1, 1, 1)
+    assert canvas.pixel_at(0, 6) == (0, 0, 0)
+
+    canvas.write_region(3, 10, np.full((2, 4, 3), 0.5))
+    assert canvas.pixel_at(3, 10) == (0.5, 0.5, 0.5)
+    assert canvas.pixel_at(6, 11) == (0.5, 0.5, 0.5)
+    assert canvas.pixel_at(7, 11) == (0, 0, 0)
+
+    with pytest.raises(ValueError):
+        canvas.write_rows(19, np.ones((2, 10, 3)))
+    with pytest.raises(ValueError):
+        canvas.write_region(8, 0, np.ones((1, 4, 3)))
+
+def test_write_ppm_streams_identical_output():
+    """Test that streaming PPM output matches canvas_to_ppm for text and binary files."""
+    canvas = Canvas(10, 4)
+    for x in range(canvas.width):
+        for y in range(canvas.height):
+            canvas.write_pixel(x, y, (x / 9, y / 3, 0.5))
+
+    text = io.StringIO()
+    canvas.write_ppm(text, buffer_size=16)
+    assert text.getvalue() == canvas.canvas_to_ppm()
+
+    binary = io.BytesIO()
+    canvas.write_ppm(binary)
+    assert binary.getvalue() == canvas.canvas_to_ppm().encode("ascii")
+
+def test_canvas_to_ppm_binary():
+    """Test the binary (P6) PPM export."""
+    canvas = Canvas(5, 3)
+    canvas.write_pixel(0, 0, (1.5, 0, 0))
+    canvas.write_pixel(2, 1, (0, 0.5, 0))
+    canvas.write_pixel(4, 2, (-0.5, 0, 1))
+
+    ppm_output = canvas.canvas_to_ppm_binary()
+    expected_header = b"P6\n5 3\n255\n"
+    assert ppm_output.startswith(expected_header)
+    body = ppm_output[len(expected_header):]
+    assert len(body) == 5 * 3 * 3
+    # The binary body holds the same values as the P3 text body
+    assert list(body) == [int(v) for v in canvas.pixel_to_ppm().split()]
+
+    with pytest.raises(TypeError):
+        canvas.write_ppm(io.StringIO(), binary=True)
+
+def test_save_ppm(tmp_path):
+    """Test saving P3 and P6 files to disk."""
+    canvas = Canvas(4, 2)
+    canvas.write_pixel(1, 1, (0.2, 0.4, 0.6))
+    canvas.save_ppm(tmp_path / "text.ppm")
+    canvas.save_ppm(tmp_path / "binary.ppm", binary=True)
+    assert (tmp_path / "text.ppm").read_text() == canvas.canvas_to_ppm()
+    assert (tmp_path / "binary.ppm").read_bytes() == canvas.canvas_to_ppm_binary()
+
+def test_from_ppm_round_trip(tmp_path):
+    """Test loading P3 and P6 files back into a canvas."""
+    canvas = Canvas(5, 3)
+    canvas.write_pixel(0, 0, (1.5, 0, 0))
+    canvas.write_pixel(2, 1, (0, 0.5, 0))
+    canvas.write_pixel(4, 2, (-0.5, 0.2, 1))
+    canvas.save_ppm(tmp_path / "text.ppm")
+    canvas.save_ppm(tmp_path / "binary.ppm", binary=True)
+
+    # Test 1: P3 files are parsed into the same image
+    loaded = Canvas.from_ppm(tmp_path / "text.ppm")
+    assert (loaded.width, loaded.height) == (5, 3)
+    assert loaded.canvas_to_ppm() == canvas.canvas_to_ppm()
+    assert loaded.pixel_at(0, 0) == (1, 0, 0)
+
+    # Test 2: P6 files are memory-mapped and exposed as a read-only view
+    loaded = Canvas.from_ppm(tmp_path / "binary.ppm")
+    assert loaded.raw.shape == (3, 5, 3)
+    assert loaded.raw.flags.writeable == False
+    assert loaded.raw[1, 2].tolist() == [0, 128, 0]
+    assert loaded.canvas_to_ppm_binary() == canvas.canvas_to_ppm_binary()
+    assert loaded.canvas_to_ppm() == canvas.canvas_to_ppm()
+
+    # Test 3: Writing to a loaded canvas leaves the file untouched
+    loaded.write_pixel(0, 0, (0, 0, 1))
+    assert loaded.canvas_to_ppm_binary() != canvas.canvas_to_ppm_binary()
+    assert (tmp_path / "binary.ppm").read_bytes() == canvas.canvas_to_ppm_binary()
+
+def test_from_ppm_header_variants(tmp_path):
+    """Test PPM headers with comments and 16-bit samples."""
+    path = tmp_path / "comment.ppm"
+    path.write_text("P3\n# a comment\n2 1 # trailing\n100\n100 50 0 0 0 100\n")
+    loaded = Canvas.from_ppm(path)
+    assert loaded.pixel_at(0, 0) == (1, 0.5, 0)
+    assert loaded.pixel_at(1, 0) == (0, 0, 1)
+
+    path = tmp_path / "wide.ppm"
+    path.write_bytes(b"P6 1 1 65535\n" + bytes([255, 255, 0, 0, 128, 0]))
+    loaded = Canvas.from_ppm(path)
+    assert loaded.pixel_at(0, 0)[0] == 1
+    assert loaded.pixel_at(0, 0)[2] == 32768 / 65535
+
+    path = tmp_path / "bad.ppm"
+    path.write_bytes(b"P5 1 1 255\n\x00")
+    with pytest.raises(ValueError):
+        Canvas.from_ppm(path)
+
+def test_tiled_canvas_matches_canvas():
+    """Test that a tiled canvas with a tiny cache produces the same images as a canvas."""
+    canvas = Canvas(10, 7)
+    with TiledCanvas(10, 7, tile_size=4, cache_tiles=2) as tiled:
+        assert (tiled.tiles_x, tiled.tiles_y) == (3, 2)
+        for x in range(10):
+            for y in range(7):
+                color = (x / 9, y / 6, (x * y) % 3 / 2)
+                canvas.write_pixel(x, y, color)
+                tiled.write_pixel(x, y, color)
+        assert len(tiled._cache) <= 2
+        assert tiled.pixel_at(9, 6) == canvas.pixel_at(9, 6)
+        assert tiled.canvas[3][5] == canvas.canvas[3][5]
+
+        # Test 1: Bulk writes are split across tiles
+        block = np.full((3, 5, 3), 0.25)
+        canvas.write_region(2, 2, block)
+        tiled.write_region(2, 2, block)
+        canvas.write_rows(6, np.ones((1, 10, 3)))
+        tiled.write_rows(6, np.ones((1, 10, 3)))
+
+        # Test 2: The exporters read across tiles
+        assert tiled.canvas_to_ppm() == canvas.canvas_to_ppm()
+        assert tiled.canvas_to_ppm_binary() == canvas.canvas_to_ppm_binary()
+        assert np.array_equal(tiled.pixels, canvas.pixels)
+        with pytest.raises(ValueError):
+            tiled.write_pixel(10, 0, (1, 1, 1))
+
+def test_tiled_canvas_reads_cached_tiles():
+    """Test that rows and pixels of a tiled canvas include unflushed writes."""
+    with TiledCanvas(10, 7, tile_size=4, cache_tiles=4) as tiled:
+        tiled.write_pixel(0, 0, (1, 0.5, 0))
+        tiled.write_pixel(9, 5, (0, 0, 1))
+        # Test 1: Row iteration sees the cached tiles
+        assert list(tiled.canvas[0])[0] == (1, 0.5, 0)
+        assert list(tiled.canvas[5])[9] == (0, 0, 1)
+        assert list(tiled.canvas[1])[0] == (0, 0, 0)
+
+        # Test 2: The pixel copy is read-only
+        pixels = tiled.pixels
+        assert tuple(pixels[0, 0]) == (1, 0.5, 0)
+        with pytest.raises(ValueError):
+            pixels[0, 0] = (0, 0, 0)
+
+def test_draw_points():
+    """Test drawing many points at once, skipping points off the canvas."""
+    canvas = Canvas(10, 5)
+    canvas.draw_points([0, 3.7, -1, 12, 9.99], [0, 2.2, 1, 1, 4.5], (1, 0, 0))
+    assert canvas.pixel_at(0, 0) == (1, 0, 0)
+    assert canvas.pixel_at(3, 2) == (1, 0, 0)
+    assert canvas.pixel_at(9, 4) == (1, 0, 0)
+    assert np.count_nonzero(canvas.pixels[:, :, 0]) == 3
+
+    # One color per point
+    canvas.draw_points([1, 2], [1, 1], np.array([(0, 1, 0), (0, 0, 1)]))
+    assert canvas.pixel_at(1, 1) == (0, 1, 0)
+    assert canvas.pixel_at(2, 1) == (0, 0, 1)
+
+def test_draw_polyline():
+    """Test that polylines are gap free and clipped to the canvas."""
+    canvas = Canvas(20, 10)
+    # Test 1: A shallow line covers every column exactly once
+    canvas.draw_polyline([0.5, 19.5], [0.5, 6.5], (1, 1, 1))
+    covered = canvas.pixels[:, :, 0] > 0
+    assert covered.sum(axis=0).tolist() == [1] * 20
+    assert canvas.pixel_at(0, 0) == (1, 1, 1)
+    assert canvas.pixel_at(19, 6) == (1, 1, 1)
+
+    # Test 2: Segments far outside the canvas are clipped instead of raising
+    canvas = Canvas(20, 10)
+    canvas.draw_polyline([-1000, 1000, 1000], [5.5, 5.5, -1000], (1, 1, 1))
+    assert (canvas.pixels[5, :, 0] == 1).all()
+    assert np.count_nonzero(canvas.pixels[:, :, 0]) == 20
+
+    # Test 3: A steep multi-segment path covers every row it crosses
+    canvas = Canvas(20, 10)
+    canvas.draw_polyline([2.5, 4.5, 2.5], [0.5, 9.5, 0.5], (1, 1, 1))
+    assert ((canvas.pixels[:, :, 0] > 0).sum(axis=1) >= 1).all()
+
+    # Test 4: Segments touching a non-finite vertex are skipped
+    for antialias in (False, True):
+        canvas = Canvas(20, 10)
+        canvas.draw_polyline([0.5, 19.5, np.nan, 5.5, np.inf, 0.5], [0.5, 0.5, 3.0, 3.0, 9.5, 9.5],
+                             (1, 1, 1), antialias=antialias)
+        assert canvas.pixels[0, :, 0].sum() == pytest.approx(20)
+        assert np.count_nonzero(canvas.pixels[:, :, 0]) == 20
+
+def test_draw_polyline_antialias():
+    """Test that antialiased lines split their coverage between neighbouring pixels."""
+    canvas = Canvas(10, 10)
+    canvas.draw_polyline([0.5, 9.5], [2.5, 3.5], (1, 1, 1), antialias=True)
+    column_coverage = canvas.pixels[:, :, 0].sum(axis=0)
+    assert np.allclose(column_coverage, 1)
+    assert canvas.pixel_at(0, 2) == (1, 1, 1)
+    assert 0 < canvas.pixel_at(5, 3)[0] < 1
+
+def test_tiled_canvas_draw():
+    """Test that drawing on a tiled canvas matches drawing on a canvas."""
+    canvas = Canvas(30, 20)
+    with TiledCanvas(30, 20, tile_size=8, cache_tiles=2) as tiled:
+        for target in (canvas, tiled):
+            target.draw_polyline([1, 28, 5, 29], [1, 18, 19, 0], (1, 0.5, 0))
+            target.draw_polyline([0, 29], [10, 12], (0, 0, 1), antialias=True)
+            target.draw_points([3, 17, 25], [4, 9, 15], (0, 1, 0))
+        assert np.array_equal(tiled.pixels, canvas.pixels)
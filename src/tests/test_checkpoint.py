@@ -0,0 +1,112 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.checkpoint import Checkpoint, render_with_checkpoints
+from core.render import render
+
+def gradient(xs, ys):
+    """A sample function whose colour encodes the pixel position."""
+    return np.stack([xs / 40, ys / 30, np.full_like(xs, 0.25)], axis=1)
+
+class Flaky:
+    """A sample function that counts its calls and fails after a number of tiles."""
+    def __init__(self, fail_after=None):
+        self.calls = 0
+        self.fail_after = fail_after
+    def __call__(self, xs, ys):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError("preempted")
+        self.calls += 1
+        return gradient(xs, ys)
+
+class Watcher:
+    """A sample function that records how many tiles the checkpoint file holds at each call."""
+    def __init__(self, path):
+        self.path = path
+        self.seen = []
+    def __call__(self, xs, ys):
+        with Checkpoint.open(self.path, mode="r") as checkpoint:
+            self.seen.append(int(checkpoint.done.sum()))
+        return gradient(xs, ys)
+
+def test_checkpoint_file(tmp_path):
+    """Tests creating, updating and reopening a checkpoint file."""
+    path = str(tmp_path / "render.ckpt")
+    image = np.random.default_rng(0).random((30, 40, 3))
+    with Checkpoint.create(path, 40, 30, 16, dtype=np.float64) as checkpoint:
+        # Test 1: A new checkpoint has no finished tiles
+        assert (checkpoint.tiles_x, checkpoint.tiles_y) == (3, 2)
+        assert not checkpoint.done.any()
+        # Test 2: Only newly finished tiles are written
+        done = np.array([True, False, False, False, False, True])
+        assert checkpoint.update(image, done) == 2
+        assert checkpoint.update(image, done) == 0
+        assert np.array_equal(checkpoint.pixels[0:16, 0:16], image[0:16, 0:16])
+        assert (checkpoint.pixels[0:16, 16:32] == 0).all()
+        # Test 3: Edge tiles are clipped to the image
+        assert checkpoint.tile_rect(5) == (32, 16, 40, 30)
+        assert np.array_equal(checkpoint.pixels[16:30, 32:40], image[16:30, 32:40])
+    # Test 4: Reopening restores the bitmap and pixels; no temporary files remain
+    with Checkpoint.open(path) as checkpoint:
+        assert checkpoint.done.tolist() == [True, False, False, False, False, True]
+        assert checkpoint.matches(40, 30, 16) and not checkpoint.matches(40, 30, 8)
+        assert np.array_equal(checkpoint.pixels[0:16, 0:16], image[0:16, 0:16])
+    assert os.listdir(tmp_path) == ["render.ckpt"]
+    # Test 5: Compact float32 storage
+    Checkpoint.create(path, 40, 30, 16).close()
+    assert os.path.getsize(path) == 64 + 40 * 30 * 3 * 4
+
+def test_checkpoint_rejects_bad_files(tmp_path):
+    """Tests that invalid checkpoint files are rejected."""
+    path = str(tmp_path / "bad.ckpt")
+    # Test 1: Wrong magic
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    with pytest.raises(ValueError):
+        Checkpoint.open(path)
+    # Test 2: Truncated file
+    Checkpoint.create(path, 8, 8, 4).close()
+    with open(path, "r+b") as f:
+        f.truncate(50)
+    with pytest.raises(ValueError):
+        Checkpoint.open(path)
+    # Test 3: Unsupported pixel type
+    with pytest.raises(ValueError):
+        Checkpoint.create(path, 8, 8, 4, dtype=np.int32)
+
+def test_resume_skips_finished_tiles(tmp_path):
+    """Tests that a killed render resumes from its checkpoint."""
+    path = str(tmp_path / "render.ckpt")
+    expected = render(40, 30, gradient, tile_size=8, workers=1).pixels
+    # Test 1: The interrupted render leaves its finished tiles in the checkpoint
+    with pytest.raises(RuntimeError):
+        render_with_checkpoints(path, 40, 30, Flaky(fail_after=7), tile_size=8, workers=1)
+    with Checkpoint.open(path) as checkpoint:
+        assert checkpoint.done.sum() == 7
+    # Test 2: Resume renders only the remaining tiles and produces the full image
+    sample = Flaky()
+    canvas = render_with_checkpoints(path, 40, 30, sample, tile_size=8, workers=1)
+    assert sample.calls == 5 * 4 - 7
+    assert np.allclose(canvas.pixels, expected, atol=1e-6)
+    with Checkpoint.open(path) as checkpoint:
+        assert checkpoint.done.all()
+    # Test 3: A checkpoint for another geometry is replaced, not resumed
+    sample = Flaky()
+    render_with_checkpoints(path, 40, 30, sample, tile_size=16, workers=1)
+    assert sample.calls == 3 * 2
+    # Test 4: Resuming works across worker pools too
+    render_with_checkpoints(path, 40, 30, gradient, tile_size=8, workers=1, resume=False, interval=0)
+    canvas = render_with_checkpoints(path, 40, 30, gradient, tile_size=8, workers=2)
+    assert np.allclose(canvas.pixels, expected, atol=1e-6)
+
+def test_checkpoints_during_render(tmp_path):
+    """Tests that a single-process render writes checkpoints while it runs."""
+    path = str(tmp_path / "render.ckpt")
+    sample = Watcher(path)
+    render_with_checkpoints(path, 40, 30, sample, tile_size=8, workers=1, interval=0)
+    # Every tile finished before a sample call is already in the file
+    assert sample.seen == list(range(5 * 4))
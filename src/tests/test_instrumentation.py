@@ -0,0 +1,90 @@
+import sys
+import os
+import pytest
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core import instrumentation
+from core.canvas import Canvas
+from core.matrices import Matrix, Matrix4
+from core.tuples import Point, Vector, Tuple
+
+@pytest.fixture(autouse=True)
+def clean_instrumentation():
+    """Makes sure every test starts and ends with instrumentation disabled and zeroed."""
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_leaves_methods_untouched():
+    """Tests that enable patches the hot methods and disable restores the originals."""
+    original_add = Tuple.__dict__["add"]
+    original_identity = Matrix.__dict__["identity"]
+    # Test 1: Disabled by default, nothing is counted
+    assert not instrumentation.is_enabled()
+    Point(1, 2, 3).add(Vector(1, 0, 0))
+    assert instrumentation.snapshot() == {}
+    # Test 2: Enabled wraps the methods
+    instrumentation.enable()
+    assert instrumentation.is_enabled()
+    assert Tuple.__dict__["add"] is not original_add
+    # Test 3: Disable puts back the exact originals, classmethods included
+    instrumentation.disable()
+    assert Tuple.__dict__["add"] is original_add
+    assert Matrix.__dict__["identity"] is original_identity
+
+def test_counts_calls():
+    """Tests that calls and allocations are counted per class and method."""
+    instrumentation.enable()
+    p = Point(1, 2, 3)
+    for _ in range(3):
+        p = p.add(Vector(1, 0, 0))
+    m = Matrix(3, 3)
+    m.set_values([[1, 2, 6], [-5, 8, -4], [2, 6, 4]])
+    m.determinant()
+    Matrix4.identity().inverse()
+    canvas = Canvas(4, 4)
+    canvas.write_pixel(1, 1, (1, 0, 0))
+    stats = instrumentation.snapshot()
+    # Test 1: Tuple arithmetic and allocations
+    assert stats["Tuple.add"].calls == 3
+    assert stats["Vector.__init__"].calls == 3
+    assert stats["Point.__init__"].calls == 4
+    # Test 2: Nested matrix calls are counted individually
+    assert stats["Matrix.determinant"].calls >= 1
+    assert stats["Matrix.cofactor"].calls == 3
+    # Test 3: Overrides are reported under the subclass
+    assert stats["Matrix4.identity"].calls == 1
+    assert stats["Matrix4.inverse"].calls == 1
+    assert "Matrix.inverse" not in stats
+    # Test 4: Canvas entry points
+    assert stats["Canvas.write_pixel"].calls == 1
+    assert stats["Canvas.write_pixel"].seconds >= 0
+    # Test 5: Reset zeroes everything
+    instrumentation.reset()
+    assert instrumentation.snapshot() == {}
+
+def test_measure_scopes_to_block():
+    """Tests that measure() collects only the calls made inside the block."""
+    # Test 1: Calls outside the block are not counted
+    Point(0, 0, 0)
+    with instrumentation.measure() as frame:
+        Point(0, 0, 0).add(Vector(1, 1, 1))
+        assert instrumentation.is_enabled()
+    assert not instrumentation.is_enabled()
+    assert frame.stats["Point.__init__"].calls == 2
+    assert frame.stats["Tuple.add"].calls == 1
+    # Test 2: Nested blocks see their own calls, the outer block sees both
+    with instrumentation.measure() as outer:
+        Vector(1, 0, 0)
+        with instrumentation.measure() as inner:
+            Vector(0, 1, 0)
+        assert instrumentation.is_enabled()
+    assert inner.stats["Vector.__init__"].calls == 1
+    assert outer.stats["Vector.__init__"].calls == 2
+    # Test 3: The report lists every operation
+    text = outer.report()
+    assert "Vector.__init__" in text
+    assert text.splitlines()[0].startswith("operation")
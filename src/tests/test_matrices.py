@@ -2,11 +2,12 @@ import sys
 import os
 import pytest
 import math
+import numpy as np
 
 # Add the src directory to the sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
-from core.matrices import Matrix
-from core.tuples import Tuple, Point, Vector
+from core.matrices import Matrix, Matrix4, LUDecomposition, Transform
+from core.tuples import Tuple, Point, Vector, TupleArray
 
 @pytest.fixture
 def setup_matrix():
@@ -442,4 +443,279 @@ def test_chaining():
     # Chaining the transformations -- must be applied in reverse order
     T = c.multiply(b).multiply(a)
     p8 = T * p
-    assert p4 == p8
\ No newline at end of file
+    assert p4 == p8
+
+def test_matrix4_indexing():
+    """Tests that Matrix4 supports the same row/column indexing as Matrix."""
+    m = Matrix4(4, 4)
+    assert m.rows == 4
+    assert m.cols == 4
+    assert m[0][0] == 0
+    m.set_values([[1, 2, 3, 4],
+                  [5.5, 6.5, 7.5, 8.5],
+                  [9, 10, 11, 12],
+                  [13.5, 14.5, 15.5, 16.5]])
+    assert m[1][2] == 7.5
+    assert m[3][0] == 13.5
+    m[2][1] = 42
+    assert m[2][1] == 42
+    m[0] = [4, 3, 2, 1]
+    assert m[0][3] == 1
+    with pytest.raises(ValueError):
+        Matrix4(3, 3)
+
+def test_matrix4_matches_matrix():
+    """Tests that Matrix4 multiply, transpose, determinant and inverse match Matrix."""
+    values = [[-5, 2, 6, -8],
+              [1, -5, 1, 8],
+              [7, 7, -6, -7],
+              [1, -3, 7, 4]]
+    other = [[8, 2, 2, 2],
+             [3, -1, 7, 0],
+             [7, 0, 5, 4],
+             [6, -2, 0, 5]]
+    m = Matrix(4, 4)
+    m.set_values(values)
+    n = Matrix(4, 4)
+    n.set_values(other)
+    m4 = Matrix4.from_matrix(m)
+    n4 = Matrix4()
+    n4.set_values(other)
+
+    assert m4.multiply(n4).compare(m.multiply(n)) == True
+    assert m4.transpose().compare(m.transpose()) == True
+    assert m4.determinant() == m.determinant() == 532
+    assert m4.inverse().compare(m.inverse()) == True
+    assert m4.multiply(n4).multiply(n4.inverse()).compare(m4) == True
+    assert m4.submatrix(2, 1).compare(m.submatrix(2, 1)) == True
+    assert m4.cofactor(3, 2) == m.cofactor(3, 2)
+
+def test_matrix4_not_invertible():
+    """Tests that a singular Matrix4 cannot be inverted."""
+    m = Matrix4()
+    m.set_values([[-4, 2, -2, -3],
+                  [9, 6, 2, 6],
+                  [0, -5, 1, -5],
+                  [0, 0, 0, 0]])
+    assert m.determinant() == 0
+    with pytest.raises(ValueError):
+        m.inverse()
+
+def test_matrix4_transforms():
+    """Tests that the transformation constructors build Matrix4 instances."""
+    p = Point(1, 0, 1)
+    a = Matrix4.rotation_matrix_x(math.pi / 2)
+    b = Matrix4.scaled_matrix(5, 5, 5)
+    c = Matrix4.translation_matrix(10, 5, 7)
+    assert isinstance(a, Matrix4)
+    assert isinstance(Matrix4.shearing_matrix(1, 0, 0, 0, 0, 0), Matrix4)
+    T = c.multiply(b).multiply(a)
+    assert isinstance(T, Matrix4)
+    assert T * p == Point(15, 0, 7)
+    assert T.inverse() * Point(15, 0, 7) == p
+    assert Matrix4.identity().compare(Matrix.identity(4)) == True
+
+def test_lu_determinant_large():
+    """Tests the determinant of a matrix too large for cofactor expansion."""
+    m = Matrix(10, 10)
+    m.set_values([[2 if i == j else (1 if j == i + 1 else 0) for j in range(10)] for i in range(10)])
+    assert math.isclose(m.determinant(), 2 ** 10)
+
+    # Swapping two rows flips the sign of the determinant
+    m[0], m[1] = m[1], m[0]
+    assert math.isclose(m.determinant(), -2 ** 10)
+
+def test_row_swap_and_slices():
+    """Tests that matrix rows behave like the row lists they replace."""
+    m = Matrix(3, 3)
+    m.set_values([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    # Test 1: Swapping rows through views
+    m[0], m[2] = m[2], m[0]
+    assert list(m[0]) == [7, 8, 9] and list(m[2]) == [1, 2, 3]
+    m[1] = m[1]
+    assert m[1] == [4, 5, 6]
+
+    # Test 2: A replaced row keeps its old values and no longer writes through
+    row = m[0]
+    m[0] = [0, 0, 0]
+    assert row == [7, 8, 9]
+    row[0] = 100
+    assert m[0][0] == 0
+
+    # Test 3: Slicing reads and writes like a list
+    assert m[1][0:2] == [4, 5]
+    assert m[2][::-1] == [3, 2, 1]
+    m[1][1:] = [50, 60]
+    assert m[1] == [4, 50, 60]
+    with pytest.raises(ValueError):
+        m[1][1:] = [1]
+    with pytest.raises(IndexError):
+        m[3] = [1, 2, 3]
+
+def test_lu_inverse_large():
+    """Tests the inverse of a 6x6 matrix computed through LU decomposition."""
+    m = Matrix(6, 6)
+    m.set_values([[(i * 7 + j * 3) % 11 - 5 + (10 if i == j else 0) for j in range(6)] for i in range(6)])
+    assert m.multiply(m.inverse()).compare(Matrix.identity(6)) == True
+
+def test_solve():
+    """Tests solving linear systems and reusing the cached factorization."""
+    m = Matrix(4, 4)
+    m.set_values([[8, 2, 2, 2],
+                  [3, -1, 7, 0],
+                  [7, 0, 5, 4],
+                  [6, -2, 0, 5]])
+    x = m.solve([1, 2, 3, 4])
+    for i in range(4):
+        assert math.isclose(sum(m[i][j] * x[j] for j in range(4)), i + 1)
+
+    # Test 2: The factorization is reused while the matrix is unchanged
+    lu = m.lu_decomposition()
+    assert isinstance(lu, LUDecomposition)
+    m.solve([4, 3, 2, 1])
+    assert m.lu_decomposition() is lu
+
+    # Test 3: Changing a value invalidates the cached factorization
+    m[0][0] = 9
+    assert m.lu_decomposition() is not lu
+
+    # Test 4: Tuples and matrices are accepted as right-hand sides
+    t = Matrix.translation_matrix(5, -3, 2)
+    assert t.solve(Point(2, 1, 7)) == Point(-3, 4, 5)
+    assert t.solve(Matrix.identity(4)).compare(t.inverse()) == True
+
+def test_singular_tolerance():
+    """Tests that nearly singular matrices are rejected with a tolerance."""
+    m = Matrix(3, 3)
+    m.set_values([[1, 2, 3],
+                  [4, 5, 6],
+                  [7, 8, 9 + 1e-15]])
+    with pytest.raises(ValueError):
+        m.inverse()
+    with pytest.raises(ValueError):
+        m.solve([1, 2, 3])
+
+    m = Matrix(5, 5)
+    m.set_values([[i + j for j in range(5)] for i in range(5)])
+    assert m.determinant() == 0
+    with pytest.raises(ValueError):
+        m.inverse()
+
+def test_singular_tolerance_scale_invariant():
+    """Tests that large translations and tiny scales do not count as singular."""
+    # Test 1: Far translations invert for both matrix types
+    for cls in (Matrix, Matrix4):
+        t = cls.translation_matrix(1e4, -2e4, 3e4)
+        assert t.inverse().compare(cls.translation_matrix(-1e4, 2e4, -3e4)) == True
+
+    # Test 2: A translated and sheared transform inverts
+    t = Transform().translate(2000, 0, 0).shear(1, 0, 0, 0, 0, 0)
+    p = Point(3, 4, 5)
+    assert t.inverse() * (t * p) == p
+
+    # Test 3: A uniformly tiny scale is still invertible, also through LU
+    s = Matrix.scaled_matrix(1e-5, 1e-5, 1e-5)
+    assert s.inverse().compare(Matrix.scaled_matrix(1e5, 1e5, 1e5)) == True
+    m = Matrix(5, 5)
+    m.set_values([[1e-5 * (i == j) + 1e4 * (j == 4 and i != 4) for j in range(5)] for i in range(5)])
+    assert abs(m.determinant() - 1e-25) < 1e-35
+    assert m.multiply(m.inverse()).compare(Matrix.identity(5)) == True
+
+    # Test 4: A far-away view transform inverts back to the eye position
+    eye = Point(0, 0, -1500)
+    view = Matrix4.view_transform(eye, Point(0, 0, 0), Vector(0, 1, 0))
+    assert view.inverse() * Point(0, 0, 0) == eye
+
+def test_transpose_and_submatrix_views():
+    """Tests that transpose and submatrix share storage until written."""
+    m = Matrix(3, 3)
+    m.set_values([[1, 5, 0],
+                  [-3, 2, 7],
+                  [0, 6, -3]])
+    t = m.transpose()
+    sub = m.submatrix(0, 2)
+    # Test 1: Views share the buffer instead of copying it
+    assert t._buf is m._buf
+    assert sub._buf is m._buf
+    assert t[2][1] == 7
+    assert sub.submatrix(1, 0)[0][0] == 2
+
+    # Test 2: Writing to a view copies it and leaves the original untouched
+    t[2][1] = 100
+    assert t[2][1] == 100
+    assert m[1][2] == 7
+    assert t._buf is not m._buf
+
+    # Test 3: Writing to the original leaves existing views untouched
+    m[1][0] = 42
+    assert m[1][0] == 42
+    assert sub[0][0] == -3
+
+def test_copy():
+    """Tests that copies are independent of the original matrix."""
+    m = Matrix.translation_matrix(1, 2, 3)
+    c = m.copy()
+    c[0][3] = 9
+    assert m[0][3] == 1
+    assert isinstance(Matrix4.identity().copy(), Matrix4)
+
+def test_transform_many():
+    """Tests transforming many tuples at once matches transforming them one by one."""
+    T = Matrix.translation_matrix(10, 5, 7).multiply(Matrix.scaled_matrix(5, 5, 5)).multiply(Matrix.rotation_matrix_x(math.pi / 2))
+    tuples = [Point(1, 0, 1), Vector(1, 0, 1), Point(-3, 4, 5), Tuple(1, 2, 3, 2)]
+    # Test 1: TupleArray input keeps the w classification as a mask
+    result = T.transform_many(TupleArray.from_tuples(tuples))
+    assert result.to_tuples() == [T * t for t in tuples]
+    assert list(result.is_point()) == [True, False, True, False]
+    assert list(result.is_vector()) == [False, True, False, False]
+
+    # Test 2: Matrix4 and lists of tuples work too
+    result = Matrix4.from_matrix(T).transform_many(tuples)
+    assert result.to_tuples() == [T * t for t in tuples]
+
+    # Test 3: Raw (N, 4) buffers give an (N, 4) result
+    buffer = np.array([[t.x, t.y, t.z, t.w] for t in tuples])
+    out = T.transform_many(buffer)
+    assert out.shape == (4, 4)
+    assert Point(*out[0, :3]) == T * tuples[0]
+    with pytest.raises(ValueError):
+        T.transform_many(np.zeros((3, 3)))
+
+def test_transform_chaining():
+    """Tests that the fluent transform applies steps in the order they are added."""
+    p = Point(1, 0, 1)
+    t = Transform().rotate_x(math.pi / 2).scale(5, 5, 5).translate(10, 5, 7)
+    expected = Matrix.translation_matrix(10, 5, 7).multiply(Matrix.scaled_matrix(5, 5, 5)).multiply(Matrix.rotation_matrix_x(math.pi / 2))
+    assert t.matrix().compare(expected) == True
+    assert t * p == Point(15, 0, 7)
+
+    # Builder methods return new transforms
+    base = Transform().translate(1, 2, 3)
+    base.scale(2, 2, 2)
+    assert len(base.steps) == 1
+
+def test_transform_inverse():
+    """Tests the memoized inverse and inverse-transpose of a transform."""
+    t = Transform().rotate_y(0.3).scale(2, 3, 4).rotate_z(-1.1).translate(1, -2, 3)
+    assert t.is_structured() == True
+    inverse = t.inverse()
+    assert inverse.compare(t.matrix().inverse()) == True
+    assert t.inverse() is inverse
+    assert t.inverse_transpose().compare(inverse.transpose()) == True
+    assert t.inverse_transpose() is t.inverse_transpose()
+
+    # Test 2: Shears fall back to the general inverse
+    s = t.shear(1, 0, 0, 0, 0, 0)
+    assert s.is_structured() == False
+    assert s.inverse().compare(s.matrix().inverse()) == True
+
+    # Test 3: A zero scale is not invertible
+    with pytest.raises(ValueError):
+        Transform().scale(0, 1, 1).inverse()
+
+def test_transform_from_matrix():
+    """Tests wrapping an existing matrix in a transform."""
+    m = Matrix.shearing_matrix(0, 1, 0, 0, 0, 0)
+    t = Transform.from_matrix(m).translate(1, 0, 0)
+    assert t * Point(2, 3, 4) == Point(7, 3, 4)
+    assert t.inverse() * Point(7, 3, 4) == Point(2, 3, 4)
@@ -0,0 +1,89 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.progressive import AccumulationBuffer, ProgressiveRenderer
+from core.canvas import Canvas
+
+def flat(xs, ys):
+    """A sample function that is constant within each pixel."""
+    return np.stack([np.floor(xs) / 16, np.floor(ys) / 16, np.full_like(xs, 2.0)], axis=1)
+
+class Noisy:
+    """A sample function whose right half is noisy."""
+    def __init__(self, seed=1):
+        self.rng = np.random.default_rng(seed)
+    def __call__(self, xs, ys):
+        noise = np.where(xs >= 8, self.rng.normal(0, 0.2, len(xs)), 0.0)
+        return np.stack([0.5 + noise, 0.5 + noise, 0.5 + noise], axis=1)
+
+def test_accumulation_buffer():
+    """Tests accumulating samples and estimating their error."""
+    buffer = AccumulationBuffer(3, 2)
+    # Test 1: Repeated pixels accumulate
+    buffer.add(np.array([0, 0, 2]), np.array([1, 1, 0]), [[1, 0, 0], [3, 0, 0], [0.5, 0.5, 0.5]])
+    assert buffer.count[1, 0] == 2 and buffer.count[0, 2] == 1
+    assert np.allclose(buffer.mean()[1, 0], [2, 0, 0])
+    # Test 2: HDR values are kept unclamped
+    assert buffer.mean()[1, 0, 0] == 2
+    # Test 3: Standard error of the mean; unknown below two samples
+    error = buffer.standard_error()
+    assert error[1, 0] == pytest.approx(1.0)
+    assert np.isinf(error[0, 2]) and np.isinf(error[0, 0])
+    # Test 4: Preview fills holes from the block corner
+    preview = buffer.preview(stride=2)
+    assert np.allclose(preview[0, 1], preview[0, 0])
+    assert np.allclose(preview[1, 2], [0.5, 0.5, 0.5])
+
+def test_noise_free_render_stops_at_min_samples():
+    """Tests that converged pixels stop receiving samples."""
+    renderer = ProgressiveRenderer(16, 12, flat, threshold=1e-6, min_samples=3, max_samples=50)
+    canvas = renderer.render()
+    stats = renderer.stats
+    # Test 1: Everything converged after min_samples
+    assert stats.stopped_early and stats.converged == 1.0
+    assert (renderer.buffer.count == 3).all()
+    assert stats.samples == 16 * 12 * 3
+    # Test 2: Sparse passes (strides 8, 4, 2, 1) plus refinement passes
+    assert stats.passes == 4 + 2
+    # Test 3: The image is the exact mean; blue is HDR and clamps on export
+    assert isinstance(canvas, Canvas)
+    assert np.allclose(canvas.pixel_at(4, 7)[:2], [4 / 16, 7 / 16])
+    assert canvas.canvas_to_ppm().splitlines()[3].split()[2] == "255"
+
+def test_noisy_pixels_get_more_samples():
+    """Tests that sampling concentrates on noisy pixels and respects max_samples."""
+    renderer = ProgressiveRenderer(16, 4, Noisy(), threshold=0.05, min_samples=4, max_samples=40)
+    renderer.render()
+    count = renderer.buffer.count
+    # Test 1: The quiet half converged at min_samples, the noisy half needed more
+    assert (count[:, :8] == 4).all()
+    assert count[:, 8:].mean() > 10
+    assert count.max() <= 40
+    # Test 2: Converged pixels are within the threshold
+    error = renderer.buffer.standard_error()
+    done = count < 40
+    assert (error[done] <= 0.05).all()
+
+def test_snapshots(tmp_path):
+    """Tests that snapshots are written at the interval and show a preview."""
+    seen = []
+    path = str(tmp_path / "frame_{pass}.ppm")
+    renderer = ProgressiveRenderer(16, 16, flat, threshold=1e-6, min_samples=2, max_samples=2,
+                                   snapshot_interval=0, snapshot_path=path,
+                                   on_snapshot=lambda canvas, stats: seen.append(canvas.pixel_at(3, 3)))
+    renderer.render()
+    # Test 1: One snapshot per pass, each a valid P6 file
+    assert len(renderer.stats.snapshots) == renderer.stats.passes
+    first = Canvas.from_ppm(renderer.stats.snapshots[0])
+    assert (first.width, first.height) == (16, 16)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+    # Test 2: The first snapshot only has the stride-8 samples, filled in blocks
+    assert seen[0] == pytest.approx((0, 0, 2.0))
+    assert seen[-1] != seen[0]
+    # Test 3: Invalid sample limits
+    with pytest.raises(ValueError):
+        ProgressiveRenderer(4, 4, flat, min_samples=1)
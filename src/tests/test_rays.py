@@ -0,0 +1,53 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.rays import Ray, RayPacket
+from core.matrices import Matrix4
+from core.tuples import Point, Vector, PointArray, VectorArray
+
+def test_ray_position_and_transform():
+    """Tests computing points along a ray and transforming it."""
+    r = Ray(Point(2, 3, 4), Vector(1, 0, 0))
+    # Test 1: Positions along the ray
+    assert r.position(0) == Point(2, 3, 4)
+    assert r.position(-1) == Point(1, 3, 4)
+    assert r.position(2.5) == Point(4.5, 3, 4)
+    # Test 2: Translation moves the origin only
+    r = Ray(Point(1, 2, 3), Vector(0, 1, 0))
+    r2 = r.transform(Matrix4.translation_matrix(3, 4, 5))
+    assert r2.origin == Point(4, 6, 8)
+    assert r2.direction == Vector(0, 1, 0)
+    # Test 3: Scaling changes both
+    r2 = r.transform(Matrix4.scaled_matrix(2, 3, 4))
+    assert r2.origin == Point(2, 6, 12)
+    assert r2.direction == Vector(0, 3, 0)
+
+def test_ray_packet():
+    """Tests that a packet matches the scalar Ray operations."""
+    rays = [Ray(Point(1, 2, 3), Vector(0, 1, 0)), Ray(Point(0, 0, -5), Vector(0.5, 0, 1))]
+    packet = RayPacket.from_rays(rays)
+    # Test 1: Construction from rays, tuple arrays and plain arrays agree
+    assert len(packet) == 2
+    other = RayPacket(PointArray([1, 0], [2, 0], [3, -5]), VectorArray([0, 0.5], [1, 0], [0, 1]))
+    assert np.array_equal(packet.origins, other.origins)
+    assert np.array_equal(packet.directions, other.directions)
+    # Test 2: Indexing returns a Ray
+    assert packet[1].origin == Point(0, 0, -5)
+    assert packet[1].direction == Vector(0.5, 0, 1)
+    # Test 3: Positions with a scalar and with one distance per ray
+    assert np.allclose(packet.position(2), [[1, 4, 3], [1, 0, -3]])
+    assert np.allclose(packet.position([1, 2]), [[1, 3, 3], [1, 0, -3]])
+    # Test 4: Transform matches the scalar version
+    m = Matrix4.rotation_matrix_y(0.3).multiply(Matrix4.translation_matrix(3, 4, 5))
+    moved = packet.transform(m)
+    for i, ray in enumerate(rays):
+        expected = ray.transform(m)
+        assert moved[i].origin == expected.origin
+        assert moved[i].direction == expected.direction
+    # Test 5: Mismatched shapes
+    with pytest.raises(ValueError):
+        RayPacket(np.zeros((2, 3)), np.zeros((3, 3)))
@@ -0,0 +1,90 @@
+import sys
+import os
+import io
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.render import TileRenderer, render, tile_order, hilbert_index, morton_index, pixel_centers
+from core.canvas import Canvas, SharedCanvas
+
+def gradient(xs, ys):
+    """A sample function whose colour encodes the pixel position."""
+    return np.stack([xs / 64, ys / 48, np.full_like(xs, 0.5)], axis=1)
+
+def expected_gradient(width, height):
+    """Returns the pixels gradient() should produce."""
+    xs, ys = pixel_centers(0, 0, width, height)
+    return gradient(xs, ys).reshape(height, width, 3)
+
+def test_space_filling_curves():
+    """Tests the Hilbert and Z-order tile orderings."""
+    # Test 1: Hilbert visits every cell once and each step moves to a neighbour
+    ys, xs = np.divmod(np.arange(64), 8)
+    order = np.argsort(hilbert_index(8, xs, ys))
+    assert sorted(order.tolist()) == list(range(64))
+    steps = np.abs(np.diff(xs[order])) + np.abs(np.diff(ys[order]))
+    assert (steps == 1).all()
+    # Test 2: Morton interleaves bits
+    assert morton_index([0, 1, 0, 1, 2], [0, 0, 1, 1, 0]).tolist() == [0, 1, 2, 3, 4]
+    # Test 3: Tiles cover the image exactly, including partial edge tiles
+    for curve in ("hilbert", "z", "rows"):
+        tiles = tile_order(70, 45, 16, curve)
+        covered = np.zeros((45, 70), dtype=int)
+        for x0, y0, x1, y1 in tiles:
+            covered[y0:y1, x0:x1] += 1
+        assert (covered == 1).all()
+    # Test 4: Invalid arguments
+    with pytest.raises(ValueError):
+        tile_order(10, 10, 4, "spiral")
+    with pytest.raises(ValueError):
+        tile_order(10, 10, 0)
+
+def test_shared_canvas():
+    """Tests attaching to a shared canvas and exporting it."""
+    with SharedCanvas(4, 3) as canvas:
+        # Test 1: Writes through one handle are seen by another
+        other = SharedCanvas(4, 3, name=canvas.name)
+        other.write_pixel(1, 2, (1, 0.5, 0))
+        assert canvas.pixel_at(1, 2) == (1, 0.5, 0)
+        other.close()
+        # Test 2: The PPM exporters work unchanged
+        plain = canvas.to_canvas()
+        assert isinstance(plain, Canvas) and not isinstance(plain, SharedCanvas)
+        assert canvas.canvas_to_ppm() == plain.canvas_to_ppm()
+
+def test_render_in_process_and_pool():
+    """Tests that single-process and multi-process renders produce the same image."""
+    expected = expected_gradient(61, 37)
+    # Test 1: In-process render
+    with TileRenderer(61, 37, gradient, tile_size=8, workers=1) as renderer:
+        canvas = renderer.render()
+        assert np.allclose(canvas.pixels, expected)
+        assert renderer.done.all()
+        assert renderer.stats.tiles.tolist() == [len(renderer.tiles)]
+    # Test 2: Pool render with small tiles so workers have to share the work
+    progress = []
+    with TileRenderer(61, 37, gradient, tile_size=4, workers=3) as renderer:
+        canvas = renderer.render(on_progress=lambda r: progress.append(r.progress), poll_interval=0.01)
+        assert np.allclose(canvas.pixels, expected)
+        assert renderer.stats.tiles.sum() == len(renderer.tiles)
+        assert progress[-1] == 1.0
+        out = io.BytesIO()
+        canvas.write_ppm(out, binary=True)
+        assert out.getvalue().startswith(b"P6\n61 37\n255\n")
+    # Test 3: Convenience function returns a plain canvas
+    canvas = render(20, 10, gradient, tile_size=8, workers=2)
+    assert np.allclose(canvas.pixels, expected_gradient(20, 10))
+
+def test_render_skips_done_tiles():
+    """Tests that tiles already marked done are not rendered again."""
+    with TileRenderer(32, 32, gradient, tile_size=8, workers=1) as renderer:
+        renderer.done[:5] = 1
+        renderer.render()
+        # Test 1: Only the remaining tiles were rendered
+        assert renderer.stats.tiles.sum() == len(renderer.tiles) - 5
+        x0, y0, x1, y1 = renderer.tiles[0]
+        assert (renderer.canvas.pixels[y0:y1, x0:x1] == 0).all()
+        x0, y0, x1, y1 = renderer.tiles[-1]
+        assert (renderer.canvas.pixels[y0:y1, x0:x1] != 0).any()
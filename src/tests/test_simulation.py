@@ -0,0 +1,64 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.simulation import simulate, simulate_projectiles
+from core.tuples import Point, Vector, Projectile, Environment, PointArray, VectorArray
+
+def scalar_flight(projectile, environment):
+    """Runs the scalar tick loop and returns the in-air positions and the landing point."""
+    positions = []
+    while projectile.position.y > 0:
+        positions.append(projectile.position)
+        projectile = projectile.tick(environment, projectile)
+    return positions, projectile.position
+
+def test_simulate_matches_tick():
+    """Tests that the batch simulator matches the scalar tick loop."""
+    environments = [Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0)),
+                    Environment(Vector(0, -0.2, 0), Vector(0.02, 0, 0.01))]
+    projectiles = [Projectile(Point(0, 1, 0), Vector(1, 1.8, 0).normalize() * speed)
+                   for speed in (1, 4, 11.25)]
+    env_index = [0, 1, 1]
+    result = simulate_projectiles(projectiles, environments, env_index)
+    assert len(result) == 3
+    assert result.landed.all()
+    for i, projectile in enumerate(projectiles):
+        positions, landing = scalar_flight(projectile, environments[env_index[i]])
+        assert result.landing_ticks[i] == len(positions)
+        assert Point(*result.landing_points[i]) == landing
+        assert len(result.trajectories[i]) == len(positions)
+        assert Point(*result.trajectories[i][-1]) == positions[-1]
+
+def test_simulate_array_inputs():
+    """Tests tuple array inputs, grounded projectiles and the tick limit."""
+    environment = Environment(Vector(0, -0.1, 0), Vector(0, 0, 0))
+    positions = PointArray([0, 0, 0], [1, 0, 1], [0, 0, 0])
+    velocities = VectorArray([1, 1, 1], [1, 1, -1], [0, 0, 0])
+    result = simulate(positions, velocities, environment, max_ticks=50, record=False)
+    assert result.trajectories is None
+    # Test 1: A projectile going up lands after 22 ticks
+    assert result.landing_ticks[0] == 22
+    # Test 2: A projectile that starts on the ground lands immediately
+    assert result.landing_ticks[1] == 0
+    assert list(result.landing_points[1]) == [0, 0, 0]
+    # Test 3: A projectile falling straight down lands after one tick
+    assert result.landing_ticks[2] == 1
+
+    result = simulate(positions, velocities, environment, max_ticks=5)
+    assert result.landed.tolist() == [False, True, True]
+    assert np.isnan(result.landing_points[0]).all()
+    assert len(result.trajectories[0]) == 5
+    # Test 4: Max heights are tracked with or without recording
+    assert result.max_heights[0] == result.trajectories[0][:, 1].max()
+    assert np.isnan(result.max_heights[1]) and result.max_heights[2] == 1
+    unrecorded = simulate(positions, velocities, environment, max_ticks=5, record=False)
+    assert np.array_equal(unrecorded.max_heights, result.max_heights, equal_nan=True)
+
+    with pytest.raises(ValueError):
+        simulate(np.zeros((2, 3)), np.zeros((3, 3)), environment)
+    with pytest.raises(ValueError):
+        simulate(np.ones((2, 3)), np.zeros((2, 3)), environment, env_index=[0, 1])
@@ -0,0 +1,95 @@
+import sys
+import os
+import math
+import pytest
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.spheres import Sphere, Intersection, intersections, hit, hit_distances, closest_hits
+from core.rays import Ray, RayPacket
+from core.matrices import Matrix4, Transform
+from core.tuples import Point, Vector
+
+def test_sphere_intersect():
+    """Tests intersecting single rays with spheres."""
+    s = Sphere()
+    # Test 1: Two points, tangent, miss
+    assert [i.t for i in s.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))] == [4.0, 6.0]
+    assert [i.t for i in s.intersect(Ray(Point(0, 1, -5), Vector(0, 0, 1)))] == [5.0, 5.0]
+    assert s.intersect(Ray(Point(0, 2, -5), Vector(0, 0, 1))) == []
+    # Test 2: Ray inside and behind the sphere
+    assert [i.t for i in s.intersect(Ray(Point(0, 0, 0), Vector(0, 0, 1)))] == [-1.0, 1.0]
+    assert [i.t for i in s.intersect(Ray(Point(0, 0, 5), Vector(0, 0, 1)))] == [-6.0, -4.0]
+    # Test 3: Intersections record the object
+    assert s.intersect(Ray(Point(0, 0, -5), Vector(0, 0, 1)))[0].object is s
+    # Test 4: Transformed spheres, given as a Transform or a matrix
+    r = Ray(Point(0, 0, -5), Vector(0, 0, 1))
+    assert [i.t for i in Sphere(Transform().scale(2, 2, 2)).intersect(r)] == [3.0, 7.0]
+    assert Sphere(Matrix4.translation_matrix(5, 0, 0)).intersect(r) == []
+
+def test_hit():
+    """Tests choosing the visible intersection."""
+    s = Sphere()
+    i1, i2, i3, i4 = Intersection(5, s), Intersection(7, s), Intersection(-3, s), Intersection(2, s)
+    # Test 1: Lowest non-negative
+    assert hit(intersections(i1, i2, i3, i4)) == i4
+    assert intersections(i1, i2, i3, i4) == [i3, i4, i1, i2]
+    # Test 2: All negative
+    assert hit([Intersection(-2, s), Intersection(-1, s)]) is None
+    # Test 3: Vectorized version
+    ts = np.array([[-1.0, 1.0], [4.0, 6.0], [-6.0, -4.0], [np.inf, np.inf]])
+    assert np.array_equal(hit_distances(ts), [1.0, 4.0, np.inf, np.inf])
+
+def test_intersect_packet_matches_scalar():
+    """Tests that the vectorized packet solve matches one intersect call per ray."""
+    s = Sphere(Transform().scale(1, 2, 0.5).rotate_z(0.4).translate(0.2, -0.3, 1))
+    rng = np.random.default_rng(1)
+    origins = rng.uniform(-4, 4, (200, 3))
+    origins[:, 2] = -6
+    directions = rng.normal(0, 0.15, (200, 3))
+    directions[:, 2] = 1
+    packet = RayPacket(origins, directions)
+    ts = s.intersect_packet(packet)
+    # Test 1: Both hits and misses occur
+    missed = np.isinf(ts[:, 0])
+    assert missed.any() and not missed.all()
+    # Test 2: Every ray agrees with the scalar path
+    for i in range(len(packet)):
+        xs = s.intersect(packet[i])
+        if xs:
+            assert np.allclose(ts[i], [xs[0].t, xs[1].t])
+        else:
+            assert missed[i]
+
+def test_normals():
+    """Tests surface normals on plain and transformed spheres."""
+    s = Sphere()
+    k = math.sqrt(3) / 3
+    # Test 1: Normals on the unit sphere
+    assert s.normal_at(Point(1, 0, 0)) == Vector(1, 0, 0)
+    assert s.normal_at(Point(k, k, k)).compare(Vector(k, k, k))
+    # Test 2: Translated and scaled/rotated spheres
+    s = Sphere(Matrix4.translation_matrix(0, 1, 0))
+    assert s.normal_at(Point(0, 1.70711, -0.70711)).compare(Vector(0, 0.70711, -0.70711))
+    s = Sphere(Transform().rotate_z(math.pi / 5).scale(1, 0.5, 1))
+    n = s.normal_at(Point(0, math.sqrt(2) / 2, -math.sqrt(2) / 2))
+    assert n.compare(Vector(0, 0.97014, -0.24254))
+    # Test 3: Vectorized normals agree
+    normals = s.normals_at([[0, math.sqrt(2) / 2, -math.sqrt(2) / 2]])
+    assert np.allclose(normals[0], [n.x, n.y, n.z])
+
+def test_closest_hits():
+    """Tests resolving primary visibility against several spheres at once."""
+    near = Sphere(Transform().translate(0, 0, -1))
+    far = Sphere(Transform().scale(3, 3, 3).translate(0, 0, 5))
+    packet = RayPacket([[0, 0, -10], [0, 2, -10], [0, 10, -10]], [[0, 0, 1]] * 3)
+    distances, indices = closest_hits(packet, [far, near])
+    # Test 1: The near sphere hides the far one on the axis
+    assert distances[0] == pytest.approx(8.0)
+    assert indices[0] == 1
+    # Test 2: Off-axis ray only reaches the big sphere
+    assert indices[1] == 0
+    assert distances[1] == pytest.approx(15 - math.sqrt(5))
+    # Test 3: Miss
+    assert indices[2] == -1 and np.isinf(distances[2])
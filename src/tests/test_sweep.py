@@ -0,0 +1,61 @@
+import sys
+import os
+import pytest
+import math
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.sweep import ProjectileGrid, launch_velocities, run_sweep, simulate_chunk
+from core.simulation import simulate_projectiles
+from core.tuples import Point, Vector, Projectile, Environment
+
+@pytest.fixture
+def grid():
+    """Fixture with a small grid of launch angles, speeds and winds."""
+    velocities = launch_velocities(np.linspace(0.2, 1.4, 5), [2, 5, 8])
+    return ProjectileGrid([(0, 1, 0), (10, 5, 0)], velocities, [(0, -0.1, 0)], [(-0.01, 0, 0), (0.02, 0, 0)])
+
+def test_grid(grid):
+    """Tests the indexing of the parameter grid."""
+    assert len(grid) == 2 * 15 * 1 * 2
+    starts, velocities, gravities, winds = grid.parameters(0, len(grid))
+    assert starts.shape == (60, 3)
+    assert list(winds[1]) == [0.02, 0, 0]
+    assert list(starts[30]) == [10, 5, 0]
+    assert math.isclose(np.linalg.norm(velocities[0]), 2)
+
+def test_simulate_chunk_matches_simulator(grid):
+    """Tests that a chunk gives the same landings as simulating the jobs directly."""
+    chunk = simulate_chunk(grid, 10, 20, max_ticks=10000)
+    starts, velocities, gravities, winds = grid.parameters(10, 20)
+    for i in range(10):
+        env = Environment(Vector(*gravities[i]), Vector(*winds[i]))
+        direct = simulate_projectiles([Projectile(Point(*starts[i]), Vector(*velocities[i]))], env)
+        assert chunk.landing_ticks[i] == direct.landing_ticks[0]
+        assert np.allclose(chunk.landing_points[i], direct.landing_points[0])
+
+def test_simulate_chunk_max_heights(grid):
+    """Tests that max heights are tracked without keeping trajectories."""
+    chunk = simulate_chunk(grid, 0, len(grid), max_ticks=10000)
+    assert chunk.trajectories is None and chunk.pixels is None
+    kept = simulate_chunk(grid, 0, len(grid), max_ticks=10000, keep_trajectories=True)
+    expected = [t[:, 1].max() for t in kept.trajectories]
+    assert np.array_equal(chunk.max_heights, expected)
+    assert np.array_equal(kept.max_heights, expected)
+    # Projectiles cut off by max_ticks report the highest point so far
+    short = simulate_chunk(grid, 0, len(grid), max_ticks=3, keep_trajectories=True)
+    assert np.array_equal(short.max_heights, [t[:, 1].max() for t in short.trajectories])
+
+def test_run_sweep_is_reproducible(grid):
+    """Tests that the sweep results do not depend on the worker count or chunk size."""
+    seen = []
+    one = run_sweep(grid, chunk_size=7, max_workers=1, image_size=(60, 40), on_chunk=seen.append)
+    two = run_sweep(grid, chunk_size=4, max_workers=2, image_size=(60, 40))
+    assert sum(chunk.stop - chunk.start for chunk in seen) == len(grid)
+    assert np.array_equal(one.table, two.table)
+    assert one.table["landed"].all()
+    assert list(one.table["index"]) == list(range(len(grid)))
+    assert one.canvas.canvas_to_ppm() == two.canvas.canvas_to_ppm()
+    assert one.canvas.pixels.max() == 1
+    assert "landing x" in one.format_table(limit=3)
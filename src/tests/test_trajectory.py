@@ -0,0 +1,87 @@
+import sys
+import os
+import pytest
+import math
+import numpy as np
+
+# Add the src directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+from core.trajectory import (discrete_state, discrete_landing_tick, analytic_state,
+                             analytic_landing_time, integrate)
+from core.tuples import Point, Vector, Projectile, Environment
+
+@pytest.fixture
+def setup():
+    """Fixture with the projectile and environment of projectile_sim.py."""
+    projectile = Projectile(Point(0, 1, 0), Vector(1, 1.8, 0).normalize() * 11.25)
+    environment = Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0))
+    return projectile, environment
+
+def test_discrete_matches_tick(setup):
+    """Tests that the closed form reproduces the tick loop exactly."""
+    projectile, environment = setup
+    ticks = 0
+    p = projectile
+    while p.position.y > 0:
+        p = p.tick(environment, p)
+        ticks += 1
+    assert discrete_landing_tick(projectile, environment) == ticks
+    position, velocity = discrete_state(projectile, environment, ticks)
+    assert position == p.position
+    assert velocity == p.velocity
+
+def test_discrete_uses_tick_acceleration():
+    """Tests that the closed form mixes gravity and wind like Projectile.tick."""
+    projectile = Projectile(Point(0, 1, 0), Vector(1, 1, 0.5))
+    environment = Environment(Vector(0.3, -0.1, 0.02), Vector(-0.01, 0.05, 0.4))
+    p = projectile
+    for _ in range(6):
+        p = p.tick(environment, p)
+    position, velocity = discrete_state(projectile, environment, 6)
+    assert position == p.position
+    assert velocity == p.velocity
+
+def test_discrete_never_lands():
+    """Tests that a projectile that never comes down has no landing tick."""
+    projectile = Projectile(Point(0, 1, 0), Vector(1, 1, 0))
+    assert discrete_landing_tick(projectile, Environment(Vector(0, 0, 0), Vector(0, 0, 0))) is None
+    assert analytic_landing_time(projectile, Environment(Vector(0, 0.1, 0), Vector(0, 0, 0))) is None
+    assert discrete_landing_tick(Projectile(Point(0, 0, 0), Vector(1, 1, 0)), Environment(Vector(0, 0, 0), Vector(0, 0, 0))) == 0
+
+def test_analytic_landing(setup):
+    """Tests the exact landing time of the continuous trajectory."""
+    projectile, environment = setup
+    t = analytic_landing_time(projectile, environment)
+    position, velocity = analytic_state(projectile, environment, t)
+    assert math.isclose(position.y, 0, abs_tol=1e-9)
+    assert velocity.y < 0
+
+def test_integrate_constant_acceleration(setup):
+    """Tests that the adaptive integrator finds the exact landing in few steps."""
+    projectile, environment = setup
+    result = integrate(projectile, environment, initial_step=0.5)
+    t = analytic_landing_time(projectile, environment)
+    position, _ = analytic_state(projectile, environment, t)
+    assert result.landed
+    assert math.isclose(result.landing_time, t, rel_tol=1e-9)
+    assert result.landing_point == position
+    # RK4 is exact for constant acceleration, so the steps grow quickly
+    assert result.steps < 10
+    assert len(result.times) == result.steps + 1
+
+def test_integrate_with_drag(setup):
+    """Tests integrating a custom acceleration with drag, and the step guards."""
+    projectile, environment = setup
+    drag = lambda t, position, velocity: np.array([-0.01, -0.1, 0]) - 0.05 * velocity
+    result = integrate(projectile, environment, acceleration=drag, tolerance=1e-8, max_step=2)
+    fine = integrate(projectile, environment, acceleration=drag, tolerance=1e-11, max_step=0.5)
+    assert result.landed
+    assert math.isclose(result.landing_time, fine.landing_time, rel_tol=1e-6)
+    assert np.all(np.diff(result.times) <= 2 + 1e-12)
+    # Drag shortens the flight compared to the drag-free trajectory
+    assert result.landing_point.x < analytic_state(projectile, environment, analytic_landing_time(projectile, environment))[0].x
+
+    limited = integrate(projectile, environment, max_step=0.1, max_steps=5)
+    assert not limited.landed
+    assert limited.steps == 5
+    assert limited.landing_point is None
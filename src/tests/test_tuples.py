@@ -5,6 +5,7 @@ import pytest
 # Add the src directory to the sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
 from core.tuples import Point, Vector, Tuple, Projectile, Environment, Color
+from core.tuples import TupleArray, PointArray, VectorArray, ColorArray
 
 @pytest.fixture
 def setup():
@@ -134,5 +135,147 @@ def test_color_tuple():
     # Test 4: Multiply two colors
     assert c1.multiply_color(c2) == Color(0.63, 0.06, 0.1875)
 
+def test_tuple_slots():
+    """Test that tuples do not carry a per-instance __dict__."""
+    for t in (Tuple(1, 2, 3, 4), Point(1, 2, 3), Vector(1, 2, 3), Color(1, 2, 3)):
+        assert not hasattr(t, "__dict__")
+    assert Point(1, 2, 3)[2] == 3
+    with pytest.raises(IndexError):
+        Point(1, 2, 3)[4]
+
+def test_tuple_operators(setup):
+    """Test that the operators match the named methods."""
+    p1, p2, p3, p4 = setup
+    assert p1 + p2 == p1.add(p2)
+    assert isinstance(p1 + p2, Point)
+    assert p3 - p4 == Vector(-2, -4, -6)
+    assert -p2 == Vector(2, -3, -1)
+    assert Tuple(1, -2, 3, -4) * 3.5 == Tuple(3.5, -7, 10.5, -14)
+    assert 0.5 * Tuple(1, -2, 3, -4) == Tuple(0.5, -1, 1.5, -2)
+    assert Tuple(1, -2, 3, -4) / 2 == Tuple(0.5, -1, 1.5, -2)
+    assert Color(0.9, 0.6, 0.75) * Color(0.7, 0.1, 0.25) == Color(0.63, 0.06, 0.1875)
+    with pytest.raises(TypeError):
+        p2 - p1
+
+def test_tuple_in_place_operators():
+    """Test that in-place operators update tuples without allocating when possible."""
+    p = Point(1, 2, 3)
+    original = p
+    # Test 1: Point += Vector keeps the same object
+    p += Vector(1, 1, 1)
+    assert p is original
+    assert p == Point(2, 3, 4)
+
+    # Test 2: Point -= Vector keeps the same object
+    p -= Vector(2, 3, 4)
+    assert p is original
+    assert p == Point(0, 0, 0)
+
+    # Test 3: Point -= Point changes the type, so a new Vector is returned
+    p -= Point(1, 1, 1)
+    assert p is not original
+    assert isinstance(p, Vector)
+
+    # Test 4: Vectors and colors scale in place
+    v = Vector(1, 2, 3)
+    original = v
+    v *= 2
+    v /= 4
+    assert v is original
+    assert v == Vector(0.5, 1, 1.5)
+    c = Color(1, 1, 1)
+    c += Color(0.5, 0.5, 0.5)
+    assert isinstance(c, Color)
+
+def test_projectile_step():
+    """Test that stepping a projectile in place matches tick."""
+    environment = Environment(Vector(0, -0.1, 0), Vector(-0.01, 0, 0))
+    ticked = Projectile(Point(0, 1, 0), Vector(1, 1, 0).normalize())
+    stepped = Projectile(Point(0, 1, 0), Vector(1, 1, 0).normalize())
+    position = stepped.position
+    for _ in range(5):
+        ticked = ticked.tick(environment, ticked)
+        stepped.step(environment)
+    assert stepped.position is position
+    assert stepped.position == ticked.position
+    assert stepped.velocity == ticked.velocity
+
+    # The velocity changes by wind.x, gravity.y and gravity.z
+    environment = Environment(Vector(1, -0.1, 0.2), Vector(-0.01, 3, 4))
+    ticked = Projectile(Point(0, 1, 0), Vector(0, 0, 0))
+    ticked = ticked.tick(environment, ticked)
+    assert ticked.velocity == Vector(-0.01, -0.1, 0.2)
+    stepped = Projectile(Point(0, 1, 0), Vector(0, 0, 0)).step(environment)
+    assert stepped.velocity == ticked.velocity
+
+def test_tuple_array_conversion(setup):
+    """Test converting between lists of tuples and tuple arrays."""
+    p1, p2, p3, p4 = setup
+    arr = TupleArray.from_tuples([p1, p2, Tuple(1, -2, 3, -4)])
+    assert len(arr) == 3
+    assert arr.to_tuples() == [p1, p2, Tuple(1, -2, 3, -4)]
+    assert isinstance(arr[0], Point)
+    assert isinstance(arr[1], Vector)
+    assert list(arr.is_point()) == [True, False, False]
+    assert list(arr.is_vector()) == [False, True, False]
+
+def test_tuple_array_add_subtract(setup):
+    """Test that array addition and subtraction follow the scalar point/vector rules."""
+    points = PointArray([3, 3], [-2, 2], [5, 1])
+    vectors = VectorArray([-2, 5], [3, 6], [1, 7])
+    # Test 1: Point + Vector is a Point
+    result = points.add(vectors)
+    assert isinstance(result, PointArray)
+    assert result.to_tuples() == [Point(3, -2, 5).add(Vector(-2, 3, 1)), Point(3, 2, 1).add(Vector(5, 6, 7))]
+
+    # Test 2: Point - Point is a Vector
+    assert isinstance(points.subtract(points), VectorArray)
+
+    # Test 3: Point - Vector is a Point, matching the scalar API
+    assert points.subtract(vectors).to_tuples() == [Point(5, -5, 4), Point(-2, -4, -6)]
+
+    # Test 4: Subtract point from vector
+    with pytest.raises(TypeError, match="Cannot subtract a Point from a Vector"):
+        vectors.subtract(points)
+
+    # Test 5: A single Tuple is broadcast over the array
+    assert points.add(Vector(1, 1, 1)).to_tuples() == [Point(4, -1, 6), Point(4, 3, 2)]
+
+def test_tuple_array_negate_multiply_divide():
+    """Test negation, multiplication and division of tuple arrays."""
+    arr = TupleArray.from_tuples([Point(3, -2, 5), Vector(-2, 3, 1), Tuple(1, -2, 3, -4)])
+    assert arr.negate().to_tuples() == [Point(-3, 2, -5), Vector(2, -3, -1), Tuple(-1, 2, -3, 4)]
+    assert arr.multiply(0.5)[2] == Tuple(0.5, -1, 1.5, -2)
+    assert arr.divide(2)[2] == Tuple(0.5, -1, 1.5, -2)
+    assert arr.multiply([1, 2, 3])[2] == Tuple(3, -6, 9, -12)
+
+def test_tuple_array_magnitude_normalize():
+    """Test magnitude and normalization of tuple arrays."""
+    vectors = VectorArray([4, 1, -1], [0, 2, -2], [0, 3, -3])
+    assert list(vectors.magnitude()) == [4, 14**0.5, 14**0.5]
+    assert vectors.normalize().to_tuples() == [v.normalize() for v in vectors.to_tuples()]
+
+def test_tuple_array_dot_cross():
+    """Test the dot and cross products of tuple arrays."""
+    a = VectorArray([1, 2], [2, 3], [3, 4])
+    b = VectorArray([2, 1], [3, 2], [4, 3])
+    assert list(a.dot(b)) == [20, 20]
+    assert a.cross(b).to_tuples() == [Vector(-1, 2, -1), Vector(1, -2, 1)]
+
+def test_color_array():
+    """Test the color array."""
+    c1 = ColorArray([0.9], [0.6], [0.75])
+    c2 = ColorArray([0.7], [0.1], [0.25])
+    assert c1.add(c2)[0] == Color(1.6, 0.7, 1.0)
+    assert c1.subtract(c2)[0] == Color(0.2, 0.5, 0.5)
+    assert c1.multiply(2)[0] == Color(1.8, 1.2, 1.5)
+    assert c1.multiply_color(c2)[0] == Color(0.63, 0.06, 0.1875)
+    # Test 1: Inherited operations keep returning colors
+    assert isinstance(c1.divide(2), ColorArray)
+    assert c1.divide(2).to_tuples() == [Color(0.45, 0.3, 0.375)]
+    assert c1.negate().to_tuples() == [Color(-0.9, -0.6, -0.75)]
+    assert isinstance(c1.normalize(), ColorArray)
+    assert c1.normalize().magnitude()[0] == pytest.approx(1)
+
 if __name__=="__main__":
     pytest.main()
\ No newline at end of file